@@ -1,237 +1,268 @@
 import streamlit as st
-import pandas as pd
-import pytz
-from datetime import datetime
+import streamlit.components.v1 as components
+import functools
+import logging
+import threading
+import json
+import os
+import time
+from datetime import date, timedelta
 import math
-from supabase.client import create_client
 from streamlit_cookies_manager import EncryptedCookieManager
-
-cookies = EncryptedCookieManager(prefix="my_app", password="super_secret_key")
-if not cookies.ready():
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from directory import Directory
+from perf import Timings, TimedClient
+from cache_backend import MemoryBackend, RedisBackend, SharedCache
+from parallel_reads import ParallelReads
+from config import ALLOWED_DISTANCE, GPS_MAX_AGE_SECONDS, IST, QUERY_TIMEOUT, SHIFT_HOURS, now_ist, secret, USERS, ADMIN_USER, ADMIN_PASSWORD
+
+run_started = time.perf_counter()
+log = logging.getLogger(__name__)
+
+# ================= PERF =================
+@st.cache_resource
+def get_timings():
+    # PERF_LOG=<path> also appends every sample there as JSON lines
+    return Timings(log_path=secret("PERF_LOG", "") or None)
+
+def timed(name):
+    return get_timings().timed(name)
+
+def counted_cache_data(**cache_kwargs):
+    # st.cache_data plus a hit/miss counter: the inner function only runs on a miss
+    def wrap(fn):
+        ran = threading.local()
+
+        def cached(*args, **kwargs):
+            ran.miss = True
+            return fn(*args, **kwargs)
+        # cache key is built from the qualname, so each wrapped function keeps its own cache
+        cached.__qualname__ = fn.__qualname__
+        cached = st.cache_data(**cache_kwargs)(cached)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            ran.miss = False
+            with get_timings().section(f"cache {fn.__name__}"):
+                out = cached(*args, **kwargs)
+            get_timings().count(fn.__name__, "miss" if ran.miss else "hit")
+            return out
+        call.clear = cached.clear
+        return call
+    return wrap
+
+with get_timings().section("cookies"):
+    cookies = EncryptedCookieManager(prefix="my_app", password="super_secret_key")
+    cookies_ready = cookies.ready()
+if not cookies_ready:
     with st.spinner("Loading session..."):
         st.stop()
 
 # ================= SUPABASE =================
-supabase = create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-# ================= CONFIG =================
-ALLOWED_DISTANCE = 500
-IST = pytz.timezone("Asia/Kolkata")
-SHIFT_HOURS = 8.5
-LATE_AFTER_HOUR = 9
-LATE_AFTER_MINUTE = 30
-
-USERS = {
-    "ajad": {"password": "1234"},
-    "jitender": {"password": "1234"},
-    "ramniwas": {"password": "1234"},
-    "lakshman": {"password": "1234"},
-    "prempatil": {"password": "1234"},
-    "mithlesh": {"password": "1234"},
-    "dharmendra": {"password": "1234"},
-    "deepak": {"password": "1234"},
-    "rajan": {"password": "1234"},
-    "shyamjeesharma": {"password": "1234"},
-    "surjesh": {"password": "1234"},
-    "bittu": {"password": "1234"},
-    "prakashkumarjha": {"password": "1234"},
-    "amit": {"password": "1234"},
-    "himanshu": {"password": "1234"},
-    "rahul": {"password": "1234"},
-    "ansh": {"password": "1234"},
-}
-SECURE_USERS = ["ansh","rahul","ajad","ramniwas","lakshman","prempatil","mithlesh","bittu"]
-ADMIN_USER = "admin"
-ADMIN_PASSWORD = "admin123"
+@st.cache_resource
+def get_supabase():
+    # one client per process, built on first use. Tables and storage share one pooled HTTP/2 session,
+    # so parallel reads reuse warm connections, and every request gives up after QUERY_TIMEOUT
+    import httpx
+    from supabase.client import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    http = httpx.Client(timeout=httpx.Timeout(QUERY_TIMEOUT, connect=5), http2=True, follow_redirects=True,
+                        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16))
+    client = create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"], options=SyncClientOptions(httpx_client=http))
+    return TimedClient(client, get_timings())
 
 # ================= HELPERS =================
-def now_ist():
-    return datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(IST)
-
-def distance_in_meters(lat1, lon1, lat2, lon2):
-    R = 6371000
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2)
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-@st.cache_data(ttl=300)
+def timed_fragment(name, run_every=None):
+    # st.fragment that also times itself; "(alone)" marks a rerun of just this section
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            ctx = get_script_run_ctx()
+            with get_timings().section(f"{name} (alone)" if ctx and ctx.fragment_ids_this_run else name):
+                return fn(*args, **kwargs)
+        return st.fragment(run, run_every=run_every)
+    return wrap
+
+@st.cache_resource
+def get_cache():
+    # CACHE_URL=redis://... shares cached reads and invalidations across app replicas
+    url = secret("CACHE_URL", "")
+    return SharedCache(RedisBackend.from_url(url) if url else MemoryBackend())
+
+@st.cache_resource
+def get_parallel_reads():
+    return ParallelReads(timings=get_timings())
+
+@st.cache_resource
+def get_directory():
+    return Directory(get_supabase(), cache=get_cache())
+
+@timed("get_allowed_warehouse_ids")
 def get_allowed_warehouse_ids(user):
-    res = supabase.table("user_warehouses").select("warehouse_id").eq("user_name", user).execute()
-    return [r["warehouse_id"] for r in (res.data or []) if r["warehouse_id"]]
-
-@st.cache_data(ttl=60)
-def load_data():
-    res = supabase.table("attendance").select("*").order("id", desc=True).limit(5000).execute()
-    if not res.data:
-        return pd.DataFrame(columns=["date","name","punch_type","time","lat","lon","warehouse_id"])
-    return pd.DataFrame(res.data)
-
+    return get_directory().warehouses_for(user)
+
+@st.cache_resource
+def get_archive():
+    # optional: ARCHIVE_URL=<path or s3://...> holds the closed months archive.py moved out of Supabase
+    url = secret("ARCHIVE_URL", "")
+    return Archive(url) if url else None
+
+@st.cache_resource
+def get_attendance_queries():
+    return AttendanceQueries(get_supabase(), frame=AttendanceFrame.from_rows, cache=get_cache(), archive=get_archive())
+
+@st.cache_resource
+def get_summary_queries():
+    return AttendanceQueries(get_supabase(), table=SUMMARY_TABLE, cache=get_cache())
+
+@st.cache_resource
+def get_replica():
+    # optional: LOCAL_REPLICA=<path to a .db file> runs admin analytics on a local SQLite copy
+    path = secret("LOCAL_REPLICA", "")
+    return LocalReplica(get_supabase(), path, archive=get_archive()) if path else None
+
+@timed("load_summary")
+def load_summary(start, end, user=None):
+    return get_summary_queries().fetch(start, end, user=user, columns=SUMMARY_COLUMNS)
+
+@timed("load_range")
+def load_range(start, end, user=None, columns=None):
+    return get_attendance_queries().fetch(start, end, user=user, columns=columns)
+
+def punch_saved(client, replica, attendance_queries, summary_queries, presence_calendar, rows):
+    # the writer's follow-up thread: the rows are in the table now, with their ids
+    if replica:
+        replica.merge(rows)
+    for row in rows:
+        try:
+            for summary in rollup_punch(client, row):
+                summary_queries.note_insert(summary)
+                presence_calendar.apply(summary)
+        except Exception:
+            # the punch itself is saved; `python daily_summary.py backfill` repairs the summary
+            log.exception("daily summary rollup failed for punch %s", row.get("id"))
+    attendance_queries.invalidate()
+    summary_queries.invalidate()
+
+@st.cache_resource
+def get_punch_writer():
+    # resources resolved here, on the script thread: the writer's thread has no script context for cache_resource
+    on_saved = functools.partial(punch_saved, get_supabase(), get_replica(), get_attendance_queries(),
+                                 get_summary_queries(), get_presence_calendar())
+    return PunchWriter(get_supabase(), on_saved=on_saved)
+
+@timed("save_row")
 def save_row(row):
-    supabase.table("attendance").insert(row).execute()
-    load_data.clear()
-
-@st.cache_data(ttl=300)
-def get_warehouses_batch(warehouse_ids_tuple):
-    res = supabase.table("warehouses").select("id, name, lat, lon").in_("id", list(warehouse_ids_tuple)).execute()
-    return res.data or []
-
+    # queued, not awaited: the writer flushes it together with other sessions' punches, while this
+    # session's cached reads show it right away; the presence board only moves once it is stored
+    future = get_punch_writer().submit(row)
+    get_attendance_queries().note_insert(row)
+    board = get_presence()
+
+    def stored(done):
+        if done.exception() is None:
+            board.apply(row)
+    future.add_done_callback(stored)
+    return future
+
+@st.cache_resource
+def get_warehouse_index():
+    return WarehouseIndex(get_supabase())
+
+@timed("get_nearest_warehouse")
 def get_nearest_warehouse(lat, lon, warehouse_ids):
     if not warehouse_ids:
         return None
-    warehouses = get_warehouses_batch(tuple(warehouse_ids))
-    nearest = None
-    min_dist = float("inf")
-    for wh in warehouses:
-        if wh["lat"] is None or wh["lon"] is None:
-            continue
-        dist = distance_in_meters(lat, lon, float(wh["lat"]), float(wh["lon"]))
-        if dist < min_dist:
-            min_dist = dist
-            nearest = {"id": wh["id"], "name": wh["name"], "distance": dist}
-    return nearest
-
-def upload_photo(photo, user):
-    filename = f"{user}/{datetime.utcnow().timestamp()}.jpg"
-    supabase.storage.from_("attendance-photos").upload(filename, photo.getvalue(), {"content-type": photo.type})
+    return get_warehouse_index().nearest(lat, lon, warehouse_ids, ALLOWED_DISTANCE)
+
+@st.cache_resource
+def get_gps_component():
+    # registered once per process; static/gps.js runs in the page itself and hands each fix to this session
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "gps.js")) as f:
+        js = f.read()
+    return st.components.v2.component(
+        "gps_fix",
+        html='<button>📍 Get My Location</button><p class="gps-status"></p>',
+        css="button{background:#1a5fa8;color:white;border:none;padding:10px 20px;border-radius:10px;font-size:15px;"
+            "font-weight:600;cursor:pointer;width:100%;margin-bottom:4px;} button:disabled{opacity:.6;}"
+            ".gps-status{font-size:12px;color:#6c757d;margin:0 0 8px;}",
+        js=js,
+    )
+
+def location_fix(warehouse_ids):
+    """The session's last GPS fix (lat, lon, accuracy, at) with its nearest warehouse; the browser is asked again only once it is stale."""
+    fix = st.session_state.get("gps_fix")
+    stale = fix is None or time.time() - fix["at"] > GPS_MAX_AGE_SECONDS
+    got = get_gps_component()(key="gps", data={"refresh": stale, "token": fix["at"] if fix else 0},
+                              on_fix_change=lambda: None, on_error_change=lambda: None)
+    if got.fix:
+        fix = st.session_state.gps_fix = {**got.fix, "at": time.time()}
+        stale = False
+        st.session_state.pop("gps_error", None)
+    elif got.error:
+        st.session_state.gps_error = got.error
+    if fix is None or stale:
+        return None
+    # reruns reuse the lookup until the fix or the user's warehouses change
+    if fix.get("warehouses") != warehouse_ids:
+        fix["nearest"] = get_nearest_warehouse(fix["lat"], fix["lon"], warehouse_ids)
+        fix["warehouses"] = list(warehouse_ids)
+    return fix
+
+@st.cache_resource
+def get_photo_queue():
+    return PhotoUploadQueue(get_supabase())
+
+@timed("upload_photo")
+def upload_photo(photo, user, punch_id):
+    # the row is saved with this key right away; the queue compresses and uploads it in the background
+    filename = f"{user}/{punch_id}.jpg"
+    get_photo_queue().submit(filename, photo.getvalue())
     return filename
 
-@st.cache_data(ttl=60)
-def load_remarks():
-    res = supabase.table("attendance_remarks").select("*").order("created_at", desc=True).execute()
-    return res.data or []
-
-# ================= GPS SCRIPT =================
-st.markdown("""
-<script>
-function getLocation(){
-  navigator.geolocation.getCurrentPosition(
-    function(pos){
-      const lat = pos.coords.latitude;
-      const lon = pos.coords.longitude;
-      const url = new URL(window.location.href);
-      url.searchParams.set("lat", lat);
-      url.searchParams.set("lon", lon);
-      window.location.href = url.toString();
-    },
-    function(err){ alert("Location error: " + err.message); },
-    { enableHighAccuracy: true, timeout: 10000 }
-  );
-}
-</script>
-""", unsafe_allow_html=True)
+@counted_cache_data(ttl=3600)
+def photo_urls(paths):
+    base = st.secrets["SUPABASE_URL"]
+    return [(public_url(base, thumb_path(p)), public_url(base, p)) for p in paths]
+
+def event_chunks(start, end):
+    # a day either side, so night shifts at the edges of the range pair up
+    start, end = start - timedelta(days=1), end + timedelta(days=1)
+    if get_replica():
+        return get_replica().iter_event_chunks(start, end)
+    return iter_event_chunks(get_supabase(), start, end, archive=get_archive())
+
+def prepare_export(kind, table, pages, fmt, filters):
+    # one temp file per export kind per session; replaced (and the old one removed) on each new request
+    old = st.session_state.pop(kind, None)
+    if old and os.path.exists(old["path"]):
+        os.remove(old["path"])
+    path, rows = export_to_file(pages, fmt, table)
+    st.session_state[kind] = {"path": path, "rows": rows, "fmt": fmt, "filters": filters}
+
+@st.cache_resource
+def get_presence():
+    # the poller also seeds the board and rolls it over at midnight; PRESENCE_REALTIME=1 adds instant pushes
+    board = PresenceBoard(USERS.keys())
+    PollingFeed(get_supabase(), board, lambda: now_ist().date().isoformat()).start()
+    if secret("PRESENCE_REALTIME", ""):
+        RealtimeFeed(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"], board).start()
+    return board
+
+@st.cache_resource
+def get_remarks_store():
+    return RemarksStore(get_supabase(), cache=get_cache(), archive=get_archive())
+
+@st.cache_resource
+def get_presence_calendar():
+    # months load from the daily summary on first view; punch_saved folds each new summary row in
+    replica, summary_queries = get_replica(), get_summary_queries()
+    return PresenceCalendar(USERS.keys(), lambda first, last: replica.daily_hours(first, last) if replica
+                            else summary_queries.fetch(first, last, columns=SUMMARY_COLUMNS))
 
 # ================= GLOBAL CSS =================
-st.markdown("""
-<style>
-/* Metric cards */
-.metric-card {
-    background: #f8f9fa;
-    border: 1px solid #e9ecef;
-    border-radius: 12px;
-    padding: 16px 20px;
-    text-align: center;
-}
-.metric-label {
-    font-size: 12px;
-    color: #6c757d;
-    text-transform: uppercase;
-    letter-spacing: 0.05em;
-    margin-bottom: 6px;
-}
-.metric-value {
-    font-size: 28px;
-    font-weight: 700;
-    margin: 0;
-}
-.metric-green { color: #1a7f4b; }
-.metric-red   { color: #c0392b; }
-.metric-blue  { color: #1a5fa8; }
-.metric-orange{ color: #d35400; }
-
-/* Status badge */
-.status-badge {
-    display: inline-block;
-    padding: 6px 18px;
-    border-radius: 999px;
-    font-size: 14px;
-    font-weight: 600;
-    margin-bottom: 8px;
-}
-.badge-in     { background: #d4edda; color: #155724; }
-.badge-out    { background: #f8d7da; color: #721c24; }
-.badge-none   { background: #fff3cd; color: #856404; }
-
-/* Progress bar */
-.progress-wrap {
-    background: #e9ecef;
-    border-radius: 999px;
-    height: 12px;
-    overflow: hidden;
-    margin: 8px 0 4px;
-}
-.progress-bar {
-    height: 12px;
-    border-radius: 999px;
-    transition: width 0.4s ease;
-}
-.progress-label {
-    font-size: 12px;
-    color: #6c757d;
-    margin-top: 2px;
-}
-
-/* Timeline */
-.timeline-row {
-    display: flex;
-    align-items: center;
-    gap: 10px;
-    padding: 8px 0;
-    border-bottom: 1px solid #f0f0f0;
-    font-size: 14px;
-}
-.timeline-dot-in  { width:10px;height:10px;border-radius:50%;background:#1a7f4b;flex-shrink:0; }
-.timeline-dot-out { width:10px;height:10px;border-radius:50%;background:#c0392b;flex-shrink:0; }
-
-/* GPS distance pill */
-.gps-ok   { background:#d4edda;color:#155724;padding:6px 14px;border-radius:8px;font-size:14px;font-weight:600; }
-.gps-far  { background:#f8d7da;color:#721c24;padding:6px 14px;border-radius:8px;font-size:14px;font-weight:600; }
-
-/* Chip */
-.chip {
-    display: inline-block;
-    background: #d4edda;
-    color: #155724;
-    border-radius: 999px;
-    padding: 4px 12px;
-    font-size: 13px;
-    font-weight: 500;
-    margin: 3px;
-}
-.chip-absent {
-    background: #f8d7da;
-    color: #721c24;
-}
-
-/* Section header */
-.section-header {
-    font-size: 13px;
-    font-weight: 600;
-    color: #6c757d;
-    text-transform: uppercase;
-    letter-spacing: 0.06em;
-    margin: 20px 0 10px;
-    border-bottom: 1px solid #e9ecef;
-    padding-bottom: 6px;
-}
-
-div[data-testid="stButton"] > button {
-    border-radius: 10px !important;
-    font-weight: 600 !important;
-    padding: 10px 20px !important;
-}
-</style>
-""", unsafe_allow_html=True)
+# static/app.css is served by enableStaticServing and cached by the browser, instead of ~3 KB of <style> on every rerun
+st.markdown('<link rel="stylesheet" href="/app/static/app.css">', unsafe_allow_html=True)
 
 # ================= SESSION =================
 if "logged" not in st.session_state:
@@ -251,6 +282,7 @@ if not st.session_state.logged:
         u = (u_raw or "").strip().lower()
         p = (p or "")
         import uuid
+        from punch_service import PunchRejected, device_status
         if "device_id" not in cookies:
             cookies["device_id"] = str(uuid.uuid4())
             cookies.save()
@@ -262,137 +294,114 @@ if not st.session_state.logged:
             st.rerun()
 
         if u in USERS and USERS[u]["password"] == p:
-            if u in SECURE_USERS:
-                res = supabase.table("user_devices").select("*").eq("user_name", u).execute()
-                if not res.data:
-                    supabase.table("user_devices").upsert({"user_name": u, "device_id": current_device}).execute()
+            try:
+                if device_status(get_directory(), u, current_device, register=True) == "registered":
                     st.success("✅ Device registered")
-                else:
-                    saved_device = res.data[0]["device_id"]
-                    if saved_device != current_device:
-                        st.error("❌ Different device detected. Aap kisi aur mobile se punch in karne ki kosis kar rahe ho.")
-                        st.stop()
+            except PunchRejected:
+                st.error("❌ Different device detected. Aap kisi aur mobile se punch in karne ki kosis kar rahe ho.")
+                st.stop()
             st.session_state.logged = True
             st.session_state.user = u
             st.rerun()
         st.error("Invalid credentials")
     st.markdown("</div>", unsafe_allow_html=True)
 
-# ================= USER PANEL =================
-if st.session_state.logged and not st.session_state.admin:
-    user = st.session_state.user
-    today = now_ist().date()
-
-    # Header
-    st.markdown(f"<p style='font-size:18px;font-weight:600;margin-bottom:4px;'>👤 Welcome, {user.title()}</p>", unsafe_allow_html=True)
-    st.markdown(f"<p style='color:#6c757d;font-size:14px;margin-top:0;'>📅 {today.strftime('%A, %d %B %Y')}</p>", unsafe_allow_html=True)
-
-    # GPS Button
-    st.markdown('<button onclick="getLocation()" style="background:#1a5fa8;color:white;border:none;padding:10px 20px;border-radius:10px;font-size:15px;font-weight:600;cursor:pointer;width:100%;margin-bottom:12px;">📍 Get My Location</button>', unsafe_allow_html=True)
-
-    params = st.query_params
-    if "lat" not in params or "lon" not in params:
-        st.warning("📍 Tap the button above to get your location first.")
-        st.stop()
-
-    lat = float(params["lat"])
-    lon = float(params["lon"])
-
-    warehouse_ids = get_allowed_warehouse_ids(user)
-    if not warehouse_ids:
-        st.error("❌ Aap kisi warehouse ke liye allowed nahi ho")
-        st.stop()
-
-    nearest_wh = get_nearest_warehouse(lat, lon, warehouse_ids)
-
-    # GPS distance display
-    if not nearest_wh:
-        st.error("❌ No warehouse found")
-        st.stop()
-
-    dist_m = int(nearest_wh["distance"])
-    if nearest_wh["distance"] > ALLOWED_DISTANCE:
-        st.markdown(f'<p class="gps-far">🏭 {nearest_wh["name"]} — {dist_m}m away &nbsp;|&nbsp; ❌ Too far (limit: {ALLOWED_DISTANCE}m)</p>', unsafe_allow_html=True)
-        st.stop()
-    else:
-        st.markdown(f'<p class="gps-ok">🏭 {nearest_wh["name"]} — {dist_m}m away &nbsp;✅</p>', unsafe_allow_html=True)
-
-    st.markdown(f'<p style="font-size:12px;color:#aaa;margin-top:2px;">GPS: {lat:.5f}, {lon:.5f}</p>', unsafe_allow_html=True)
-
-    # Load attendance
-    user_clean = user.strip().lower()
-    df = load_data()
-    df["name"] = df["name"].astype(str).str.strip().str.lower()
-    df["punch_type"] = df["punch_type"].astype(str).str.strip().str.upper()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
-    today_df = df[(df["name"] == user_clean) & (df["date"] == today)]
-    already_in  = (today_df["punch_type"] == "IN").any()
-    already_out = (today_df["punch_type"] == "OUT").any()
+# ================= PANEL IMPORTS =================
+# the login screen paints without pandas, the supabase-backed stores or Pillow; they load on the
+# first signed-in run of the process and come from sys.modules after that
+if st.session_state.logged:
+    import calendar
+    import numpy as np
+    import pandas as pd
+    from archive import Archive, hot_and_cold
+    from attendance_queries import AttendanceQueries, USER_PANEL_COLUMNS
+    from attendance_engine import late_flags, calendar_view, pair_sessions
+    from attendance_frame import AttendanceFrame
+    from geo_index import WarehouseIndex
+    from photo_pipeline import PhotoUploadQueue, public_url, thumb_path
+    from punch_writer import PunchWriter, punch_key
+    from punch_service import issue_token, sequence_error, token_secret
+    from remarks_store import RemarksStore
+    from export import FORMATS, export_to_file, hours_pages, iter_hours_pages, iter_pages, parquet_available, session_pages
+    from local_replica import LocalReplica
+    from presence import PresenceBoard, PollingFeed, RealtimeFeed
+    from presence_calendar import PresenceCalendar
+    from daily_summary import SUMMARY_TABLE, SUMMARY_COLUMNS, rollup_punch, hours_table, iter_event_chunks
+
+# ================= USER PANEL FRAGMENTS =================
+# each section reruns on its own when its widgets change; a punch reruns the whole page
+@timed("today_punches")
+def today_punches(user_clean, today):
+    # from yesterday: a night shift that is still running punched IN there
+    return load_range(today - timedelta(days=1), today, user=user_clean, columns=USER_PANEL_COLUMNS).user(user_clean)
+
+@timed_fragment("user: status")
+def status_section(user_clean, today):
+    punches = today_punches(user_clean, today)
+    sessions = pair_sessions(punches)
+    running = sessions[sessions["status"] == "open"]
+    # a night shift that started yesterday and ended this morning counts as today's
+    ended = sessions["out_ts"].astype(str).str[:10]
+    closed = sessions[(sessions["status"] == "closed") & ((sessions["date"] == today.isoformat()) | (ended == today.isoformat()))]
+    worked_sec = closed["seconds"].sum()
 
     # Status badge
     st.markdown("<div class='section-header'>Today's Status</div>", unsafe_allow_html=True)
-    if already_out:
-        st.markdown('<span class="status-badge badge-out">🔴 Punched OUT</span>', unsafe_allow_html=True)
-    elif already_in:
+    if not running.empty:
         st.markdown('<span class="status-badge badge-in">🟢 Currently IN</span>', unsafe_allow_html=True)
+    elif not closed.empty:
+        st.markdown('<span class="status-badge badge-out">🔴 Punched OUT</span>', unsafe_allow_html=True)
     else:
         st.markdown('<span class="status-badge badge-none">🟡 Not Punched Yet</span>', unsafe_allow_html=True)
 
-    # Shift progress bar + timer
-    if already_in and not already_out:
-        today_in_df = today_df[today_df["punch_type"] == "IN"]
-        if not today_in_df.empty:
-            punch_in_time = pd.to_datetime(
-                today_in_df.iloc[0]["date"].strftime("%Y-%m-%d") + " " + today_in_df.iloc[0]["time"]
-            ).tz_localize(IST)
-            elapsed = now_ist() - punch_in_time
-            worked_hours = elapsed.seconds / 3600
-            hours = elapsed.seconds // 3600
-            minutes = (elapsed.seconds % 3600) // 60
-            pct = min(int((worked_hours / SHIFT_HOURS) * 100), 100)
-            bar_color = "#1a7f4b" if pct >= 100 else "#1a5fa8"
-            remaining = max(SHIFT_HOURS - worked_hours, 0)
-
-            st.markdown(f"""
-            <div style="margin:10px 0;">
-              <div style="display:flex;justify-content:space-between;font-size:13px;color:#6c757d;margin-bottom:4px;">
-                <span>⏱️ {hours}h {minutes}m worked</span>
-                <span>{pct}% of shift</span>
-              </div>
-              <div class="progress-wrap">
-                <div class="progress-bar" style="width:{pct}%;background:{bar_color};"></div>
-              </div>
-              <div class="progress-label">
-                {"✅ Shift complete!" if pct >= 100 else f"⌛ {remaining:.1f} hrs remaining"}
-              </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    elif already_out:
+    # Shift progress bar + timer: today's finished sessions plus the running one
+    if not running.empty:
+        elapsed = worked_sec + (now_ist() - running["in_ts"].iloc[0]).total_seconds()
+        worked_hours = elapsed / 3600
+        hours = int(elapsed // 3600)
+        minutes = int(elapsed % 3600 // 60)
+        pct = min(int((worked_hours / SHIFT_HOURS) * 100), 100)
+        bar_color = "#1a7f4b" if pct >= 100 else "#1a5fa8"
+        remaining = max(SHIFT_HOURS - worked_hours, 0)
+
+        st.markdown(f"""
+        <div style="margin:10px 0;">
+          <div style="display:flex;justify-content:space-between;font-size:13px;color:#6c757d;margin-bottom:4px;">
+            <span>⏱️ {hours}h {minutes}m worked</span>
+            <span>{pct}% of shift</span>
+          </div>
+          <div class="progress-wrap">
+            <div class="progress-bar" style="width:{pct}%;background:{bar_color};"></div>
+          </div>
+          <div class="progress-label">
+            {"✅ Shift complete!" if pct >= 100 else f"⌛ {remaining:.1f} hrs remaining"}
+          </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    elif not closed.empty:
         # Show total hours worked
-        in_df  = today_df[today_df["punch_type"] == "IN"]
-        out_df = today_df[today_df["punch_type"] == "OUT"]
-        if not in_df.empty and not out_df.empty:
-            t_in  = pd.to_datetime(in_df.iloc[0]["date"].strftime("%Y-%m-%d") + " " + in_df.iloc[0]["time"]).tz_localize(IST)
-            t_out = pd.to_datetime(out_df.iloc[0]["date"].strftime("%Y-%m-%d") + " " + out_df.iloc[0]["time"]).tz_localize(IST)
-            total_sec = (t_out - t_in).seconds
-            total_h = total_sec // 3600
-            total_m = (total_sec % 3600) // 60
-            st.markdown(f"<p style='font-size:14px;color:#1a7f4b;font-weight:600;'>✅ Total hours worked today: {total_h}h {total_m}m</p>", unsafe_allow_html=True)
-
-    # Today's punch timeline
-    if not today_df.empty:
+        total_h = int(worked_sec // 3600)
+        total_m = int(worked_sec % 3600 // 60)
+        st.markdown(f"<p style='font-size:14px;color:#1a7f4b;font-weight:600;'>✅ Total hours worked today: {total_h}h {total_m}m</p>", unsafe_allow_html=True)
+
+    # Today's punch timeline, from the IN of a shift still running since yesterday
+    since = min([pd.Timestamp(today).tz_localize(IST)] + running["in_ts"].tolist())
+    timeline = punches[punches["ts"] >= since].sort_values("ts")
+    if not timeline.empty:
         st.markdown("<div class='section-header'>Today's Punch Timeline</div>", unsafe_allow_html=True)
-        for _, row in today_df.sort_values("time").iterrows():
+        for _, row in timeline.iterrows():
             dot_class = "timeline-dot-in" if row["punch_type"] == "IN" else "timeline-dot-out"
             label = "Punch IN" if row["punch_type"] == "IN" else "Punch OUT"
             st.markdown(f"""
             <div class="timeline-row">
               <div class="{dot_class}"></div>
               <span style="font-weight:600;">{label}</span>
-              <span style="color:#6c757d;">— {row['time']}</span>
+              <span style="color:#6c757d;">— {row['ts']:%H:%M:%S}</span>
             </div>""", unsafe_allow_html=True)
 
+@timed_fragment("user: remarks")
+def remark_section(user):
     # ===== REMARK SECTION =====
     st.markdown("<div class='section-header'>Movement / Expense Remark</div>", unsafe_allow_html=True)
     remark_text = st.text_area("Where are you going?", placeholder="Enter your remarks here, then click Save.")
@@ -401,137 +410,333 @@ if st.session_state.logged and not st.session_state.admin:
             st.warning("❗ Remark empty nahi ho sakta")
             st.stop()
         try:
-            supabase.table("attendance_remarks").insert({
+            saved_remark = get_remarks_store().add({
                 "user_name": user,
                 "date": now_ist().date().isoformat(),
                 "time": now_ist().strftime("%H:%M:%S"),
                 "remark": remark_text.strip().upper()
-            }).execute()
+            })
+            if get_replica():
+                get_replica().merge_remarks([saved_remark])
             st.success("✅ Remark saved successfully")
         except Exception as e:
             st.error(e)
 
     # My recent remarks
     with st.expander("📋 My Recent Remarks"):
-        all_remarks = load_remarks()
-        my_remarks = [r for r in all_remarks if r.get("user_name","").lower() == user_clean]
+        my_remarks = get_remarks_store().recent_for_user(user)
         if not my_remarks:
             st.info("No remarks yet.")
         else:
-            rm_df = pd.DataFrame(my_remarks[:10])[["date","time","remark"]]
+            rm_df = pd.DataFrame(my_remarks)[["date","time","remark"]]
             st.dataframe(rm_df, use_container_width=True, hide_index=True)
 
+@timed_fragment("user: punch")
+def punch_section(user, user_clean, today):
+    # a photo or a button click reruns only this fragment: the fix is checked again here, and a stale
+    # one goes back through a full run, which asks the browser again and re-checks the distance
+    fix = st.session_state.get("gps_fix")
+    if (fix is None or time.time() - fix["at"] > GPS_MAX_AGE_SECONDS or not fix.get("nearest")
+            or fix["nearest"]["distance"] > ALLOWED_DISTANCE):
+        st.rerun()
+    lat, lon, nearest_wh = fix["lat"], fix["lon"], fix["nearest"]
+    pending = st.session_state.get("pending_punch")
+    if pending is not None and pending.done():
+        del st.session_state.pending_punch
+        if pending.exception() is None:
+            # confirmed: the next tap is a new punch, even with the same photo still in the camera
+            st.session_state.pop("punch_tap", None)
+        else:
+            # the cached reads showed the punch optimistically; drop them so the buttons reflect the table again
+            get_attendance_queries().clear()
+            st.error("⚠️ Your last punch could not be saved. Please punch again.")
+    is_in = (pair_sessions(today_punches(user_clean, today))["status"] == "open").any()
+
     # ===== PHOTO & PUNCH BUTTONS =====
     st.markdown("<div class='section-header'>Attendance Punch</div>", unsafe_allow_html=True)
+    flash = st.session_state.pop("flash", None)
+    if flash:
+        punch_type, punch_at, wh_name = flash
+        st.balloons()
+        if punch_type == "IN":
+            st.markdown(f"""
+            <div style="background:#d4edda;border:1.5px solid #1a7f4b;border-radius:14px;padding:24px;text-align:center;margin:12px 0;">
+              <div style="font-size:48px;margin-bottom:8px;">✅</div>
+              <div style="font-size:22px;font-weight:700;color:#155724;">Punch IN Successful!</div>
+              <div style="font-size:16px;color:#1a7f4b;margin-top:6px;">Welcome, {user.title()}</div>
+              <div style="font-size:14px;color:#6c757d;margin-top:4px;">🕐 {punch_at} &nbsp;|&nbsp; 🏭 {wh_name}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"""
+            <div style="background:#f8d7da;border:1.5px solid #c0392b;border-radius:14px;padding:24px;text-align:center;margin:12px 0;">
+              <div style="font-size:48px;margin-bottom:8px;">👋</div>
+              <div style="font-size:22px;font-weight:700;color:#721c24;">Punch OUT Successful!</div>
+              <div style="font-size:16px;color:#c0392b;margin-top:6px;">Good work today, {user.title()}!</div>
+              <div style="font-size:14px;color:#6c757d;margin-top:4px;">🕐 {punch_at} &nbsp;|&nbsp; 🏭 {wh_name}</div>
+            </div>
+            """, unsafe_allow_html=True)
     photo = st.camera_input("📸 Attendance Photo (Compulsory)")
 
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("✅ PUNCH IN", disabled=already_in, use_container_width=True):
+        if st.button("✅ PUNCH IN", disabled=sequence_error("IN", is_in) is not None, use_container_width=True):
             if not photo:
                 st.warning("📸 Punch IN ke liye photo compulsory hai")
                 st.stop()
-            photo_path = upload_photo(photo, user)
+            punch_id = punch_key(st.session_state, "IN", photo.getvalue())
+            photo_path = upload_photo(photo, user, punch_id)
             punch_time = now_ist()
-            save_row({
+            st.session_state.pending_punch = save_row({
                 "date": today.isoformat(), "name": user, "punch_type": "IN",
                 "time": punch_time.strftime("%H:%M:%S"), "lat": lat, "lon": lon,
                 "warehouse_id": nearest_wh["id"], "warehouse_name": nearest_wh["name"], "photo": photo_path,
+                "client_punch_id": punch_id,
             })
-            st.balloons()
-            st.markdown(f"""
-            <div style="background:#d4edda;border:1.5px solid #1a7f4b;border-radius:14px;padding:24px;text-align:center;margin:12px 0;">
-              <div style="font-size:48px;margin-bottom:8px;">✅</div>
-              <div style="font-size:22px;font-weight:700;color:#155724;">Punch IN Successful!</div>
-              <div style="font-size:16px;color:#1a7f4b;margin-top:6px;">Welcome, {user.title()}</div>
-              <div style="font-size:14px;color:#6c757d;margin-top:4px;">🕐 {punch_time.strftime("%I:%M %p")} &nbsp;|&nbsp; 🏭 {nearest_wh['name']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-            import time; time.sleep(2)
+            st.session_state.flash = ("IN", punch_time.strftime("%I:%M %p"), nearest_wh["name"])
             st.rerun()
 
     with col2:
-        if st.button("⛔ PUNCH OUT", disabled=(not already_in or already_out), use_container_width=True):
+        if st.button("⛔ PUNCH OUT", disabled=sequence_error("OUT", is_in) is not None, use_container_width=True):
             if not photo:
                 st.warning("📸 Punch OUT ke liye photo compulsory hai")
                 st.stop()
-            photo_path = upload_photo(photo, user)
+            punch_id = punch_key(st.session_state, "OUT", photo.getvalue())
+            photo_path = upload_photo(photo, user, punch_id)
             punch_time = now_ist()
-            save_row({
+            st.session_state.pending_punch = save_row({
                 "date": today.isoformat(), "name": user, "punch_type": "OUT",
                 "time": punch_time.strftime("%H:%M:%S"), "lat": lat, "lon": lon,
                 "warehouse_id": nearest_wh["id"], "warehouse_name": nearest_wh["name"], "photo": photo_path,
+                "client_punch_id": punch_id,
             })
-            st.balloons()
-            st.markdown(f"""
-            <div style="background:#f8d7da;border:1.5px solid #c0392b;border-radius:14px;padding:24px;text-align:center;margin:12px 0;">
-              <div style="font-size:48px;margin-bottom:8px;">👋</div>
-              <div style="font-size:22px;font-weight:700;color:#721c24;">Punch OUT Successful!</div>
-              <div style="font-size:16px;color:#c0392b;margin-top:6px;">Good work today, {user.title()}!</div>
-              <div style="font-size:14px;color:#6c757d;margin-top:4px;">🕐 {punch_time.strftime("%I:%M %p")} &nbsp;|&nbsp; 🏭 {nearest_wh['name']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-            import time; time.sleep(2)
+            st.session_state.flash = ("OUT", punch_time.strftime("%I:%M %p"), nearest_wh["name"])
             st.rerun()
 
+# ================= USER PANEL =================
+if st.session_state.logged and not st.session_state.admin:
+    user = st.session_state.user
+    today = now_ist().date()
+
+    # Header
+    st.markdown(f"<p style='font-size:18px;font-weight:600;margin-bottom:4px;'>👤 Welcome, {user.title()}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='color:#6c757d;font-size:14px;margin-top:0;'>📅 {today.strftime('%A, %d %B %Y')}</p>", unsafe_allow_html=True)
+
+    # Offline punches: register the service worker and give the IndexedDB queue its endpoint and token
+    offline_config = {"endpoint": st.secrets.get("PUNCH_API_URL", "/api/punch"),
+                      "token": issue_token(user, token_secret()), "device_id": cookies.get("device_id")}
+    components.html(f"""
+    <script src="/app/static/punch-queue.js"></script>
+    <script>
+      const nav = window.parent.navigator;
+      if ("serviceWorker" in nav) nav.serviceWorker.register("/app/static/service-worker.js");
+      PunchQueue.setConfig({json.dumps(offline_config)}).then(function () {{ return PunchQueue.replay(); }});
+    </script>""", height=0)
+    st.markdown('<p style="font-size:12px;color:#6c757d;margin:0 0 8px;">📶 Weak network? <a href="/app/static/offline.html" target="_self">Punch offline</a> — it syncs automatically.</p>', unsafe_allow_html=True)
+
+    # GPS: only this panel needs it
+    warehouse_ids = get_allowed_warehouse_ids(user)
+    fix = location_fix(warehouse_ids)
+    if "gps_error" in st.session_state:
+        st.error(f"📍 Location error: {st.session_state.gps_error}")
+    if fix is None:
+        st.warning("📍 Refreshing your location..." if "gps_fix" in st.session_state else "📍 Tap the button above to get your location first.")
+        st.stop()
+    if not warehouse_ids:
+        st.error("❌ Aap kisi warehouse ke liye allowed nahi ho")
+        st.stop()
+
+    lat, lon, nearest_wh = fix["lat"], fix["lon"], fix["nearest"]
+
+    # GPS distance display
+    if not nearest_wh:
+        st.error("❌ No warehouse found")
+        st.stop()
+
+    dist_m = int(nearest_wh["distance"])
+    if nearest_wh["distance"] > ALLOWED_DISTANCE:
+        st.markdown(f'<p class="gps-far">🏭 {nearest_wh["name"]} — {dist_m}m away &nbsp;|&nbsp; ❌ Too far (limit: {ALLOWED_DISTANCE}m)</p>', unsafe_allow_html=True)
+        st.stop()
+    else:
+        st.markdown(f'<p class="gps-ok">🏭 {nearest_wh["name"]} — {dist_m}m away &nbsp;✅</p>', unsafe_allow_html=True)
+
+    accuracy = f" · ±{fix['accuracy']:.0f}m" if fix.get("accuracy") is not None else ""
+    st.markdown(f'<p style="font-size:12px;color:#aaa;margin-top:2px;">GPS: {lat:.5f}, {lon:.5f}{accuracy} · {time.time() - fix["at"]:.0f}s ago</p>', unsafe_allow_html=True)
+
+    user_clean = user.strip().lower()
+    week_ago = today - timedelta(days=6)
+    status_section(user_clean, today)
+    remark_section(user)
+    punch_section(user, user_clean, today)
+
     # My last 7 days summary
     with st.expander("📅 My Last 7 Days"):
-        from datetime import timedelta
-        week_ago = today - timedelta(days=6)
-        my_df = df[(df["name"] == user_clean) & (df["date"] >= week_ago)]
-        if my_df.empty:
+        my_sum = load_summary(week_ago, today, user=user_clean)
+        if my_sum.empty:
             st.info("No records found.")
         else:
-            summary_rows = []
-            for d in pd.date_range(week_ago, today).date:
-                day_df = my_df[my_df["date"] == d]
-                has_in  = (day_df["punch_type"] == "IN").any()
-                has_out = (day_df["punch_type"] == "OUT").any()
-                in_time  = day_df[day_df["punch_type"]=="IN"]["time"].values[0]  if has_in  else "-"
-                out_time = day_df[day_df["punch_type"]=="OUT"]["time"].values[0] if has_out else "-"
-                if has_in and has_out:
-                    t_in  = pd.to_datetime(str(d) + " " + in_time).tz_localize(IST)
-                    t_out = pd.to_datetime(str(d) + " " + out_time).tz_localize(IST)
-                    hrs = round((t_out - t_in).seconds / 3600, 1)
-                else:
-                    hrs = "-"
-                status = "Present" if has_in else "Absent"
-                summary_rows.append({"Date": d.strftime("%d %b"), "Status": status, "IN": in_time, "OUT": out_time, "Hours": hrs})
-            st.dataframe(pd.DataFrame(summary_rows), use_container_width=True, hide_index=True)
-
-# ================= ADMIN PANEL =================
-if st.session_state.logged and st.session_state.admin:
-    st.markdown("#### 🛡️ Admin Dashboard")
+            st.dataframe(calendar_view(my_sum, week_ago, today), use_container_width=True, hide_index=True)
 
-    df = load_data()
-    df["date"] = pd.to_datetime(df["date"])
-    today = now_ist().date()
-
-    date_filter = st.selectbox("📅 Date Filter", ["Today", "Yesterday", "Last 7 Days", "Custom Date Range"])
-    if date_filter == "Today":
-        filtered_df = df[df["date"].dt.date == today]
-    elif date_filter == "Yesterday":
-        filtered_df = df[df["date"].dt.date == today - pd.Timedelta(days=1)]
-    elif date_filter == "Last 7 Days":
-        filtered_df = df[(df["date"].dt.date >= today - pd.Timedelta(days=7)) & (df["date"].dt.date <= today)]
+# ================= ADMIN TAB FRAGMENTS =================
+@timed_fragment("admin: attendance table")
+def attendance_tab(attendance):
+    if attendance.empty:
+        st.warning("⚠️ No data found")
     else:
-        s, e = st.columns(2)
-        start = s.date_input("Start", today - pd.Timedelta(days=7))
-        end   = e.date_input("End", today)
-        filtered_df = df[(df["date"].dt.date >= start) & (df["date"].dt.date <= end)]
-
-    # ── Stat cards ──
-    all_users = list(USERS.keys())
-    today_df_admin = df[df["date"].dt.date == today].copy()
-    today_df_admin["name"] = today_df_admin["name"].astype(str).str.strip().str.lower()
-    punched_today = today_df_admin["name"].unique().tolist()
-    currently_in  = today_df_admin.groupby("name")["punch_type"].apply(
-        lambda x: (x.str.upper() == "IN").any() and not (x.str.upper() == "OUT").any()
-    )
-    in_count     = int(currently_in.sum())
-    absent_today = [u for u in all_users if u not in punched_today]
-    absent_count = len(absent_today)
-    present_count = len(punched_today)
+        # Employee filter
+        sel_emp = st.selectbox("Filter by employee", ["All"] + attendance.names())
+        display_df = attendance.df if sel_emp == "All" else attendance.user(sel_emp)
+
+        # Late arrival flag
+        display_df = display_df.assign(flag=late_flags(display_df))
+        st.dataframe(attendance.recent(display_df), use_container_width=True, hide_index=True)
+
+@timed_fragment("admin: hours worked")
+def hours_tab(attendance, start, end, daily=None):
+    replica = get_replica()
+    if attendance.empty:
+        st.info("No data for selected range.")
+    else:
+        if daily is None:
+            daily = replica.daily_hours(start, end) if replica else load_summary(start, end)
+        hw_df = hours_table(daily)
+        if hw_df.empty:
+            st.info("No complete IN-OUT pairs found.")
+        else:
+            st.dataframe(hw_df, use_container_width=True, hide_index=True)
+            total_hrs = hw_df["Hours Worked"].sum()
+            st.markdown(f"<p style='font-size:14px;font-weight:600;'>Total hours across all employees: {round(total_hrs,1)} hrs</p>", unsafe_allow_html=True)
+
+@timed_fragment("admin: calendar")
+def calendar_tab(today):
+    cal = get_presence_calendar()
+    months = [f"{today.year - (today.month - 1 - i < 0)}-{(today.month - 1 - i) % 12 + 1:02d}" for i in range(12)]
+    picked = st.selectbox("Month", months, format_func=lambda ym: f"{calendar.month_name[int(ym[5:])]} {ym[:4]}", key="cal_month")
+    year, month = int(picked[:4]), int(picked[5:])
+    first = date(year, month, 1)
+    last = min(today, date(year, month, calendar.monthrange(year, month)[1]))
+
+    # 0 absent / 1 present / 2 full shift, +4 late; days after today stay blank
+    # rows are the matrix's own names; counts and streaks join onto them, so an employee added meanwhile can't shift rows
+    matrix = cal.month_matrix(year, month)
+    names, codes = matrix.index, matrix.to_numpy()
+    cells = np.char.add(np.array(["A", "P", "F"])[codes & 3], np.where(codes & 4, "*", ""))
+    cells[:, last.day if (year, month) == (today.year, today.month) else codes.shape[1]:] = ""
+    days = [str(d) for d in matrix.columns]
+    grid = pd.DataFrame(cells, index=[n.title() for n in names], columns=days)
+    counts = cal.counts(first, last).set_index("name").reindex(names, fill_value=0)
+    streaks = cal.absence_streaks(first, last, min_days=3)
+    grid["Present"], grid["Late"], grid["Full"] = (counts[k].to_numpy() for k in ("present", "late", "complete"))
+    grid["Absent run"] = [streaks.get(n, "") for n in names]
+
+    colors = {"F": "background-color:#d4edda;color:#155724", "P": "background-color:#fff3cd;color:#856404",
+              "A": "background-color:#f8d7da;color:#721c24"}
+    st.dataframe(grid.style.map(lambda v: colors.get(v[:1], ""), subset=days), use_container_width=True)
+    st.caption("F full shift · P present, short of a full shift · A absent · * late")
+    if streaks:
+        chips = "".join(f'<span class="chip chip-absent">❌ {n.title()} · {k} days</span>' for n, k in sorted(streaks.items(), key=lambda x: -x[1]))
+        st.markdown(f"<div class='section-header'>Absent 3+ days in a row</div>{chips}", unsafe_allow_html=True)
+
+@timed_fragment("admin: photos")
+def photos_tab(attendance):
+    photos_df = attendance.df[attendance.df["photo"] != ""]
+    if photos_df.empty:
+        st.info("📸 No photos to display")
+    else:
+        f1, f2 = st.columns(2)
+        ph_names = sorted(photos_df["name"].unique().tolist())
+        sel_ph_emp = f1.selectbox("Employee", ["All"] + ph_names, key="photo_emp")
+        ph_whs = sorted(photos_df["warehouse_name"].dropna().unique().tolist())
+        sel_ph_wh = f2.selectbox("Warehouse", ["All"] + ph_whs, key="photo_wh")
+        if sel_ph_emp != "All":
+            photos_df = attendance.user(sel_ph_emp)
+            photos_df = photos_df[photos_df["photo"] != ""]
+        if sel_ph_wh != "All":
+            photos_df = photos_df[photos_df["warehouse_name"] == sel_ph_wh]
+        photos_df = photos_df.sort_values("ts", ascending=False)
+
+        PHOTOS_PER_PAGE = 12
+        pages = max(1, math.ceil(len(photos_df) / PHOTOS_PER_PAGE))
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="photo_page")
+        page_df = photos_df.iloc[(page - 1) * PHOTOS_PER_PAGE: page * PHOTOS_PER_PAGE]
+
+        # thumbnails load lazily in the browser; the full photo only opens when clicked
+        cells = []
+        for (thumb, full), (_, row) in zip(photo_urls(tuple(page_df["photo"])), page_df.iterrows()):
+            cells.append(
+                f'<div class="photo-cell"><a href="{full}" target="_blank">'
+                f'<img src="{thumb}" loading="lazy" onerror="this.onerror=null;this.src=\'{full}\';"></a>'
+                f'<div class="photo-caption">{str(row["name"]).title()} | {row["punch_type"]} | {row["ts"]:%d %b %H:%M:%S}</div></div>'
+            )
+        st.markdown(f'<div class="photo-grid">{"".join(cells)}</div>', unsafe_allow_html=True)
+        st.caption(f"Showing {len(page_df)} of {len(photos_df)} photos")
+
+@timed_fragment("admin: remarks")
+def remarks_tab(start, end):
+    replica = get_replica()
+    sel_rem = st.selectbox("Filter remarks by employee", ["All"] + sorted(USERS.keys()), key="rem_filter")
+    rem_filters = (None if sel_rem == "All" else sel_rem, start.isoformat(), end.isoformat())
+    # keyset pages: remember the cursor of every page we've walked through so Previous works
+    if st.session_state.get("rem_filters") != rem_filters:
+        st.session_state.rem_filters = rem_filters
+        st.session_state.rem_cursors = [None]
+    cursors = st.session_state.rem_cursors
+    remarks_data, next_cursor = (replica or get_remarks_store()).page(*rem_filters, before_id=cursors[-1])
+    if not remarks_data:
+        st.info("📝 No remarks found")
+    else:
+        st.dataframe(pd.DataFrame(remarks_data)[["user_name","date","time","remark"]], use_container_width=True, hide_index=True)
+    r1, r2, r3 = st.columns([1, 2, 1])
+    if r1.button("← Previous", key="rem_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun(scope="fragment")
+    r2.caption(f"Page {len(cursors)}")
+    if r3.button("Next →", key="rem_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun(scope="fragment")
+
+@timed_fragment("admin: export")
+def export_tab(attendance, start, end, today):
+    replica = get_replica()
+    st.markdown("#### Download attendance data")
+    if attendance.empty:
+        st.warning("No data to export.")
+    else:
+        fmt = st.radio("Format", ["csv", "parquet"] if parquet_available() else ["csv"],
+                       format_func=str.upper, horizontal=True, key="export_fmt")
+        export_filters = (start.isoformat(), end.isoformat(), fmt)
+        for kind, label, name, pages in (
+            ("export_attendance", "Attendance", "attendance",
+             lambda: replica.iter_pages(start, end) if replica else hot_and_cold(
+                 iter_pages(get_supabase(), "attendance", start.isoformat(), end.isoformat()), get_archive(), "attendance", start, end)),
+            ("export_hours", "Hours Summary", "hours_summary",
+             lambda: hours_pages(replica.iter_daily_pages(start, end)) if replica else iter_hours_pages(get_supabase(), start.isoformat(), end.isoformat())),
+            ("export_sessions", "Shift Sessions", "shift_sessions",
+             lambda: session_pages(event_chunks(start, end), start.isoformat(), end.isoformat())),
+        ):
+            if st.button(f"⚙️ Prepare {label} export", key=f"{kind}_prepare", use_container_width=True):
+                with st.spinner(f"Building {label.lower()} export..."):
+                    prepare_export(kind, name, pages(), fmt, export_filters)
+            ready = st.session_state.get(kind)
+            if not ready or ready["filters"] != export_filters:
+                continue
+            if not ready["rows"]:
+                st.info(f"No {label.lower()} rows for the selected range.")
+                continue
+            with open(ready["path"], "rb") as f:
+                st.download_button(
+                    label=f"📥 Download {label} as {fmt.upper()} ({ready['rows']:,} rows)",
+                    data=f,
+                    file_name=f"{name}_{today}.{fmt}",
+                    mime=FORMATS[fmt],
+                    on_click="ignore",
+                    use_container_width=True
+                )
+
+@timed_fragment("admin: presence board", run_every=10)
+def presence_board(total_records):
+    board = get_presence().snapshot()
+    present_count, in_count, absent_count = len(board["present"]), len(board["in"]), len(board["absent"])
 
     c1, c2, c3, c4 = st.columns(4)
     with c1:
@@ -541,151 +746,116 @@ if st.session_state.logged and st.session_state.admin:
     with c3:
         st.markdown(f'<div class="metric-card"><div class="metric-label">Absent Today</div><div class="metric-value metric-red">{absent_count}</div></div>', unsafe_allow_html=True)
     with c4:
-        st.markdown(f'<div class="metric-card"><div class="metric-label">Total Records</div><div class="metric-value metric-orange">{len(filtered_df)}</div></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><div class="metric-label">Total Records</div><div class="metric-value metric-orange">{total_records}</div></div>', unsafe_allow_html=True)
 
     st.markdown("")
 
     # ── Who is IN right now ──
     if in_count > 0:
-        in_names = currently_in[currently_in].index.tolist()
-        chips = "".join([f'<span class="chip">✅ {n.title()}</span>' for n in in_names])
+        chips = "".join([f'<span class="chip">✅ {n.title()}</span>' for n in board["in"]])
         st.markdown(f"<div class='section-header'>Currently Punched IN</div>{chips}", unsafe_allow_html=True)
 
     # ── Absent list ──
     if absent_count > 0:
         with st.expander(f"🔴 Absent Today ({absent_count} employees)"):
-            chips = "".join([f'<span class="chip chip-absent">❌ {n.title()}</span>' for n in absent_today])
+            chips = "".join([f'<span class="chip chip-absent">❌ {n.title()}</span>' for n in board["absent"]])
             st.markdown(chips, unsafe_allow_html=True)
 
     st.markdown("")
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+@timed_fragment("admin: performance")
+def performance_panel():
+    timings = get_timings()
+    st.caption("Last 500 samples per operation across all sessions. Full reruns execute the whole script; "
+               "sections marked (alone) reran as a fragment without it.")
+    st.dataframe(timings.summary(), use_container_width=True, hide_index=True)
+    st.dataframe(timings.counters({
+        "directory": get_directory().stats(),
+        "attendance queries": get_attendance_queries().stats(),
+        "summary queries": get_summary_queries().stats(),
+        "shared cache": get_cache().stats(),
+    }), use_container_width=True, hide_index=True)
+    d = get_directory().stats()
+    uploads = get_photo_queue().status()
+    writes = get_punch_writer().status()
+    reads = get_parallel_reads().stats()
+    st.caption(f"Directory: {d['devices']} devices · {d['users_with_warehouses']} users with warehouses · {d['reloads']} reloads "
+               f"&nbsp;|&nbsp; Photo queue: pending {uploads['pending']} · uploaded {uploads['uploaded']} · "
+               f"retries {uploads['retries']} · failed {uploads['failed']} "
+               f"&nbsp;|&nbsp; Punch writer: pending {writes['pending']} · written {writes['written']} in {writes['batches']} batches · "
+               f"duplicates {writes['duplicates']} · retries {writes['retries']} · failed {writes['failed']} "
+               f"&nbsp;|&nbsp; Parallel reads: {reads['batches']} batches · timeouts {reads['timeouts']} · failures {reads['failures']}")
+    st.download_button("📥 Download timings (JSON)", timings.export(), file_name=f"perf_{now_ist():%Y%m%d_%H%M%S}.json",
+                       mime="application/json", on_click="ignore")
+
+# ================= ADMIN PANEL =================
+if st.session_state.logged and st.session_state.admin:
+    st.markdown("#### 🛡️ Admin Dashboard")
+    uploads = get_photo_queue().status()
+    if uploads["pending"] or uploads["failed"]:
+        st.caption(f"📤 Photo uploads — pending: {uploads['pending']} · retries: {uploads['retries']} · failed: {uploads['failed']}")
+
+    replica = get_replica()
+    today = now_ist().date()
+
+    date_filter = st.selectbox("📅 Date Filter", ["Today", "Yesterday", "Last 7 Days", "Custom Date Range"])
+    if date_filter == "Today":
+        start = end = today
+    elif date_filter == "Yesterday":
+        start = end = today - timedelta(days=1)
+    elif date_filter == "Last 7 Days":
+        start, end = today - timedelta(days=7), today
+    else:
+        s, e = st.columns(2)
+        start = s.date_input("Start", today - pd.Timedelta(days=7))
+        end   = e.date_input("End", today)
+
+    # ── Independent reads, issued together: the page waits for the slowest one, not their sum ──
+    # stores are resolved here, on the script thread; the pool threads only make the calls
+    attendance_queries, summary_queries, directory = get_attendance_queries(), get_summary_queries(), get_directory()
+    remarks_source = replica or get_remarks_store()
+    rem_sel = st.session_state.get("rem_filter", "All")
+    loaded, failed = get_parallel_reads().run({
+        "attendance": (lambda: AttendanceFrame.from_rows(replica.range_frame(start, end))) if replica
+                      else (lambda: attendance_queries.fetch(start, end)),
+        "hours": (lambda: replica.daily_hours(start, end)) if replica
+                 else (lambda: summary_queries.fetch(start, end, columns=SUMMARY_COLUMNS)),
+        # warms the first remarks page and the device / warehouse directory for the tabs below
+        "remarks": lambda: remarks_source.page(None if rem_sel == "All" else rem_sel, start.isoformat(), end.isoformat()),
+        "directory": directory.refresh,
+    }, timeout=QUERY_TIMEOUT)
+    if "attendance" in failed:
+        st.error(f"❌ Attendance could not be loaded: {failed['attendance']}")
+        st.stop()
+    attendance = loaded["attendance"]
+
+    # ── Stat cards, IN / absent chips: live from the presence board ──
+    presence_board(len(attendance))
+
+    tab1, tab2, tab_cal, tab3, tab4, tab5 = st.tabs([
         "📊 Attendance Table",
         "⏱️ Hours Worked",
+        "🗓️ Monthly Calendar",
         "📸 Photos",
         "📝 Remarks",
         "📥 Export"
     ])
 
     with tab1:
-        if filtered_df.empty:
-            st.warning("⚠️ No data found")
-        else:
-            # Employee filter
-            emp_names = sorted(filtered_df["name"].astype(str).str.strip().str.lower().unique().tolist())
-            sel_emp = st.selectbox("Filter by employee", ["All"] + emp_names)
-            display_df = filtered_df if sel_emp == "All" else filtered_df[filtered_df["name"].str.lower().str.strip() == sel_emp]
-
-            # Late arrival flag
-            display_df = display_df.copy()
-            display_df["name_clean"] = display_df["name"].astype(str).str.strip().str.lower()
-            display_df["punch_type_clean"] = display_df["punch_type"].astype(str).str.strip().str.upper()
-
-            def flag_late(row):
-                if row["punch_type_clean"] != "IN":
-                    return ""
-                try:
-                    t = datetime.strptime(str(row["time"]), "%H:%M:%S")
-                    if t.hour > LATE_AFTER_HOUR or (t.hour == LATE_AFTER_HOUR and t.minute >= LATE_AFTER_MINUTE):
-                        return "⚠️ Late"
-                except:
-                    pass
-                return ""
-
-            display_df["flag"] = display_df.apply(flag_late, axis=1)
-            st.dataframe(display_df.drop(columns=["name_clean","punch_type_clean"], errors="ignore"), use_container_width=True)
-
+        attendance_tab(attendance)
     with tab2:
-        if filtered_df.empty:
-            st.info("No data for selected range.")
-        else:
-            hours_df = filtered_df.copy()
-            hours_df["name"]       = hours_df["name"].astype(str).str.strip().str.lower()
-            hours_df["punch_type"] = hours_df["punch_type"].astype(str).str.strip().str.upper()
-            hours_df["date_only"]  = pd.to_datetime(hours_df["date"]).dt.date
-
-            rows = []
-            for (name, date_val), grp in hours_df.groupby(["name","date_only"]):
-                in_rows  = grp[grp["punch_type"]=="IN"]
-                out_rows = grp[grp["punch_type"]=="OUT"]
-                if not in_rows.empty and not out_rows.empty:
-                    try:
-                        t_in  = pd.to_datetime(str(date_val)+" "+in_rows.iloc[0]["time"]).tz_localize(IST)
-                        t_out = pd.to_datetime(str(date_val)+" "+out_rows.iloc[0]["time"]).tz_localize(IST)
-                        hrs   = round((t_out - t_in).seconds / 3600, 2)
-                        overtime = round(max(hrs - SHIFT_HOURS, 0), 2)
-                        rows.append({"Employee": name.title(), "Date": date_val, "IN": in_rows.iloc[0]["time"], "OUT": out_rows.iloc[0]["time"], "Hours Worked": hrs, "Overtime": overtime})
-                    except:
-                        pass
-
-            if not rows:
-                st.info("No complete IN-OUT pairs found.")
-            else:
-                hw_df = pd.DataFrame(rows).sort_values(["Date","Employee"])
-                st.dataframe(hw_df, use_container_width=True, hide_index=True)
-                total_hrs = hw_df["Hours Worked"].sum()
-                st.markdown(f"<p style='font-size:14px;font-weight:600;'>Total hours across all employees: {round(total_hrs,1)} hrs</p>", unsafe_allow_html=True)
-
+        hours_tab(attendance, start, end, loaded.get("hours"))
+    with tab_cal:
+        calendar_tab(today)
     with tab3:
-        if filtered_df.empty:
-            st.info("📸 No photos to display")
-        else:
-            for _, row in filtered_df.iterrows():
-                if "photo" in filtered_df.columns and row.get("photo"):
-                    url = supabase.storage.from_("attendance-photos").get_public_url(row["photo"])
-                    st.image(url, caption=f"{row['name']} | {row['punch_type']}", width=220)
-
+        photos_tab(attendance)
     with tab4:
-        remarks_data = load_remarks()
-        if not remarks_data:
-            st.info("📝 No remarks found")
-        else:
-            remarks_df = pd.DataFrame(remarks_data)
-            # Employee filter for remarks
-            rem_names = sorted(remarks_df["user_name"].astype(str).str.lower().unique().tolist())
-            sel_rem = st.selectbox("Filter remarks by employee", ["All"] + rem_names, key="rem_filter")
-            show_rem = remarks_df if sel_rem == "All" else remarks_df[remarks_df["user_name"].str.lower() == sel_rem]
-            st.dataframe(show_rem[["user_name","date","time","remark"]], use_container_width=True, hide_index=True)
-
+        remarks_tab(start, end)
     with tab5:
-        st.markdown("#### Download attendance data")
-        if filtered_df.empty:
-            st.warning("No data to export.")
-        else:
-            csv = filtered_df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name=f"attendance_{today}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-            # Hours worked export
-            hours_df2 = filtered_df.copy()
-            hours_df2["name"]       = hours_df2["name"].astype(str).str.strip().str.lower()
-            hours_df2["punch_type"] = hours_df2["punch_type"].astype(str).str.strip().str.upper()
-            hours_df2["date_only"]  = pd.to_datetime(hours_df2["date"]).dt.date
-            hw_rows = []
-            for (name, date_val), grp in hours_df2.groupby(["name","date_only"]):
-                in_rows  = grp[grp["punch_type"]=="IN"]
-                out_rows = grp[grp["punch_type"]=="OUT"]
-                if not in_rows.empty and not out_rows.empty:
-                    try:
-                        t_in  = pd.to_datetime(str(date_val)+" "+in_rows.iloc[0]["time"]).tz_localize(IST)
-                        t_out = pd.to_datetime(str(date_val)+" "+out_rows.iloc[0]["time"]).tz_localize(IST)
-                        hrs   = round((t_out - t_in).seconds / 3600, 2)
-                        hw_rows.append({"Employee": name.title(), "Date": date_val, "IN": in_rows.iloc[0]["time"], "OUT": out_rows.iloc[0]["time"], "Hours Worked": hrs})
-                    except:
-                        pass
-            if hw_rows:
-                hw_csv = pd.DataFrame(hw_rows).to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    label="📥 Download Hours Summary as CSV",
-                    data=hw_csv,
-                    file_name=f"hours_summary_{today}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+        export_tab(attendance, start, end, today)
+
+    with st.expander("⏱️ Performance"):
+        performance_panel()
 
 # ================= LOGOUT =================
 if st.session_state.logged:
@@ -694,3 +864,8 @@ if st.session_state.logged:
         st.session_state.clear()
         st.query_params.clear()
         st.rerun()
+
+get_timings().record(
+    "full rerun: " + ("admin" if st.session_state.get("admin") else "user" if st.session_state.get("logged") else "login"),
+    time.perf_counter() - run_started,
+)
@@ -0,0 +1,203 @@
+import argparse
+import calendar
+import json
+import os
+import threading
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+ARCHIVED_TABLES = ("attendance", "attendance_remarks")
+
+
+def month_bounds(month):
+    y, m = int(month[:4]), int(month[5:7])
+    return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+
+
+class Archive:
+    """Closed months of the hot tables as month-partitioned, zstd-compressed Parquet, local or in object storage.
+
+    <root>/<table>/month=YYYY-MM/part.parquet holds a month's rows and <root>/index.json lists the
+    months per table with their row counts and id ranges. The root is any pyarrow filesystem URI:
+    a local path (read memory-mapped) or e.g. s3://bucket/prefix?endpoint_override=... ; pyarrow
+    is imported on first use.
+    """
+
+    def __init__(self, url):
+        from pyarrow import fs
+
+        if "://" not in url:
+            url = os.path.abspath(url)
+            os.makedirs(url, exist_ok=True)
+        self.fs, self.root = fs.FileSystem.from_uri(url)
+        self.local = isinstance(self.fs, fs.LocalFileSystem)
+        self.reads = 0
+        self._index = {}
+        self._index_mtime = None
+        self._lock = threading.Lock()
+
+    # ---------- index ----------
+    def months(self, table):
+        """{"YYYY-MM": {rows, min_id, max_id, bytes, archived_at}} for every archived month of `table`."""
+        return dict(self._load_index().get(table, {}))
+
+    def _load_index(self):
+        from pyarrow.fs import FileType
+
+        # one stat per read; the JSON is only parsed again after the job rewrote it
+        info = self.fs.get_file_info(f"{self.root}/index.json")
+        if info.type == FileType.NotFound:
+            return {}
+        with self._lock:
+            if info.mtime is None or info.mtime != self._index_mtime:
+                with self.fs.open_input_stream(info.path) as f:
+                    self._index = json.loads(f.read())
+                self._index_mtime = info.mtime
+            return self._index
+
+    def _save_index(self, index):
+        path = f"{self.root}/index.json"
+        with self.fs.open_output_stream(path + ".tmp") as f:
+            f.write(json.dumps(index, indent=2, sort_keys=True).encode())
+        self.fs.move(path + ".tmp", path)
+
+    def _path(self, table, month):
+        return f"{self.root}/{table}/month={month}/part.parquet"
+
+    # ---------- reads ----------
+    def read(self, table, start=None, end=None, columns=None, **equals):
+        """Archived rows of `table` dated start..end as dicts, like a Supabase response; `equals` adds column == value filters."""
+        import pyarrow.parquet as pq
+
+        filters = [("date", ">=", str(start)[:10])] if start else []
+        filters += [("date", "<=", str(end)[:10])] if end else []
+        filters += [(c, "==", v) for c, v in equals.items() if v is not None]
+        rows = []
+        for month in self._overlapping(table, start, end):
+            part = pq.read_table(self._path(table, month), columns=list(columns) if columns else None, filesystem=self.fs,
+                                 filters=filters or None, memory_map=self.local, partitioning=None)
+            rows.extend(part.to_pylist())
+        return rows
+
+    def iter_pages(self, table, start, end, page_size=5000):
+        """export.write_csv / write_parquet input: the archived rows in start..end, a record batch at a time."""
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        for month in self._overlapping(table, start, end):
+            part = pq.ParquetFile(self._path(table, month), memory_map=self.local, filesystem=self.fs)
+            for batch in part.iter_batches(batch_size=page_size):
+                dates = batch.column("date")
+                batch = batch.filter(pc.and_(pc.greater_equal(dates, str(start)[:10]), pc.less_equal(dates, str(end)[:10])))
+                if batch.num_rows:
+                    yield batch.to_pylist()
+
+    def ids(self, table, start, end):
+        return np.array([r["id"] for r in self.read(table, start, end, columns=["id"])], dtype=np.int64)
+
+    def _overlapping(self, table, start, end):
+        months = sorted(self._load_index().get(table, {}))
+        first, last = str(start or "0000-01")[:7], str(end or "9999-12")[:7]
+        for month in months:
+            if first <= month <= last:
+                with self._lock:
+                    self.reads += 1
+                yield month
+
+    # ---------- writes ----------
+    def write_month(self, table, month, rows):
+        """Merge rows into the month's partition (by id; these win), read it back and index it; returns the stored ids."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._path(table, month)
+        self.fs.create_dir(path.rsplit("/", 1)[0])
+        merged = {r["id"]: r for r in (self.read(table, *month_bounds(month)) if month in self.months(table) else [])}
+        merged.update((r["id"], r) for r in rows)
+        ordered = [merged[i] for i in sorted(merged)]
+        with self.fs.open_output_stream(path + ".tmp") as f:
+            pq.write_table(pa.Table.from_pylist(ordered), f, compression="zstd")
+        self.fs.move(path + ".tmp", path)
+        stored = pq.read_table(path, columns=["id"], filesystem=self.fs, partitioning=None).column("id").to_numpy()
+        index = dict(self._load_index())
+        index[table] = {**index.get(table, {}), month: {
+            "rows": int(len(stored)), "min_id": int(stored.min()), "max_id": int(stored.max()),
+            "bytes": self.fs.get_file_info(path).size, "archived_at": datetime.now(timezone.utc).isoformat(),
+        }}
+        self._save_index(index)
+        return stored
+
+
+def hot_and_cold(hot_pages, archive, table, start, end, page_size=5000):
+    """Archived pages for start..end, then the hot pages minus rows also archived (a run that stopped before its delete)."""
+    if archive is None:
+        yield from hot_pages
+        return
+    cold_ids = archive.ids(table, start, end)
+    yield from archive.iter_pages(table, start, end, page_size)
+    for page in hot_pages:
+        if len(cold_ids):
+            keep = ~np.isin(np.array([r["id"] for r in page], dtype=np.int64), cold_ids)
+            page = [r for r, k in zip(page, keep) if k]
+        if page:
+            yield page
+
+
+def closed_months(client, table, keep_months, today=None):
+    """Months with rows in the hot table that ended before the last keep_months (this one included)."""
+    today = today or date.today()
+    y, m = divmod(today.year * 12 + today.month - 1 - (keep_months - 1), 12)
+    cutoff = f"{y:04d}-{m + 1:02d}"
+    res = client.table(table).select("date").order("date").limit(1).execute()
+    if not res.data:
+        return []
+    month, months = str(res.data[0]["date"])[:7], []
+    while month < cutoff:
+        months.append(month)
+        y, m = int(month[:4]), int(month[5:7])
+        month = f"{y + m // 12:04d}-{m % 12 + 1:02d}"
+    return months
+
+
+def archive_closed_months(client, archive, keep_months=3, tables=ARCHIVED_TABLES, page_size=5000, delete_chunk=500,
+                          today=None, dry_run=False):
+    """Move every closed month out of the hot tables; returns {table: rows moved}.
+
+    Per month: page the rows out, write and read back the partition, index it, and only then
+    delete exactly those ids from the hot table. Rows that land in an archived month later
+    (e.g. offline punches) stay hot until the next run merges them in.
+    """
+    from export import iter_pages
+
+    moved = {}
+    for table in tables:
+        moved[table] = 0
+        for month in closed_months(client, table, keep_months, today):
+            first, last = month_bounds(month)
+            rows = [r for page in iter_pages(client, table, first.isoformat(), last.isoformat(), page_size=page_size) for r in page]
+            if not rows or dry_run:
+                moved[table] += len(rows)
+                continue
+            stored = archive.write_month(table, month, rows)
+            ids = [r["id"] for r in rows]
+            if not np.isin(ids, stored).all():
+                raise RuntimeError(f"{table} {month}: archived partition is missing rows; nothing was deleted")
+            for i in range(0, len(ids), delete_chunk):
+                client.table(table).delete().in_("id", ids[i:i + delete_chunk]).execute()
+            moved[table] += len(rows)
+    return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move closed months of attendance / attendance_remarks to Parquet.")
+    parser.add_argument("--keep-months", type=int, default=3, help="months kept hot, the current one included")
+    parser.add_argument("--dry-run", action="store_true", help="count the rows that would move, change nothing")
+    args = parser.parse_args()
+
+    from supabase.client import create_client
+    from config import secret
+    moved = archive_closed_months(create_client(secret("SUPABASE_URL"), secret("SUPABASE_KEY")), Archive(secret("ARCHIVE_URL")),
+                                  keep_months=args.keep_months, dry_run=args.dry_run)
+    for table, n in moved.items():
+        print(f"{table}: {n} rows {'would move' if args.dry_run else 'archived'}")
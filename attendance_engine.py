@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from config import IST, SHIFT_HOURS, LATE_AFTER_HOUR, LATE_AFTER_MINUTE, MAX_SESSION_HOURS, now_ist
+
+LATE_AFTER_SECONDS = LATE_AFTER_HOUR * 3600 + LATE_AFTER_MINUTE * 60
+MAX_SESSION_SECONDS = MAX_SESSION_HOURS * 3600
+DAILY_COLUMNS = ["name", "date", "first_in", "last_out", "hours", "overtime", "late", "sessions"]
+SESSION_COLUMNS = ["name", "date", "in_ts", "out_ts", "seconds", "status"]
+
+
+def normalize(df):
+    if "ts" in df.columns:
+        # AttendanceFrame rows are normalized at ingest
+        return df
+    out = df.copy()
+    out["name"] = out["name"].astype(str).str.strip().str.lower()
+    out["punch_type"] = out["punch_type"].astype(str).str.strip().str.upper()
+    day = pd.to_datetime(out["date"], errors="coerce")
+    out["ts"] = (day + pd.to_timedelta(out["time"].astype(str), errors="coerce")).dt.tz_localize(IST)
+    return out
+
+
+def seconds_of_day(ts):
+    return ts.dt.hour * 3600 + ts.dt.minute * 60 + ts.dt.second
+
+
+def _clock(ts):
+    # numpy formatting is ~20x faster than .dt.strftime on large frames
+    text = pd.Series(np.datetime_as_string(ts.dt.tz_localize(None).to_numpy(), unit="s"), index=ts.index).str[11:19]
+    return text.where(ts.notna(), None)
+
+
+def late_flags(df):
+    """Late marker per punch row; `df` must already be normalized."""
+    late = (df["punch_type"] == "IN") & (seconds_of_day(df["ts"]) >= LATE_AFTER_SECONDS)
+    return pd.Series(np.where(late, "⚠️ Late", ""), index=df.index)
+
+
+# ================= SESSIONS =================
+def _pair(df, now, max_seconds):
+    events = df.dropna(subset=["ts"]).sort_values(["name", "ts"], kind="stable")
+    if events.empty:
+        return pd.DataFrame(columns=SESSION_COLUMNS), events
+    codes = pd.factorize(events["name"])[0]
+    ns = events["ts"].array.asi8
+    is_in = (events["punch_type"] == "IN").to_numpy()
+    is_out = (events["punch_type"] == "OUT").to_numpy()
+    max_ns = int(max_seconds * 1e9)
+
+    same_next = np.r_[codes[1:] == codes[:-1], False]
+    # an IN pairs with the user's very next event when that is an OUT inside the window
+    paired = is_in & np.r_[is_out[1:], False] & same_next & (np.r_[np.diff(ns), 0] <= max_ns)
+    lone_in = is_in & ~paired
+    lone_out = is_out & ~np.r_[False, paired[:-1]]
+    running = lone_in & ~same_next & (pd.Timestamp(now).value - ns < max_ns)
+
+    pi, li, lo = np.flatnonzero(paired), np.flatnonzero(lone_in), np.flatnonzero(lone_out)
+    nat = np.iinfo(np.int64).min
+    in_ns = np.concatenate([ns[pi], ns[li], np.full(len(lo), nat)])
+    out_ns = np.concatenate([ns[pi + 1], np.full(len(li), nat), ns[lo]])
+    in_ts = pd.Series(in_ns.view("M8[ns]")).dt.tz_localize("UTC").dt.tz_convert(IST)
+    out_ts = pd.Series(out_ns.view("M8[ns]")).dt.tz_localize("UTC").dt.tz_convert(IST)
+    first = in_ts.fillna(out_ts)
+    sessions = pd.DataFrame({
+        "name": events["name"].take(np.concatenate([pi, li, lo])).reset_index(drop=True),
+        "date": np.datetime_as_string(first.dt.tz_localize(None).to_numpy(dtype="datetime64[D]")),
+        "in_ts": in_ts,
+        "out_ts": out_ts,
+        "seconds": np.concatenate([(ns[pi + 1] - ns[pi]) / 1e9, np.full(len(li) + len(lo), np.nan)]),
+        "status": np.concatenate([np.full(len(pi), "closed"), np.where(running[li], "open", "missing_out"),
+                                  np.full(len(lo), "missing_in")]),
+    }, columns=SESSION_COLUMNS)
+    order = np.lexsort((first.array.asi8, pd.factorize(sessions["name"], sort=True)[0]))
+    return sessions.iloc[order].reset_index(drop=True), events.iloc[li[running[li]]]
+
+
+def pair_sessions(df, now=None, max_seconds=MAX_SESSION_SECONDS):
+    """IN/OUT sessions of a normalized frame, in one vectorized pass over (name, ts) order.
+
+    An IN pairs with the same user's next punch when that is an OUT at most `max_seconds`
+    later, so overnight shifts and several pairs a day come out as separate sessions.
+    Leftovers are "missing_out" (or "open" while still inside the window at `now`) and
+    "missing_in". Each session is dated by its first punch.
+    """
+    return _pair(df, now or now_ist(), max_seconds)[0]
+
+
+def stream_sessions(chunks, now=None, max_seconds=MAX_SESSION_SECONDS):
+    """pair_sessions() over an unbounded history fed as time-ordered chunks.
+
+    `chunks` yields (normalized frame, end of the period it covers). Only each user's trailing
+    IN that could still be closed by a later chunk is carried over, so memory stays at one
+    chunk plus O(users). Yields (sessions, settled_before): every session dated before
+    settled_before is final.
+    """
+    carry = None
+    for frame, until in chunks:
+        events = frame if carry is None or carry.empty else pd.concat([carry, frame], ignore_index=True)
+        sessions, carry = _pair(events, until, max_seconds)
+        settled = (pd.Timestamp(until) - pd.Timedelta(seconds=max_seconds)).strftime("%Y-%m-%d")
+        yield sessions[sessions["status"] != "open"], settled
+    if carry is not None and not carry.empty:
+        yield pair_sessions(carry, now, max_seconds), "9999-12-31"
+
+
+def daily_from_sessions(sessions):
+    """Per (name, day): first IN, last OUT, hours summed over closed sessions, overtime, late, session count."""
+    if sessions.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    closed = sessions["status"] == "closed"
+    out = pd.DataFrame({
+        "name": sessions["name"].astype(str),
+        "date": sessions["date"],
+        "first_in": sessions["in_ts"],
+        "last_out": sessions["out_ts"],
+        "worked": sessions["seconds"].where(closed, 0.0),
+        "sessions": closed.astype(int),
+    }).groupby(["name", "date"], sort=False).agg(
+        first_in=("first_in", "min"), last_out=("last_out", "max"), worked=("worked", "sum"), sessions=("sessions", "sum"),
+    ).reset_index()
+    out["hours"] = (out["worked"] / 3600).round(2).where(out["sessions"] > 0)
+    out["overtime"] = (out["hours"] - SHIFT_HOURS).clip(lower=0).round(2)
+    out["late"] = (seconds_of_day(out["first_in"]) >= LATE_AFTER_SECONDS).fillna(False).astype(bool)
+    out["first_in"] = _clock(out["first_in"])
+    out["last_out"] = _clock(out["last_out"])
+    return out[DAILY_COLUMNS]
+
+
+def stream_daily(chunks, now=None, max_seconds=MAX_SESSION_SECONDS):
+    """daily_from_sessions() over stream_sessions(): yields each day's rows once no later chunk can change them."""
+    pending = []
+    for sessions, settled in stream_sessions(chunks, now, max_seconds):
+        pending.append(sessions)
+        held = pd.concat(pending, ignore_index=True)
+        ready = held["date"] < settled
+        if ready.any():
+            yield daily_from_sessions(held[ready])
+        pending = [held[~ready]]
+    # the last days are only settled by the end of the stream
+    if pending and not pending[0].empty:
+        yield daily_from_sessions(pending[0])
+
+
+def summarize(df, now=None):
+    return daily_from_sessions(pair_sessions(normalize(df), now))
+
+
+def calendar_view(summary_df, start, end):
+    days = pd.date_range(start, end).strftime("%Y-%m-%d")
+    if summary_df.empty:
+        summary_df = pd.DataFrame(columns=DAILY_COLUMNS)
+    by_day = summary_df.assign(date=summary_df["date"].astype(str).str[:10]).drop_duplicates("date").set_index("date").reindex(days)
+    hours = pd.to_numeric(by_day["hours"], errors="coerce").round(1)
+    return pd.DataFrame({
+        "Date": pd.to_datetime(days).strftime("%d %b"),
+        "Status": np.where(by_day["first_in"].notna(), "Present", "Absent"),
+        "IN": by_day["first_in"].fillna("-").to_numpy(),
+        "OUT": by_day["last_out"].fillna("-").to_numpy(),
+        "Hours": hours.astype(object).where(hours.notna(), "-").to_numpy(),
+    })
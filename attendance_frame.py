@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from config import IST
+
+PUNCH_TYPES = pd.CategoricalDtype(["IN", "OUT"])
+
+
+def _per_unique(series, fn):
+    # names / punch types / clock times repeat heavily; clean or parse each distinct value once
+    codes, uniques = pd.factorize(series)
+    return pd.Series(fn(pd.Series(uniques, dtype=object)).to_numpy()[codes], index=series.index).where(codes >= 0)
+
+
+class AttendanceFrame:
+    """Attendance rows normalized once at ingest: typed columns, sorted by (name, ts), sliceable per user.
+
+    name / warehouse_name are categoricals, punch_type is a two-value categorical (int8 codes, still
+    compares with "IN" / "OUT"), date + time are one tz-aware `ts`, lat / lon are float32. Share it
+    read-only; take a copy before adding columns.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        codes = df["name"].cat.codes.to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(codes)]
+        # code -1 is a row with no name: it belongs to nobody's slice
+        self._slices = {df["name"].cat.categories[codes[s]]: slice(s, e) for s, e in zip(starts, ends) if codes[s] >= 0}
+
+    @classmethod
+    def from_rows(cls, rows):
+        raw = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+
+        def col(name, default=None):
+            return raw[name] if name in raw.columns else pd.Series(default, index=raw.index, dtype=object)
+
+        day = pd.to_datetime(col("date"), errors="coerce")
+        clock = _per_unique(col("time"), lambda t: pd.to_timedelta(t.astype(str), errors="coerce"))
+        df = pd.DataFrame({
+            "id": pd.to_numeric(col("id"), errors="coerce").astype("Int64"),
+            "ts": (day + pd.to_timedelta(clock)).dt.tz_localize(IST),
+            "name": _per_unique(col("name", ""), lambda n: n.astype(str).str.strip().str.lower()).astype("category"),
+            "punch_type": _per_unique(col("punch_type", ""), lambda p: p.astype(str).str.strip().str.upper()).astype(PUNCH_TYPES),
+            "lat": pd.to_numeric(col("lat"), errors="coerce").astype("float32"),
+            "lon": pd.to_numeric(col("lon"), errors="coerce").astype("float32"),
+            "warehouse_id": pd.to_numeric(col("warehouse_id"), errors="coerce").astype("Int32"),
+            "warehouse_name": col("warehouse_name").astype("category"),
+            "photo": col("photo").fillna(""),
+        })
+        df = df.sort_values(["name", "ts"], kind="stable", ignore_index=True)
+        return cls(df)
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def names(self):
+        return sorted(self._slices)
+
+    def user(self, name):
+        """All rows for one employee as a view, without scanning the frame."""
+        return self.df.iloc[self._slices.get(name, slice(0, 0))]
+
+    def recent(self, df=None):
+        """Newest first with date / time text columns, for tables and CSV."""
+        out = (self.df if df is None else df).sort_values("ts", ascending=False)
+        local = out["ts"].dt.tz_localize(None)
+        out = out.drop(columns="ts")
+        out.insert(1, "date", local.dt.date)
+        out.insert(2, "time", local.dt.time)
+        return out
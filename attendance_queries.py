@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+ATTENDANCE_COLUMNS = ["date", "name", "punch_type", "time", "lat", "lon", "warehouse_id"]
+USER_PANEL_COLUMNS = ("id", "date", "name", "punch_type", "time")
+
+
+class AttendanceQueries:
+    """Date-range / per-user attendance reads pushed down to Supabase, cached per (user, range)."""
+
+    def __init__(self, client, table="attendance", page_size=1000, ttl=60, max_entries=64, frame=None, cache=None, archive=None):
+        self.client = client
+        # optional archive.Archive: closed months moved out of the table are read back from Parquet
+        self.archive = archive
+        # optional SharedCache: rows are shared with other replicas, versioned under the table name
+        self.cache = cache
+        # optional rows -> object builder (e.g. AttendanceFrame.from_rows); its result is cached and shared
+        self.frame = frame
+        self.table = table
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch(self, start, end, user=None, columns=None):
+        key = (user, start.isoformat(), end.isoformat(), tuple(columns) if columns else None)
+        version = self.cache.version(self.table) if self.cache else 0
+        with self._lock:
+            hit = self._cache.get(key)
+            fresh = hit is not None and time.monotonic() - hit[0] < self.ttl and hit[3] == version
+            if fresh:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            else:
+                self.misses += 1
+        if fresh:
+            return self._build(hit, key[3])
+        if self.cache:
+            rows = self.cache.get_or_load(self.table, repr(key), lambda: self._fetch_all(*key), self.ttl, version)
+        else:
+            rows = self._fetch_all(*key)
+        entry = [time.monotonic(), rows, None, version]
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return self._build(entry, key[3])
+
+    def note_insert(self, row):
+        with self._lock:
+            for (user, start, end, columns), entry in self._cache.items():
+                if not start <= row.get("date", "") <= end:
+                    continue
+                if user is not None and user != row.get("name"):
+                    continue
+                rows = entry[1]
+                if row.get("id") is not None:
+                    rows = [r for r in rows if r.get("id") != row["id"]]
+                # a new list, never an in-place edit: a frame may be building from the old one
+                entry[1] = [{c: row.get(c) for c in columns} if columns else dict(row)] + rows
+                entry[2] = None
+
+    def invalidate(self):
+        """After this process's writes land: other replicas refetch the table, entries here stay."""
+        if self.cache is None:
+            return
+        version = self.cache.invalidate(self.table)
+        with self._lock:
+            for entry in self._cache.values():
+                # already patched by note_insert, unless another replica wrote in between too
+                if entry[3] == version - 1:
+                    entry[3] = version
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _fetch_all(self, user, start, end, columns):
+        rows = []
+        last_id = None
+        while True:
+            select = ",".join(dict.fromkeys(("id",) + columns)) if columns else "*"
+            q = self.client.table(self.table).select(select)
+            q = q.gte("date", start).lte("date", end)
+            if user is not None:
+                q = q.eq("name", user)
+            if last_id is not None:
+                q = q.lt("id", last_id)
+            page = q.order("id", desc=True).limit(self.page_size).execute().data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]["id"]
+        if self.archive is not None:
+            # ids still hot were archived by a run that stopped before its delete; the hot copy wins
+            seen = {r["id"] for r in rows}
+            cold = self.archive.read(self.table, start, end, columns=list(dict.fromkeys(("id",) + columns)) if columns else None, name=user)
+            rows.extend(sorted((r for r in cold if r["id"] not in seen), key=lambda r: r["id"], reverse=True))
+        return rows
+
+    def _build(self, entry, columns):
+        with self._lock:
+            rows, built = entry[1], entry[2]
+        if self.frame is None:
+            return self._to_frame(rows, columns)
+        if built is None:
+            built = self.frame(rows)
+            with self._lock:
+                if entry[1] is rows:
+                    entry[2] = built
+        return built
+
+    @staticmethod
+    def _to_frame(rows, columns):
+        if not rows:
+            return pd.DataFrame(columns=list(columns or ATTENDANCE_COLUMNS))
+        return pd.DataFrame(rows)
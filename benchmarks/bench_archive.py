@@ -0,0 +1,95 @@
+"""Hot table size and cold reads before / after moving closed months to Parquet with archive.py.
+
+    python benchmarks/bench_archive.py --employees 200 --days 365 --keep-months 3 --call-ms 40
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+
+import pandas as pd
+
+from synthetic import make_punches
+from fake_supabase import FakeSupabase
+from archive import Archive, archive_closed_months, closed_months, hot_and_cold, month_bounds
+from attendance_queries import AttendanceQueries
+from export import iter_pages, write_csv
+from local_replica import LocalReplica
+
+
+def timed(fn):
+    started = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - started) * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--keep-months", type=int, default=3)
+    parser.add_argument("--call-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    today = date.today()
+    rows = make_punches(args.employees, args.days, end=today)
+    remarks = [{"id": i + 1, "user_name": r["name"], "date": r["date"], "time": r["time"], "remark": "late bus", "created_at": ""}
+               for i, r in enumerate(rows[::50])]
+    db = FakeSupabase({"attendance": rows, "attendance_remarks": remarks}, call_latency=args.call_ms / 1000)
+    start, end = date.fromisoformat(rows[0]["date"]), today
+    closed = closed_months(db, "attendance", args.keep_months, today)
+    if not closed:
+        print(f"{len(rows):,} punches, all in the last {args.keep_months} months: nothing to archive")
+        return
+    root = tempfile.mkdtemp()
+    archive = Archive(os.path.join(root, "archive"))
+    # a closed month, read in full: what an admin looking back pays
+    cold_month = closed[len(closed) // 2]
+    first, last = month_bounds(cold_month)
+
+    hot_ms, hot_month = timed(lambda: AttendanceQueries(db).fetch(first, last))
+    print(f"{len(rows):,} punches, {len(remarks):,} remarks; hot read of {cold_month}: {hot_ms:7.1f} ms  rows={len(hot_month):,}")
+
+    ms, moved = timed(lambda: archive_closed_months(db, archive, keep_months=args.keep_months, today=today))
+    print(f"archive job {ms / 1000:.1f}s: " + ", ".join(f"{t} {n:,} rows moved" for t, n in moved.items()))
+    print(f"hot attendance rows {len(rows):,} -> {len(db.tables['attendance']):,}, "
+          f"remarks {len(remarks):,} -> {len(db.tables['attendance_remarks']):,}")
+
+    cold_ms, cold = timed(lambda: AttendanceQueries(db, archive=archive).fetch(first, last))
+    print(f"archive read of {cold_month}: {cold_ms:7.1f} ms  rows={len(cold):,}  same rows: "
+          f"{sorted(hot_month['id']) == sorted(cold['id'])}")
+
+    months = archive.months("attendance")
+    parquet = sum(m["bytes"] for m in months.values())
+    buf = io.StringIO()
+    write_csv(archive.iter_pages("attendance", start, end), buf, "attendance")
+    csv_bytes = len(buf.getvalue().encode())
+    print(f"{len(months)} archived months: Parquet {parquet / 1e6:.2f} MB vs CSV {csv_bytes / 1e6:.2f} MB "
+          f"({csv_bytes / parquet:.1f}x smaller)")
+
+    # an offline punch synced into an archived month after the run: stays hot, merged by the next run
+    late = {**rows[0], "id": max(r["id"] for r in rows) + 1, "time": "23:59:00"}
+    db.table("attendance").insert(late).execute()
+    archive_closed_months(db, archive, keep_months=args.keep_months, today=today)
+    exported = [r["id"] for page in hot_and_cold(iter_pages(db, "attendance", start.isoformat(), end.isoformat()),
+                                                 archive, "attendance", start, end) for r in page]
+    expected = [r["id"] for r in rows] + [late["id"]]
+    print(f"hot + archive export: {len(exported):,} rows, none lost: {sorted(exported) == sorted(expected)}, "
+          f"late row archived: {late['id'] not in {r['id'] for r in db.tables['attendance']}}")
+
+    replica = LocalReplica(db, os.path.join(root, "replica.db"), sync_every=3600, archive=archive)
+    ms, pulled = timed(replica.sync)
+    again = replica.sync()
+    print(f"replica sync with archive import {ms:.0f} ms, {pulled:,} rows (next sync {again}); "
+          f"full history: {len(replica.range_frame(start, end)) == len(expected)}")
+    hours = replica.daily_hours(first, last)
+    print(f"replica hours for {cold_month}: {len(hours):,} employee-days, "
+          f"{pd.to_numeric(hours['hours'], errors='coerce').sum():,.0f} h")
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
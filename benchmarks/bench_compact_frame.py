@@ -0,0 +1,55 @@
+"""Attendance window in memory: raw object frame re-normalized per view vs. AttendanceFrame.
+
+    python benchmarks/bench_compact_frame.py --employees 500 --days 60
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from synthetic import make_punches
+from attendance_engine import late_flags, normalize
+from attendance_frame import AttendanceFrame
+
+
+def best_ms(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    rows = make_punches(args.employees, args.days)
+    raw = pd.DataFrame(rows)
+    frame = AttendanceFrame.from_rows(rows)
+    print(f"{len(rows):,} punches  object frame {mb(raw):7.1f} MB  AttendanceFrame {mb(frame.df):7.1f} MB")
+
+    ms, _ = best_ms(lambda: AttendanceFrame.from_rows(rows))
+    print(f"build AttendanceFrame once     {ms:9.1f} ms")
+    ms, _ = best_ms(lambda: late_flags(normalize(raw)))
+    print(f"legacy normalize + late flags  {ms:9.1f} ms  (every view, every rerun)")
+    ms, _ = best_ms(lambda: late_flags(frame.df))
+    print(f"frame late flags               {ms:9.1f} ms")
+
+    names = [f"user{i}" for i in range(0, args.employees, max(1, args.employees // 50))]
+    norm = normalize(raw)
+    ms, _ = best_ms(lambda: [norm[norm["name"] == n] for n in names])
+    print(f"per-user mask x{len(names):<3d}             {ms:9.1f} ms")
+    ms, _ = best_ms(lambda: [frame.user(n) for n in names])
+    print(f"per-user slice x{len(names):<3d}            {ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Export peak RSS and time: the old in-memory to_csv() vs. the paged export.py writers.
+
+Rows are generated from their id on request, so the source holds nothing and the
+RSS each run reports is the export's own footprint. Every mode runs in a fresh
+interpreter.
+
+    python benchmarks/bench_export.py --rows 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from fake_supabase import FakeResponse
+
+import export
+
+START = date(2025, 1, 1)
+
+
+def rss_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def make_row(i, per_day):
+    day = (START + timedelta(days=(i - 1) // per_day)).isoformat()
+    wh = i % 40
+    return {"id": i, "date": day, "name": f"user{i % 2000}", "punch_type": "IN" if i % 2 else "OUT",
+            "time": f"{9 + i % 9:02d}:{i % 60:02d}:{i * 7 % 60:02d}", "lat": 28.6 + wh * 0.01, "lon": 77.2 + wh * 0.01,
+            "warehouse_id": wh, "warehouse_name": f"WH-{wh}", "photo": f"user{i % 2000}/{day}-{i}.jpg"}
+
+
+class GeneratedQuery:
+    def __init__(self, source):
+        self.source = source
+        self.after = 0
+        self.max_rows = None
+
+    def select(self, *_):
+        return self
+
+    def gte(self, *_):
+        return self
+
+    def lte(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def gt(self, col, val):
+        self.after = val
+        return self
+
+    def limit(self, n):
+        self.max_rows = n
+        return self
+
+    def execute(self):
+        last = min(self.after + self.max_rows, self.source.rows)
+        return FakeResponse([make_row(i, self.source.per_day) for i in range(self.after + 1, last + 1)])
+
+
+class GeneratedSupabase:
+    """Serves `rows` attendance rows in id order over a year, like a year of punches across all warehouses."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.per_day = max(rows // 365, 1)
+
+    def table(self, name):
+        return GeneratedQuery(self)
+
+
+def run(mode, rows, page_size):
+    client = GeneratedSupabase(rows)
+    base = rss_mb("VmRSS")
+    started = time.perf_counter()
+    pages = export.iter_pages(client, "attendance", "2025-01-01", "2025-12-31", page_size=page_size)
+    if mode == "legacy":
+        df = pd.DataFrame([r for page in pages for r in page])
+        data = df.to_csv(index=False).encode("utf-8")
+        size, written = len(data), len(df)
+    else:
+        path, written = export.export_to_file(pages, mode, "attendance")
+        size = os.path.getsize(path)
+        os.remove(path)
+    elapsed = time.perf_counter() - started
+    print(f"{mode:8s} rows={written:>9,}  time={elapsed:6.2f}s  peak RSS +{rss_mb('VmHWM') - base:7.1f} MB  "
+          f"file={size / 1e6:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--mode", choices=["legacy", "csv", "parquet"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.rows, args.page_size)
+        return
+    modes = ["legacy", "csv"] + (["parquet"] if export.parquet_available() else [])
+    for mode in modes:
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--rows", str(args.rows),
+                        "--page-size", str(args.page_size)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Hours/overtime/late: per-group Python loop (old tab2/tab5 code) vs. the vectorized engine.
+
+    python benchmarks/bench_hours_engine.py --sizes 10000 100000 1000000 --legacy-max 100000
+"""
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from synthetic import make_punch_frame
+from attendance_engine import normalize, late_flags, summarize
+from config import IST, SHIFT_HOURS, LATE_AFTER_HOUR, LATE_AFTER_MINUTE
+
+
+def legacy_hours(filtered_df):
+    hours_df = filtered_df.copy()
+    hours_df["name"] = hours_df["name"].astype(str).str.strip().str.lower()
+    hours_df["punch_type"] = hours_df["punch_type"].astype(str).str.strip().str.upper()
+    hours_df["date_only"] = pd.to_datetime(hours_df["date"]).dt.date
+    rows = []
+    for (name, date_val), grp in hours_df.groupby(["name", "date_only"]):
+        in_rows = grp[grp["punch_type"] == "IN"]
+        out_rows = grp[grp["punch_type"] == "OUT"]
+        if not in_rows.empty and not out_rows.empty:
+            try:
+                t_in = pd.to_datetime(str(date_val) + " " + in_rows.iloc[0]["time"]).tz_localize(IST)
+                t_out = pd.to_datetime(str(date_val) + " " + out_rows.iloc[0]["time"]).tz_localize(IST)
+                hrs = round((t_out - t_in).seconds / 3600, 2)
+                rows.append({"Employee": name.title(), "Date": date_val, "Hours Worked": hrs,
+                             "Overtime": round(max(hrs - SHIFT_HOURS, 0), 2)})
+            except Exception:
+                pass
+    return pd.DataFrame(rows)
+
+
+def legacy_late(display_df):
+    display_df = display_df.copy()
+    display_df["punch_type_clean"] = display_df["punch_type"].astype(str).str.strip().str.upper()
+
+    def flag_late(row):
+        if row["punch_type_clean"] != "IN":
+            return ""
+        t = datetime.strptime(str(row["time"]), "%H:%M:%S")
+        if t.hour > LATE_AFTER_HOUR or (t.hour == LATE_AFTER_HOUR and t.minute >= LATE_AFTER_MINUTE):
+            return "⚠️ Late"
+        return ""
+
+    return display_df.apply(flag_late, axis=1)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="skip the slow loop above this size")
+    args = parser.parse_args()
+
+    print(f"{'punches':>10} {'legacy hours':>14} {'engine hours':>14} {'legacy late':>13} {'engine late':>13}")
+    for n in args.sizes:
+        df = make_punch_frame(n)
+        eng_h, summary = timed(summarize, df)
+        eng_l, _ = timed(lambda d: late_flags(normalize(d)), df)
+        if n <= args.legacy_max:
+            leg_h, legacy = timed(legacy_hours, df)
+            leg_l, _ = timed(legacy_late, df)
+            assert len(legacy) == summary["hours"].notna().sum()
+            legacy_cols = f"{leg_h:13.2f}s {leg_l:12.2f}s"
+        else:
+            legacy_cols = f"{'skipped':>14} {'skipped':>13}"
+        print(f"{n:>10} {legacy_cols.split()[0]:>14} {eng_h:13.2f}s {legacy_cols.split()[1]:>13} {eng_l:12.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Admin analytics over full history: Supabase pages + pandas vs. the local SQLite replica.
+
+    python benchmarks/bench_local_replica.py --employees 300 --days 365 --call-ms 40
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from synthetic import make_punches
+from fake_supabase import FakeSupabase
+from attendance_engine import summarize
+from attendance_queries import AttendanceQueries
+from local_replica import LocalReplica
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--call-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    rows = make_punches(args.employees, args.days)
+    start, end = rows[0]["date"], rows[-1]["date"]
+    db = FakeSupabase({"attendance": rows, "attendance_remarks": []}, call_latency=args.call_ms / 1000)
+    path = os.path.join(tempfile.mkdtemp(), "replica.db")
+    replica = LocalReplica(db, path, sync_every=3600)
+
+    started = time.perf_counter()
+    replica.sync()
+    print(f"{len(rows):,} punches, initial replica sync {time.perf_counter() - started:.1f}s ({db.calls} calls)")
+
+    def remote():
+        # a fresh AttendanceQueries each time: what every admin rerun pays once its 60s cache expires
+        return summarize(AttendanceQueries(db).fetch(pd.Timestamp(start).date(), pd.Timestamp(end).date()))
+
+    for label, fn, repeat in (
+        ("supabase + pandas hours", remote, 1),
+        ("replica hours (sessions)", lambda: replica.daily_hours(start, end), 5),
+        ("replica range frame", lambda: replica.range_frame(end, end), 5),
+    ):
+        ms, out = timed(fn, repeat)
+        print(f"{label:26s} {ms:9.1f} ms  rows={len(out):,}")
+
+    rows_added = [{**rows[-1], "id": len(rows) + 1}]
+    db.table("attendance").insert(rows_added).execute()
+    started = time.perf_counter()
+    pulled = replica.sync()
+    print(f"incremental sync of {pulled} new row(s) {(time.perf_counter() - started) * 1000:.1f} ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time to first paint of the login screen, in a fresh interpreter like a cold app process.
+
+Runs app.py under streamlit's AppTest with a stand-in cookie manager (the real one
+needs a browser round trip) and reports the cold first run, a warm rerun, and which
+heavy modules the login screen pulled in.
+
+    python benchmarks/bench_login_paint.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "numpy", "supabase", "PIL", "pyarrow")
+
+
+class ReadyCookies(dict):
+    def __init__(self, **kwargs):
+        super().__init__()
+
+    def ready(self):
+        return True
+
+    def save(self):
+        pass
+
+
+def child():
+    # `streamlit run app.py` puts the app's folder on sys.path
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import streamlit_cookies_manager
+    from streamlit.testing.v1 import AppTest
+
+    streamlit_cookies_manager.EncryptedCookieManager = ReadyCookies
+    framework = time.perf_counter() - started
+
+    def login_screen():
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+        at.secrets["SUPABASE_URL"] = "https://example.supabase.co"
+        at.secrets["SUPABASE_KEY"] = "key"
+        at.run()
+        assert not at.exception, at.exception
+        assert any(t.label == "Username" for t in at.text_input)
+        return at
+
+    started = time.perf_counter()
+    login_screen()
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    login_screen()
+    warm = time.perf_counter() - started
+    print(json.dumps({"framework": framework, "cold": cold, "warm": warm,
+                      "heavy": [m for m in HEAVY if m in sys.modules]}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    results = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, __file__, "--child"], cwd=ROOT, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for key in ("framework", "cold", "warm"):
+        print(f"{key:10s} median {statistics.median(r[key] for r in results) * 1000:8.1f} ms")
+    print(f"heavy modules loaded by the login screen: {', '.join(results[-1]['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Nearest allowed warehouse: scalar loop (old get_nearest_warehouse) vs. WarehouseIndex.
+
+    python benchmarks/bench_nearest_warehouse.py --sizes 10 1000 100000
+"""
+import argparse
+import math
+import random
+import time
+
+from fake_supabase import FakeSupabase
+from geo_index import WarehouseIndex
+from config import ALLOWED_DISTANCE
+
+
+def distance_in_meters(lat1, lon1, lat2, lon2):
+    R = 6371000
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2)
+    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def legacy_nearest(lat, lon, warehouses):
+    nearest = None
+    min_dist = float("inf")
+    for wh in warehouses:
+        if wh["lat"] is None or wh["lon"] is None:
+            continue
+        dist = distance_in_meters(lat, lon, float(wh["lat"]), float(wh["lon"]))
+        if dist < min_dist:
+            min_dist = dist
+            nearest = {"id": wh["id"], "name": wh["name"], "distance": dist}
+    return nearest
+
+
+def per_call_us(fn, queries, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for lat, lon in queries:
+            fn(lat, lon)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    print(f"{'warehouses':>10} {'loop':>12} {'index':>12} {'speedup':>8}")
+    for n in args.sizes:
+        # sites scattered over north India, roughly where the current warehouses are
+        warehouses = [{"id": i + 1, "name": f"WH-{i + 1}", "lat": rng.uniform(24, 31), "lon": rng.uniform(72, 84)}
+                      for i in range(n)]
+        allowed = {w["id"] for w in warehouses}
+        index = WarehouseIndex(FakeSupabase({"warehouses": warehouses}))
+        index.nearest(0, 0, allowed, ALLOWED_DISTANCE)  # initial load
+        queries = []
+        for _ in range(args.queries):
+            w = rng.choice(warehouses)
+            queries.append((w["lat"] + rng.uniform(-0.003, 0.003), w["lon"] + rng.uniform(-0.003, 0.003)))
+        for lat, lon in queries[:20]:
+            a, b = legacy_nearest(lat, lon, warehouses), index.nearest(lat, lon, allowed, ALLOWED_DISTANCE)
+            assert a["id"] == b["id"] or abs(a["distance"] - b["distance"]) < 1e-6
+
+        repeat = max(1, 2000 // max(n // 50, 1))
+        loop = per_call_us(lambda la, lo: legacy_nearest(la, lo, warehouses), queries, 1 if n > 10_000 else repeat)
+        idx = per_call_us(lambda la, lo: index.nearest(la, lo, allowed, ALLOWED_DISTANCE), queries, 20)
+        print(f"{n:>10} {loop:10.1f}us {idx:10.1f}us {loop / idx:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
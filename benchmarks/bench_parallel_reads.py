@@ -0,0 +1,97 @@
+"""Admin dashboard cold load: its independent Supabase reads one after another vs. through ParallelReads.
+
+Fresh stores each round, so every read goes to the (simulated) network. A --slow-ms
+round trip on the summary table shows the page waiting for its slowest read, and a
+--timeout below it shows the page going ahead without that read.
+
+    python benchmarks/bench_parallel_reads.py --call-ms 60 --slow-ms 400
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import synthetic  # noqa: F401  (puts the repo on sys.path)
+from synthetic import make_punches
+from fake_supabase import FakeSupabase
+from attendance_frame import AttendanceFrame
+from attendance_queries import AttendanceQueries
+from daily_summary import SUMMARY_TABLE, SUMMARY_COLUMNS
+from directory import Directory
+from parallel_reads import ParallelReads
+from remarks_store import RemarksStore
+
+
+class SlowTable(FakeSupabase):
+    """One table answers slower than the rest, like an unindexed range scan."""
+
+    def __init__(self, tables, call_latency, slow_table, slow_latency):
+        super().__init__(tables, call_latency=call_latency)
+        self.slow_table = slow_table
+        self.slow_latency = slow_latency
+
+    def run(self, q):
+        if q.table == self.slow_table:
+            time.sleep(self.slow_latency)
+        return super().run(q)
+
+
+def admin_reads(db, start, end):
+    attendance, summary = AttendanceQueries(db, frame=AttendanceFrame.from_rows), AttendanceQueries(db, table=SUMMARY_TABLE)
+    remarks, directory = RemarksStore(db), Directory(db)
+    return {
+        "attendance": lambda: attendance.fetch(start, end),
+        "hours": lambda: summary.fetch(start, end, columns=SUMMARY_COLUMNS),
+        "remarks": lambda: remarks.page(None, start.isoformat(), end.isoformat()),
+        "directory": directory.refresh,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--call-ms", type=float, default=60.0)
+    parser.add_argument("--slow-ms", type=float, default=400.0)
+    parser.add_argument("--timeout", type=float, default=0.25)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_punches(args.employees, 7)
+    end = date.fromisoformat(rows[-1]["date"])
+    start = end - timedelta(days=6)
+    summary = [{"id": i, "name": r["name"], "date": r["date"], "first_in": r["time"], "last_out": None, "hours": 8.0,
+                "overtime": 0.0, "late": False, "sessions": 1}
+               for i, r in enumerate((r for r in rows if r["punch_type"] == "IN"), 1)]
+    tables = {"attendance": rows, SUMMARY_TABLE: summary, "user_devices": [], "user_warehouses": [],
+              "attendance_remarks": [{"id": i, "user_name": "user1", "date": end.isoformat(), "time": "10:00:00",
+                                      "remark": "x", "created_at": ""} for i in range(1, 80)]}
+    reads = ParallelReads()
+
+    for label, slow in (("uniform latency", 0.0), (f"summary +{args.slow_ms:.0f} ms", args.slow_ms / 1000)):
+        serial = parallel = slowest = 0.0
+        for _ in range(args.rounds):
+            db = SlowTable(tables, args.call_ms / 1000, SUMMARY_TABLE, slow)
+            each = []
+            for fn in admin_reads(db, start, end).values():
+                started = time.perf_counter()
+                fn()
+                each.append(time.perf_counter() - started)
+            serial += sum(each)
+            slowest += max(each)
+            calls = db.calls
+            db = SlowTable(tables, args.call_ms / 1000, SUMMARY_TABLE, slow)
+            started = time.perf_counter()
+            values, errors = reads.run(admin_reads(db, start, end), timeout=30)
+            parallel += time.perf_counter() - started
+            assert not errors and len(values["attendance"]) == len([r for r in rows if r["date"] >= start.isoformat()])
+        print(f"{label:18s} serial {serial / args.rounds * 1000:7.1f} ms   parallel {parallel / args.rounds * 1000:7.1f} ms"
+              f"   slowest single read {slowest / args.rounds * 1000:7.1f} ms   supabase calls per load={calls}")
+
+    db = SlowTable(tables, args.call_ms / 1000, SUMMARY_TABLE, args.slow_ms / 1000)
+    started = time.perf_counter()
+    values, errors = reads.run(admin_reads(db, start, end), timeout=args.timeout)
+    print(f"timeout {args.timeout * 1000:.0f} ms      page went ahead after {(time.perf_counter() - started) * 1000:7.1f} ms"
+          f"   loaded={sorted(values)}  timed out={sorted(errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Admin stat cards: per-rerun groupby over the attendance window vs. the presence board.
+
+    python benchmarks/bench_presence.py --employees 2000
+"""
+import argparse
+import time
+from datetime import date
+
+import pandas as pd
+
+from synthetic import make_punches
+from presence import PresenceBoard
+
+
+def legacy_cards(df, users, today):
+    """The stat-card block app.py ran on every rerun."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    today_df = df[df["date"].dt.date == today].copy()
+    today_df["name"] = today_df["name"].astype(str).str.strip().str.lower()
+    punched = today_df["name"].unique().tolist()
+    currently_in = today_df.groupby("name")["punch_type"].apply(
+        lambda x: (x.str.upper() == "IN").any() and not (x.str.upper() == "OUT").any()
+    )
+    return len(punched), int(currently_in.sum()), len([u for u in users if u not in punched])
+
+
+def best_ms(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=2000)
+    args = parser.parse_args()
+
+    today = date.today()
+    rows = make_punches(args.employees, 3, end=today)
+    day = max(r["date"] for r in rows)
+    users = [f"user{i}" for i in range(args.employees)]
+    df = pd.DataFrame(rows[-5000:])
+
+    ms, cards = best_ms(lambda: legacy_cards(df, users, date.fromisoformat(day)))
+    print(f"legacy groupby per rerun  {ms:8.2f} ms  present/in/absent={cards}")
+
+    board = PresenceBoard(users, day)
+    todays = [r for r in rows if r["date"] == day]
+    started = time.perf_counter()
+    for r in todays:
+        board.apply(r)
+    per_event = (time.perf_counter() - started) / len(todays) * 1e6
+    ms, snap = best_ms(board.snapshot)
+    print(f"board apply per punch     {per_event:8.2f} us")
+    print(f"board snapshot per rerun  {ms:8.2f} ms  present/in/absent={(len(snap['present']), len(snap['in']), len(snap['absent']))}")
+
+
+if __name__ == "__main__":
+    main()
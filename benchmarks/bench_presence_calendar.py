@@ -0,0 +1,105 @@
+"""Absent lists, monthly calendars and absence streaks: DataFrame scans vs. the PresenceCalendar bitmaps.
+
+Daily summary rows for a year; the legacy side does what the dashboard would do without an
+index (list membership for absentees, one filter per employee per day for a month grid).
+
+    python benchmarks/bench_presence_calendar.py --employees 2000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+import synthetic  # noqa: F401  (puts the repo on sys.path)
+from presence_calendar import PresenceCalendar
+
+
+def make_summary(n_users, days, end, seed=5):
+    rng = random.Random(seed)
+    rows = []
+    for d in range(days, 0, -1):
+        day = (end - timedelta(days=d)).isoformat()
+        for u in range(n_users):
+            if rng.random() < 0.12:
+                continue
+            rows.append({"name": f"user{u}", "date": day, "late": rng.random() < 0.2, "hours": rng.uniform(5, 10)})
+    return pd.DataFrame(rows)
+
+
+def best_ms(fn, repeat=5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--legacy-employees", type=int, default=50, help="month grid by DataFrame filters is timed on this many and scaled")
+    args = parser.parse_args()
+
+    end = date.today().replace(day=1) - timedelta(days=1)
+    df = make_summary(args.employees, args.days, end + timedelta(days=1))
+    users = [f"user{u}" for u in range(args.employees)]
+    day = end - timedelta(days=3)
+    first = end.replace(day=1)
+    by_date = pd.to_datetime(df["date"]).dt.date
+    print(f"{len(df):,} daily rows, {args.employees} employees x {args.days} days")
+
+    def legacy_absent():
+        punched = df[df["date"] == day.isoformat()]["name"].tolist()
+        return [u for u in users if u not in punched]
+
+    def legacy_month():
+        month = df[(by_date >= first) & (by_date <= end)]
+        return [[not month[(month["name"] == u) & (month["date"] == (first + timedelta(days=d)).isoformat())].empty
+                 for d in range(end.day)] for u in users[:args.legacy_employees]]
+
+    def legacy_streaks():
+        span = df[(by_date > end - timedelta(days=90)) & (by_date <= end)]
+        seen = span.groupby("name")["date"].apply(set)
+        out = {}
+        for u in users:
+            run = best = 0
+            for d in range(90):
+                run = 0 if (end - timedelta(days=89 - d)).isoformat() in seen.get(u, ()) else run + 1
+                best = max(best, run)
+            if best >= 3:
+                out[u] = best
+        return out
+
+    cal = PresenceCalendar(users, lambda a, b: df[(by_date >= a) & (by_date <= b)])
+    started = time.perf_counter()
+    cal.month_matrix(end.year, end.month)
+    load_ms = (time.perf_counter() - started) * 1000
+    for m in range(1, 4):
+        back = first - timedelta(days=31 * m)
+        cal.month_matrix(back.year, back.month)
+
+    rows = df.tail(5000).to_dict("records")
+    started = time.perf_counter()
+    for r in rows:
+        cal.apply(r)
+    apply_us = (time.perf_counter() - started) / len(rows) * 1e6
+
+    legacy = [("absent on a day", legacy_absent, 1), ("month grid", legacy_month, args.employees / args.legacy_employees),
+              ("90-day absence streaks", legacy_streaks, 1)]
+    index = [lambda: cal.absent(day), lambda: cal.month_matrix(end.year, end.month),
+             lambda: cal.absence_streaks(end - timedelta(days=89), end)]
+    for (label, old, scale), new in zip(legacy, index):
+        old_ms, old_out = best_ms(old, repeat=1)
+        new_ms, new_out = best_ms(new)
+        print(f"{label:24s} legacy {old_ms * scale:10.1f} ms   bitmaps {new_ms * 1000:10.1f} us")
+        if label != "month grid":
+            assert (sorted(old_out) == sorted(new_out)) if isinstance(old_out, list) else old_out == new_out
+    print(f"{'load one month':24s} {load_ms:10.1f} ms   apply() per summary row {apply_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
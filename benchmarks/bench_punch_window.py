@@ -0,0 +1,89 @@
+"""Punch-window latency: full reload on every punch vs. AttendanceQueries patched by note_insert (what app.py runs).
+
+    python benchmarks/bench_punch_window.py --employees 200 --call-ms 40
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from synthetic import make_punches
+from fake_supabase import FakeSupabase
+from attendance_queries import AttendanceQueries
+
+
+class LegacyLoader:
+    """What app.py did before: a 60s cache cleared by every save_row()."""
+
+    def __init__(self, client, ttl=60):
+        self.client = client
+        self.ttl = ttl
+        self._cached = None
+        self._at = 0.0
+
+    def frame(self):
+        if self._cached is None or time.monotonic() - self._at >= self.ttl:
+            res = self.client.table("attendance").select("*").order("id", desc=True).limit(5000).execute()
+            self._cached = pd.DataFrame(res.data)
+            self._at = time.monotonic()
+        return self._cached.copy()
+
+    def save(self, row):
+        self.client.table("attendance").insert(row).execute()
+        self._cached = None
+
+
+class QueriesLoader:
+    """app.py now: the admin week range from AttendanceQueries, and each saved punch patched in with note_insert."""
+
+    def __init__(self, client):
+        self.client = client
+        self.queries = AttendanceQueries(client)
+
+    def frame(self):
+        return self.queries.fetch(date.today() - timedelta(days=6), date.today())
+
+    def save(self, row):
+        res = self.client.table("attendance").insert(row).execute()
+        self.queries.note_insert((res.data or [row])[0])
+
+
+def run(loader_cls, args):
+    client = FakeSupabase({"attendance": make_punches(n_users=60, days=90)},
+                          call_latency=args.call_ms / 1000, row_latency=args.row_us / 1e6)
+    loader = loader_cls(client)
+    loader.frame()
+    latencies = []
+    for i in range(args.employees):
+        started = time.perf_counter()
+        loader.save({"date": date.today().isoformat(), "name": f"emp{i}", "punch_type": "IN", "time": "09:00:00",
+                     "lat": 0.0, "lon": 0.0, "warehouse_id": 1})
+        # the rerun that follows st.rerun() after a punch, plus a couple of other sessions refreshing
+        for _ in range(3):
+            loader.frame()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "round_trips": client.calls,
+        "rows_sent": client.rows_sent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--call-ms", type=float, default=40.0)
+    parser.add_argument("--row-us", type=float, default=20.0)
+    args = parser.parse_args()
+    for name, cls in (("before (clear + reload)", LegacyLoader), ("after (range + note_insert)", QueriesLoader)):
+        r = run(cls, args)
+        print(f"{name:28s} p50={r['p50_ms']:8.1f}ms  p95={r['p95_ms']:8.1f}ms  "
+              f"round_trips={r['round_trips']:5d}  rows_sent={r['rows_sent']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Shift-start burst through save_row: one insert per punch vs. the batched PunchWriter.
+
+Every simulated employee taps PUNCH IN at the same moment and a share of them
+tap twice (flaky network resubmit); the backend drops a few requests to make the
+writer retry. Checks that each employee ends up with exactly one IN row.
+
+    python benchmarks/bench_punch_writer.py --employees 1000 --call-ms 40 --double-tap 0.3 --fail-every 3 --batch 100
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from fake_supabase import FakeSupabase
+from punch_writer import PunchWriter, punch_key
+
+
+class FlakySupabase(FakeSupabase):
+    """Fails every n-th write request after a round trip, like a dropped connection."""
+
+    def __init__(self, fail_every=0, **kw):
+        super().__init__(**kw)
+        self.fail_every = fail_every
+        self.writes = 0
+
+    def run(self, q):
+        if q.op != "select" and self.fail_every:
+            with self._lock:
+                self.writes += 1
+                fail = self.writes % self.fail_every == 0
+            if fail:
+                self.latency(0)
+                raise ConnectionError("connection reset")
+        return super().run(q)
+
+
+def burst(sessions, double_tap, submit):
+    """One tap per session state, threads released together; returns per-tap latencies in ms."""
+    rng = random.Random(3)
+    day = date.today().isoformat()
+    taps = []
+    for i, session in enumerate(sessions):
+        photo = f"photo-{i}".encode()
+        row = {"date": day, "name": f"emp{i}", "punch_type": "IN", "time": "09:00:00",
+               "photo": f"emp{i}/p.jpg", "client_punch_id": punch_key(session, "IN", photo)}
+        taps.append(row)
+        if rng.random() < double_tap:
+            taps.append(dict(row))
+    latencies = []
+    gate = threading.Barrier(len(taps))
+
+    def tap(row):
+        gate.wait()
+        started = time.perf_counter()
+        try:
+            submit(row)
+        except ConnectionError:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=tap, args=(row,)) for row in taps]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(taps), latencies
+
+
+def report(label, db, taps, latencies, wall):
+    per_user = Counter(r["name"] for r in db.tables["attendance"] if r["punch_type"] == "IN")
+    latencies.sort()
+    print(f"{label:22s} taps={taps:5d} calls={db.calls:5d} wall={wall:7.2f}s "
+          f"tap p50={latencies[len(latencies) // 2]:7.1f} ms p95={latencies[int(len(latencies) * 0.95)]:7.1f} ms "
+          f"rows={sum(per_user.values())} users with >1 IN={sum(1 for c in per_user.values() if c > 1)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--call-ms", type=float, default=40.0)
+    parser.add_argument("--double-tap", type=float, default=0.3)
+    parser.add_argument("--fail-every", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    sessions = [{} for _ in range(args.employees)]
+    db = FlakySupabase(args.fail_every, tables={"attendance": []}, call_latency=args.call_ms / 1000)
+    started = time.perf_counter()
+    taps, latencies = burst(sessions, args.double_tap,
+                            lambda row: db.table("attendance").insert({k: v for k, v in row.items() if k != "client_punch_id"}).execute())
+    report("legacy insert per tap", db, taps, latencies, time.perf_counter() - started)
+
+    db = FlakySupabase(args.fail_every, tables={"attendance": []}, call_latency=args.call_ms / 1000)
+    writer = PunchWriter(db, max_batch=args.batch, backoff=0.05)
+    futures = []
+    started = time.perf_counter()
+    taps, latencies = burst(sessions, args.double_tap, lambda row: futures.append(writer.submit(row)))
+    for f in futures:
+        f.exception()
+    report("PunchWriter", db, taps, latencies, time.perf_counter() - started)
+    print(f"{'':22s} {writer.status()}")
+
+    # the same taps resubmitted after they landed, through a fresh writer (another process, a restart):
+    # the sessions still hold the unconfirmed tap ids, so the unique client_punch_id turns every row into a duplicate
+    writer = PunchWriter(db, max_batch=args.batch, backoff=0.05)
+    taps, _ = burst(sessions, 0, lambda row: writer.submit(row).result())
+    print(f"{'resubmit, new writer':22s} taps={taps:5d} rows={len(db.tables['attendance'])} {writer.status()}")
+
+
+if __name__ == "__main__":
+    main()
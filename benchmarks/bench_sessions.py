@@ -0,0 +1,116 @@
+"""Session pairing vs. the old (name, date) first-IN / last-OUT hours, on a history with night and split shifts.
+
+Generates punches with a known number of worked seconds per employee, then compares
+the total each method reports, the throughput of pair_sessions(), and the streaming
+path (stream_daily over 7-day chunks) against pairing the whole history at once.
+
+    python benchmarks/bench_sessions.py --employees 500 --days 365
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_punches
+from attendance_engine import normalize, pair_sessions, daily_from_sessions, stream_daily
+from daily_summary import date_windows
+
+
+def make_history(n_users, days, seed=11):
+    """Day shifts, night shifts across midnight, split shifts with a break, and ~2% missed OUTs."""
+    rng = random.Random(seed)
+    end = date.today()
+    rows, truth = [], {}
+    for u in range(n_users):
+        kind = ("day", "night", "split")[u % 3]
+        name = f"emp{u}"
+        truth[name] = 0
+        for d in range(days, 0, -1):
+            day = end - timedelta(days=d)
+            if rng.random() < 0.1:
+                continue
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=(21 * 60 if kind == "night" else 9 * 60) + rng.randint(-30, 45))
+            if kind == "split":
+                first = timedelta(minutes=rng.randint(200, 260))
+                second = timedelta(minutes=rng.randint(200, 260))
+                gap = timedelta(minutes=rng.randint(30, 60))
+                pairs = [(start, start + first), (start + first + gap, start + first + gap + second)]
+            else:
+                pairs = [(start, start + timedelta(minutes=rng.randint(7 * 60, 10 * 60)))]
+            for t_in, t_out in pairs:
+                rows.append({"name": name, "punch_type": "IN", "date": t_in.date().isoformat(), "time": t_in.strftime("%H:%M:%S")})
+                if rng.random() < 0.02:
+                    continue
+                rows.append({"name": name, "punch_type": "OUT", "date": t_out.date().isoformat(), "time": t_out.strftime("%H:%M:%S")})
+                truth[name] += int((t_out.replace(microsecond=0) - t_in.replace(microsecond=0)).total_seconds())
+    df = pd.DataFrame(rows)
+    df.insert(0, "id", np.arange(1, len(df) + 1))
+    return df, truth
+
+
+def legacy_hours(df):
+    """What attendance_engine computed before: first IN / last OUT per (name, date), span mod 24h."""
+    ev = normalize(df)
+    day = ev["ts"].dt.tz_localize(None).dt.normalize()
+    agg = pd.DataFrame({"name": ev["name"], "date": day, "first_in": ev["ts"].where(ev["punch_type"] == "IN"),
+                        "last_out": ev["ts"].where(ev["punch_type"] == "OUT")})
+    agg = agg.groupby(["name", "date"]).agg(first_in=("first_in", "min"), last_out=("last_out", "max"))
+    return ((agg["last_out"] - agg["first_in"]).dt.total_seconds() % 86400).groupby(level="name").sum()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    df, truth = make_history(args.employees, args.days)
+    truth = pd.Series(truth)
+    events = normalize(df)
+    print(f"{len(df):,} punches, {args.employees} employees x {args.days} days")
+
+    started = time.perf_counter()
+    legacy = legacy_hours(df).reindex(truth.index).fillna(0)
+    legacy_s = time.perf_counter() - started
+    started = time.perf_counter()
+    sessions = pair_sessions(events)
+    pair_s = time.perf_counter() - started
+    daily = daily_from_sessions(sessions)
+    paired = sessions[sessions["status"] == "closed"].groupby(sessions["name"].astype(str))["seconds"].sum().reindex(truth.index).fillna(0)
+
+    for label, got, secs in (("legacy first/last", legacy, legacy_s), ("session pairing", paired, pair_s)):
+        off = (got - truth).abs()
+        print(f"{label:18s} {secs * 1000:8.1f} ms  employees with wrong total hours={int((off > 1).sum()):4d}  "
+              f"total error={off.sum() / 3600:10.1f} h")
+    print(f"{'':18s} {len(df) / pair_s / 1e6:8.2f} M punches/s  statuses={sessions['status'].value_counts().to_dict()}")
+
+    started = time.perf_counter()
+    streamed = streamed_daily(events, df["date"].min(), df["date"].max())
+    stream_s = time.perf_counter() - started
+    print(f"stream_daily (7-day chunks) {stream_s * 1000:8.1f} ms  rows={len(streamed):,}  "
+          f"identical to one-shot={same_rows(streamed, daily)}")
+
+    # day shifts only: the history ends on an OUT, so no open IN is carried past the last chunk
+    events = normalize(pd.DataFrame(make_punches(50, 3)))
+    streamed = streamed_daily(events, events["date"].min(), events["date"].max())
+    print(f"stream_daily, ending on an OUT   rows={len(streamed):,}  "
+          f"identical to one-shot={same_rows(streamed, daily_from_sessions(pair_sessions(events)))}")
+
+
+def streamed_daily(events, first, last):
+    day = events["ts"].dt.strftime("%Y-%m-%d")
+    chunks = [(events[(day >= w0.isoformat()) & (day <= w1.isoformat())], ends_at)
+              for w0, w1, ends_at in date_windows(first, last, 7)]
+    return pd.concat(list(stream_daily(iter(chunks))), ignore_index=True)
+
+
+def same_rows(a, b):
+    key = ["name", "date"]
+    return a.sort_values(key, ignore_index=True).equals(b.sort_values(key, ignore_index=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Several app replicas behind a load balancer, all missing the same range at once.
+
+Without a shared cache every session on every replica pages the range out of
+Supabase; with SharedCache over a Redis stand-in one session loads it and the
+rest wait for that result. Then one replica writes and the others must see it.
+
+    python benchmarks/bench_shared_cache.py --replicas 3 --sessions 20 --call-ms 40
+"""
+import argparse
+import threading
+import time
+from datetime import date, timedelta
+
+from synthetic import make_punches
+from fake_redis import FakeRedis
+from fake_supabase import FakeSupabase
+from attendance_queries import AttendanceQueries
+from cache_backend import RedisBackend, SharedCache
+
+
+def stampede(replicas, sessions, start, end):
+    gate = threading.Barrier(len(replicas) * sessions)
+    sizes = []
+
+    def session(queries):
+        gate.wait()
+        sizes.append(len(queries.fetch(start, end)))
+
+    threads = [threading.Thread(target=session, args=(q,)) for q in replicas for _ in range(sessions)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, set(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--call-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    rows = make_punches(args.employees, 7)
+    end = date.fromisoformat(rows[-1]["date"])
+    start = end - timedelta(days=6)
+
+    db = FakeSupabase({"attendance": rows}, call_latency=args.call_ms / 1000)
+    wall, sizes = stampede([AttendanceQueries(db) for _ in range(args.replicas)], args.sessions, start, end)
+    print(f"per-process caches   {wall:6.2f}s  supabase calls={db.calls:4d}  rows seen={sizes}")
+
+    db = FakeSupabase({"attendance": rows}, call_latency=args.call_ms / 1000)
+    redis = FakeRedis(call_latency=0.0005)
+    caches = [SharedCache(RedisBackend(redis)) for _ in range(args.replicas)]
+    replicas = [AttendanceQueries(db, cache=c) for c in caches]
+    wall, sizes = stampede(replicas, args.sessions, start, end)
+    coalesced = sum(c.stats()["coalesced"] for c in caches)
+    print(f"shared cache         {wall:6.2f}s  supabase calls={db.calls:4d}  rows seen={sizes}  "
+          f"redis calls={redis.calls}  coalesced in-process={coalesced}")
+
+    # replica 0 takes a punch; after the write lands it bumps the version and the others refetch once
+    new = {**rows[-1], "id": len(rows) + 1, "name": "user-new"}
+    db.table("attendance").insert(new).execute()
+    replicas[0].note_insert(new)
+    replicas[0].invalidate()
+    calls = db.calls
+    seen = [any(r == "user-new" for r in q.fetch(start, end)["name"]) for q in replicas]
+    print(f"after a write        every replica sees it={all(seen)}  supabase calls for the refetch={db.calls - calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class FakeRedis:
+    """In-memory stand-in for the handful of redis.Redis calls RedisBackend makes, with a per-call latency."""
+
+    def __init__(self, call_latency=0.0):
+        self.call_latency = call_latency
+        self.calls = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.call_latency:
+            time.sleep(self.call_latency)
+
+    def _live(self, key):
+        hit = self._data.get(key)
+        if hit is not None and hit[0] is not None and hit[0] < time.monotonic():
+            del self._data[key]
+            return None
+        return hit
+
+    def get(self, key):
+        self._call()
+        with self._lock:
+            hit = self._live(key)
+            return None if hit is None else hit[1]
+
+    def set(self, key, value, ex=None, nx=False):
+        self._call()
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+            return True
+
+    def incr(self, key):
+        self._call()
+        with self._lock:
+            hit = self._live(key)
+            value = int(hit[1]) + 1 if hit else 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+    def delete(self, key):
+        self._call()
+        with self._lock:
+            self._data.pop(key, None)
@@ -0,0 +1,175 @@
+import copy
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.columns = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.max_rows = None
+        self.op = "select"
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+
+    def select(self, *columns, count=None):
+        cols = ",".join(columns).replace(" ", "")
+        self.columns = None if cols in ("", "*") else cols.split(",")
+        return self
+
+    def _filter(self, col, fn):
+        self.filters.append((col, fn))
+        return self
+
+    def eq(self, col, val):
+        return self._filter(col, lambda v: v == val)
+
+    def neq(self, col, val):
+        return self._filter(col, lambda v: v != val)
+
+    def gt(self, col, val):
+        return self._filter(col, lambda v: v is not None and v > val)
+
+    def gte(self, col, val):
+        return self._filter(col, lambda v: v is not None and v >= val)
+
+    def lt(self, col, val):
+        return self._filter(col, lambda v: v is not None and v < val)
+
+    def lte(self, col, val):
+        return self._filter(col, lambda v: v is not None and v <= val)
+
+    def in_(self, col, vals):
+        vals = set(vals)
+        return self._filter(col, lambda v: v in vals)
+
+    def order(self, col, desc=False):
+        self.orders.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self.max_rows = n
+        return self
+
+    def range(self, start, end):
+        self.offset = start
+        self.max_rows = end - start + 1
+        return self
+
+    def insert(self, rows):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict="", ignore_duplicates=False, **_):
+        self.op, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        return self.db.run(self)
+
+
+class FakeBucket:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def upload(self, path, data, options=None):
+        self.db.latency(1)
+        self.db.objects[(self.name, path)] = data
+        return {"Key": path}
+
+    def get_public_url(self, path):
+        return f"https://fake.supabase.co/storage/v1/object/public/{self.name}/{path}"
+
+
+class FakeStorage:
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket):
+        return FakeBucket(self.db, bucket)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the supabase client with a simple network latency model."""
+
+    def __init__(self, tables=None, call_latency=0.0, row_latency=0.0):
+        self.tables = {k: list(v) for k, v in (tables or {}).items()}
+        self.objects = {}
+        self.call_latency = call_latency
+        self.row_latency = row_latency
+        self.calls = 0
+        self.rows_sent = 0
+        self.storage = FakeStorage(self)
+        self._lock = threading.Lock()
+        self._next_id = {k: max((r.get("id", 0) for r in v), default=0) + 1 for k, v in self.tables.items()}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def latency(self, rows):
+        with self._lock:
+            self.calls += 1
+            self.rows_sent += rows
+        delay = self.call_latency + self.row_latency * rows
+        if delay:
+            time.sleep(delay)
+
+    def run(self, q):
+        with self._lock:
+            rows = self.tables.setdefault(q.table, [])
+            if q.op == "select":
+                out = [r for r in rows if all(fn(r.get(col)) for col, fn in q.filters)]
+                for col, desc in reversed(q.orders):
+                    out.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+                end = None if q.max_rows is None else q.offset + q.max_rows
+                out = out[q.offset:end]
+                if q.columns:
+                    out = [{c: r.get(c) for c in q.columns} for r in out]
+                else:
+                    out = [dict(r) for r in out]
+            elif q.op == "delete":
+                hit = [all(fn(r.get(col)) for col, fn in q.filters) for r in rows]
+                out = [r for r, h in zip(rows, hit) if h]
+                self.tables[q.table] = [r for r, h in zip(rows, hit) if not h]
+            else:
+                payload = q.payload if isinstance(q.payload, list) else [q.payload]
+                out = []
+                keys = [k.strip() for k in (q.on_conflict or "").split(",") if k.strip()]
+                for row in copy.deepcopy(payload):
+                    existing = None
+                    if q.op == "upsert" and keys:
+                        existing = next((r for r in rows if all(r.get(k) == row.get(k) for k in keys)), None)
+                    if existing is not None and q.ignore_duplicates:
+                        continue
+                    if existing is not None:
+                        existing.update(row)
+                        out.append(dict(existing))
+                        continue
+                    if "id" not in row:
+                        row["id"] = self._next_id.get(q.table, 1)
+                        self._next_id[q.table] = row["id"] + 1
+                    rows.append(row)
+                    out.append(dict(row))
+        self.latency(len(out))
+        return FakeResponse(out)
@@ -0,0 +1,116 @@
+"""Shift-start load test for punch_api.py against the in-memory fake Supabase.
+
+Every simulated employee punches IN at the same moment (half JSON + base64
+photo, half multipart), then the whole burst is replayed to check that
+duplicates are acknowledged and not stored twice.
+
+    python benchmarks/load_punch_api.py --employees 500 --concurrency 100 --call-ms 15
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+import tornado.httpclient
+import tornado.httpserver
+import tornado.testing
+from PIL import Image
+
+from fake_supabase import FakeSupabase
+from config import USERS
+from directory import Directory
+from geo_index import WarehouseIndex
+from photo_pipeline import PhotoUploadQueue
+from punch_api import make_app
+from punch_service import PunchService, issue_token
+
+SECRET = "load-test"
+
+
+def sample_photo():
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), (90, 140, 200)).save(buf, "JPEG", quality=80)
+    return buf.getvalue()
+
+
+def multipart(fields, photo):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode() for k, v in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="photo"; filename="p.jpg"\r\n'
+                 f'Content-Type: image/jpeg\r\n\r\n'.encode() + photo + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_requests(n, photo):
+    taken_at = datetime.now(timezone.utc).isoformat()
+    requests = []
+    for i in range(n):
+        user = f"loademp{i}"
+        fields = {"client_punch_id": str(uuid.uuid4()), "punch_type": "IN", "lat": 28.6 + (i % 20) * 0.01 + 0.0005,
+                  "lon": 77.2 + (i % 20) * 0.01, "taken_at": taken_at}
+        headers = {"Authorization": "Bearer " + issue_token(user, SECRET)}
+        if i % 2:
+            body, headers["Content-Type"] = multipart(fields, photo)
+        else:
+            body = json.dumps({**fields, "photo": base64.b64encode(photo).decode()})
+            headers["Content-Type"] = "application/json"
+        requests.append((body, headers))
+    return requests
+
+
+async def burst(url, requests, concurrency):
+    client = tornado.httpclient.AsyncHTTPClient(max_clients=concurrency)
+    latencies, codes = [], {}
+
+    async def one(body, headers):
+        started = time.perf_counter()
+        res = await client.fetch(url, method="POST", body=body, headers=headers, raise_error=False, request_timeout=30)
+        latencies.append(time.perf_counter() - started)
+        codes[res.code] = codes.get(res.code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(b, h) for b, h in requests))
+    return time.perf_counter() - started, sorted(latencies), codes
+
+
+def report(label, elapsed, latencies, codes):
+    print(f"{label:8s} {len(latencies) / elapsed:8.1f} punches/s  p50={statistics.median(latencies) * 1000:7.1f}ms  "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f}ms  status={dict(sorted(codes.items()))}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--call-ms", type=float, default=15.0, help="simulated Supabase round trip")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--budget-ms", type=int, default=1500)
+    args = parser.parse_args()
+
+    USERS.update({f"loademp{i}": {"password": "x"} for i in range(args.employees)})
+    db = FakeSupabase({
+        "warehouses": [{"id": w + 1, "name": f"WH-{w + 1}", "lat": 28.6 + w * 0.01, "lon": 77.2 + w * 0.01} for w in range(20)],
+        "user_warehouses": [{"user_name": f"loademp{i}", "warehouse_id": i % 20 + 1} for i in range(args.employees)],
+    }, call_latency=args.call_ms / 1000)
+    service = PunchService(db, Directory(db), WarehouseIndex(db), PhotoUploadQueue(db))
+    server = tornado.httpserver.HTTPServer(make_app(service, SECRET, workers=args.workers, budget=args.budget_ms / 1000))
+    sock, port = tornado.testing.bind_unused_port()
+    server.add_sockets([sock])
+    url = f"http://127.0.0.1:{port}/api/punch"
+
+    requests = build_requests(args.employees, sample_photo())
+    report("punch", *await burst(url, requests, args.concurrency))
+    report("replay", *await burst(url, requests, args.concurrency))
+    stored = len(db.tables.get("attendance", []))
+    print(f"rows stored: {stored} for {args.employees} employees (expected {args.employees})")
+    server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_punches(n_users=17, days=30, end=None, seed=7):
+    rng = random.Random(seed)
+    end = end or date.today()
+    rows = []
+    for d in range(days, 0, -1):
+        day = (end - timedelta(days=d)).isoformat()
+        for u in range(n_users):
+            if rng.random() < 0.1:
+                continue
+            in_min = 9 * 60 + rng.randint(-30, 45)
+            out_min = in_min + rng.randint(7 * 60, 10 * 60)
+            wh = u % 7
+            for punch_type, minute in (("IN", in_min), ("OUT", out_min)):
+                rows.append({
+                    "id": len(rows) + 1, "date": day, "name": f"user{u}", "punch_type": punch_type,
+                    "time": f"{minute // 60 % 24:02d}:{minute % 60:02d}:{rng.randint(0, 59):02d}",
+                    "lat": 28.6 + wh * 0.01, "lon": 77.2 + wh * 0.01, "warehouse_id": wh,
+                    "warehouse_name": f"WH-{wh}", "photo": f"user{u}/{day}-{punch_type}.jpg",
+                })
+    return rows
+
+
+def make_punch_frame(n_rows, n_users=2000, seed=7):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    n_days = max(n_rows // (2 * n_users), 1)
+    pairs = n_rows // 2
+    user = rng.integers(0, n_users, pairs)
+    day = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, n_days, pairs), unit="D")
+    in_sec = 9 * 3600 + rng.integers(-1800, 2700, pairs)
+    out_sec = in_sec + rng.integers(7 * 3600, 10 * 3600, pairs)
+
+    def hms(sec):
+        sec = sec % 86400
+        return pd.Series(sec // 3600).map("{:02d}".format) + ":" + pd.Series(sec // 60 % 60).map("{:02d}".format) + ":" + pd.Series(sec % 60).map("{:02d}".format)
+
+    names = pd.Series(user).map("User{} ".format)
+    dates = pd.Series(day.strftime("%Y-%m-%d"))
+    df = pd.concat([
+        pd.DataFrame({"date": dates, "name": names, "punch_type": "IN", "time": hms(in_sec)}),
+        pd.DataFrame({"date": dates, "name": names, "punch_type": "out", "time": hms(out_sec)}),
+    ], ignore_index=True)
+    df.insert(0, "id", range(1, len(df) + 1))
+    return df
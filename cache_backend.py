@@ -0,0 +1,171 @@
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MemoryBackend:
+    """Process-local key/value store with expiry; the default when no CACHE_URL is configured."""
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if hit[0] is not None and hit[0] < time.monotonic():
+                del self._data[key]
+                return None
+            return hit[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and (hit[0] is None or hit[0] >= time.monotonic()):
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def incr(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            value = (hit[1] if hit else 0) + 1
+            self._data[key] = (None, value)
+            return value
+
+    def counter(self, key):
+        return self.get(key) or 0
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _set(self, key, value, ttl):
+        if len(self._data) >= self.max_entries:
+            now = time.monotonic()
+            self._data = {k: v for k, v in self._data.items() if v[0] is None or v[0] >= now}
+        self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+
+class RedisBackend:
+    """Shared store on any Redis-compatible server; `client` is a redis.Redis or anything with its get/set/incr/delete."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(key, pickle.dumps(value), nx=True, ex=ttl))
+
+    def incr(self, key):
+        return int(self.client.incr(key))
+
+    def counter(self, key):
+        # INCR keeps counters as plain integers, not pickles
+        raw = self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class SharedCache:
+    """Versioned, single-flight read-through cache over a MemoryBackend or RedisBackend.
+
+    Entries live under `<namespace>:<scope>:<version>:<key>`; invalidate(scope) bumps the
+    version, so every replica's next read of that scope misses. Concurrent misses on one
+    key run the loader once: threads in this process wait on its Future, other replicas
+    wait for the value behind a short lock key.
+    """
+
+    def __init__(self, backend, namespace="attendance-app", ttl=60, lock_ttl=10, poll=0.05):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.poll = poll
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def version(self, scope):
+        return self.backend.counter(f"{self.namespace}:version:{scope}")
+
+    def invalidate(self, scope):
+        """Bump the scope's version after a write has landed; returns the new version."""
+        return self.backend.incr(f"{self.namespace}:version:{scope}")
+
+    def get_or_load(self, scope, key, loader, ttl=None, version=None):
+        version = self.version(scope) if version is None else version
+        full = f"{self.namespace}:{scope}:{version}:{key}"
+        hit = self.backend.get(full)
+        if hit is not None:
+            with self._lock:
+                self.hits += 1
+            return hit[0]
+        with self._lock:
+            future = self._flights.get(full)
+            leader = future is None
+            if leader:
+                future = self._flights[full] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value = self._load(full, loader, ttl or self.ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._flights[full]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def _load(self, full, loader, ttl):
+        lock = full + ":lock"
+        owned = self.backend.add(lock, 1, self.lock_ttl)
+        deadline = time.monotonic() + self.lock_ttl
+        while not owned and time.monotonic() < deadline:
+            # another replica is loading this key; take its result when it lands
+            time.sleep(self.poll)
+            hit = self.backend.get(full)
+            if hit is not None:
+                return hit[0]
+            owned = self.backend.add(lock, 1, self.lock_ttl)
+        try:
+            value = loader()
+            # wrapped, so a cached None / empty result is still a hit
+            self.backend.set(full, (value,), ttl)
+            return value
+        finally:
+            if owned:
+                self.backend.delete(lock)
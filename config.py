@@ -0,0 +1,57 @@
+import os
+from datetime import datetime
+
+import pytz
+
+# ================= CONFIG =================
+ALLOWED_DISTANCE = 500
+IST = pytz.timezone("Asia/Kolkata")
+SHIFT_HOURS = 8.5
+LATE_AFTER_HOUR = 9
+LATE_AFTER_MINUTE = 30
+# an IN with no OUT within this many hours is a missed punch, not a running shift
+MAX_SESSION_HOURS = 16
+# a GPS fix older than this is refreshed before the punch buttons use it
+GPS_MAX_AGE_SECONDS = 300
+# per Supabase request; the admin panel also stops waiting on any one read after this long
+QUERY_TIMEOUT = 15
+
+USERS = {
+    "ajad": {"password": "1234"},
+    "jitender": {"password": "1234"},
+    "ramniwas": {"password": "1234"},
+    "lakshman": {"password": "1234"},
+    "prempatil": {"password": "1234"},
+    "mithlesh": {"password": "1234"},
+    "dharmendra": {"password": "1234"},
+    "deepak": {"password": "1234"},
+    "rajan": {"password": "1234"},
+    "shyamjeesharma": {"password": "1234"},
+    "surjesh": {"password": "1234"},
+    "bittu": {"password": "1234"},
+    "prakashkumarjha": {"password": "1234"},
+    "amit": {"password": "1234"},
+    "himanshu": {"password": "1234"},
+    "rahul": {"password": "1234"},
+    "ansh": {"password": "1234"},
+}
+SECURE_USERS = ["ansh","rahul","ajad","ramniwas","lakshman","prempatil","mithlesh","bittu"]
+ADMIN_USER = "admin"
+ADMIN_PASSWORD = "admin123"
+
+
+def now_ist():
+    return datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(IST)
+
+
+def secret(name, default=None):
+    """Environment variable first, then .streamlit/secrets.toml, for code running outside `streamlit run`."""
+    if os.environ.get(name):
+        return os.environ[name]
+    import streamlit as st
+    try:
+        return st.secrets[name]
+    except (KeyError, FileNotFoundError):
+        if default is None:
+            raise
+        return default
@@ -0,0 +1,109 @@
+import argparse
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from attendance_engine import normalize, stream_daily, summarize
+from config import IST
+
+SUMMARY_TABLE = "attendance_daily"
+SUMMARY_COLUMNS = ("id", "name", "date", "first_in", "last_out", "hours", "overtime", "late", "sessions")
+EVENT_COLUMNS = "id, date, name, punch_type, time"
+
+
+def _records(summary_df):
+    return summary_df.astype(object).where(summary_df.notna(), None).to_dict("records")
+
+
+def rollup_punch(client, row):
+    """Re-summarize the days a new punch can change: its own, and the day before for an OUT closing a night shift."""
+    day = date.fromisoformat(str(row.get("date", ""))[:10])
+    # one more day on each side, so the edge days pair exactly as they do in a full backfill
+    res = (client.table("attendance").select(EVENT_COLUMNS).eq("name", row["name"])
+           .gte("date", (day - timedelta(days=2)).isoformat()).lte("date", (day + timedelta(days=1)).isoformat()).execute())
+    summary = summarize(pd.DataFrame(res.data or [row]))
+    summary = _records(summary[summary["date"].isin([(day - timedelta(days=1)).isoformat(), day.isoformat()])])
+    if not summary:
+        return []
+    res = client.table(SUMMARY_TABLE).upsert(summary, on_conflict="name,date").execute()
+    return res.data or summary
+
+
+def date_windows(start, end, days):
+    """(first day, last day, IST midnight after it) for consecutive `days`-long windows covering start..end."""
+    window, last = date.fromisoformat(str(start)[:10]), date.fromisoformat(str(end)[:10])
+    while window <= last:
+        until = min(window + timedelta(days=days - 1), last)
+        yield window, until, IST.localize(datetime.combine(until + timedelta(days=1), datetime.min.time()))
+        window = until + timedelta(days=1)
+
+
+def iter_event_chunks(client, start, end, days=7, page_size=1000, archive=None):
+    """(normalized punches, end of window) per date window, oldest first: stream_sessions() input."""
+    for window, until, ends_at in date_windows(start, end, days):
+        rows, last_id = [], 0
+        while True:
+            page = (client.table("attendance").select(EVENT_COLUMNS).gte("date", window.isoformat()).lte("date", until.isoformat())
+                    .gt("id", last_id).order("id").limit(page_size).execute().data or [])
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            last_id = page[-1]["id"]
+        if archive is not None:
+            seen = {r["id"] for r in rows}
+            rows += [r for r in archive.read("attendance", window, until, columns=EVENT_COLUMNS.split(", ")) if r["id"] not in seen]
+        if rows:
+            yield normalize(pd.DataFrame(rows)), ends_at
+
+
+def _date_bound(client, desc):
+    res = client.table("attendance").select("date").order("date", desc=desc).limit(1).execute()
+    return str(res.data[0]["date"])[:10] if res.data else None
+
+
+def backfill(client, start=None, end=None, page_size=1000, chunk_size=500, window_days=7, archive=None):
+    cold = sorted(archive.months("attendance")) if archive is not None else []
+    start = start or min(filter(None, [_date_bound(client, desc=False), cold and f"{cold[0]}-01"]), default=None)
+    end = end or _date_bound(client, desc=True)
+    if not start or not end:
+        return 0
+    total = 0
+    for daily in stream_daily(iter_event_chunks(client, start, end, window_days, page_size, archive)):
+        summaries = _records(daily)
+        for i in range(0, len(summaries), chunk_size):
+            client.table(SUMMARY_TABLE).upsert(summaries[i:i + chunk_size], on_conflict="name,date").execute()
+        total += len(summaries)
+    return total
+
+
+def hours_table(summary_df, with_overtime=True):
+    done = summary_df.dropna(subset=["first_in", "last_out", "hours"]) if not summary_df.empty else summary_df
+    if done.empty:
+        return pd.DataFrame()
+    out = pd.DataFrame({
+        "Employee": done["name"].astype(str).str.title(),
+        "Date": pd.to_datetime(done["date"]).dt.date,
+        "IN": done["first_in"],
+        "OUT": done["last_out"],
+        "Hours Worked": done["hours"].astype(float),
+    })
+    if with_overtime:
+        out["Sessions"] = done["sessions"].astype(int)
+        out["Overtime"] = done["overtime"].astype(float)
+        out["Late"] = done["late"].map(lambda v: "⚠️ Late" if v else "")
+    return out.sort_values(["Date", "Employee"]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the attendance_daily summary table from raw punches.")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--start", help="first date to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last date to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    from supabase.client import create_client
+    from config import secret
+    from archive import Archive
+    archive = Archive(secret("ARCHIVE_URL")) if secret("ARCHIVE_URL", "") else None
+    n = backfill(create_client(secret("SUPABASE_URL"), secret("SUPABASE_KEY")), start=args.start, end=args.end, archive=archive)
+    print(f"Upserted {n} daily summaries")
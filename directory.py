@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import defaultdict
+
+
+class Directory:
+    """In-process copy of user_devices and user_warehouses, bulk-loaded and refreshed on a timer."""
+
+    def __init__(self, client, refresh_every=300, page_size=1000, cache=None):
+        self.client = client
+        # optional SharedCache: one replica reloads, the rest read its copy; device registrations bump the version
+        self.cache = cache
+        self.refresh_every = refresh_every
+        self.page_size = page_size
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._devices = {}
+        self._warehouses = {}
+        self._loaded_at = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def device_for(self, user):
+        loaded = self._maybe_reload()
+        with self._lock:
+            if user in self._devices:
+                self._tally(loaded)
+                return self._devices[user]
+            self.misses += 1
+        # unknown here may just mean another replica registered it since our last reload
+        res = self.client.table("user_devices").select("device_id").eq("user_name", user).execute()
+        device_id = res.data[0]["device_id"] if res.data else None
+        if device_id:
+            with self._lock:
+                self._devices[user] = device_id
+        return device_id
+
+    def register_device(self, user, device_id):
+        self.client.table("user_devices").upsert({"user_name": user, "device_id": device_id}).execute()
+        # other replicas reload; our own copy is patched here and stays current
+        # unless someone else wrote in between (then the bump skipped a version)
+        version = self.cache.invalidate("directory") if self.cache else None
+        with self._lock:
+            self._devices[user] = device_id
+            if version is not None and self._version == version - 1:
+                self._version = version
+
+    def warehouses_for(self, user):
+        loaded = self._maybe_reload()
+        with self._lock:
+            self._tally(loaded)
+            return list(self._warehouses.get(user, ()))
+
+    def refresh(self):
+        """Reload now if the copy is stale, e.g. alongside a page's other reads instead of on its first lookup."""
+        self._maybe_reload()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "reloads": self.reloads,
+                    "devices": len(self._devices), "users_with_warehouses": len(self._warehouses)}
+
+    def _fresh(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_every:
+            return False
+        return self.cache is None or self.cache.version("directory") == self._version
+
+    def _tally(self, loaded):
+        # lock held: a lookup that had to (re)load the copy is a miss
+        if loaded:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+    def _maybe_reload(self):
+        """True when this call loaded the copy."""
+        if self._fresh():
+            return False
+        with self._reload_lock:
+            if self._fresh():
+                return False
+            self._reload()
+            return True
+
+    def _reload(self):
+        version = self.cache.version("directory") if self.cache else 0
+        if self.cache:
+            devices, warehouses = self.cache.get_or_load("directory", "all", self._load, self.refresh_every, version)
+        else:
+            devices, warehouses = self._load()
+        with self._lock:
+            self._devices, self._warehouses = dict(devices), warehouses
+            self._loaded_at = time.monotonic()
+            self._version = version
+            self.reloads += 1
+
+    def _load(self):
+        devices = {r["user_name"]: r["device_id"] for r in self._fetch("user_devices", "user_name, device_id", ("user_name",))}
+        warehouses = defaultdict(list)
+        for r in self._fetch("user_warehouses", "user_name, warehouse_id", ("user_name", "warehouse_id")):
+            if r["warehouse_id"]:
+                warehouses[r["user_name"]].append(r["warehouse_id"])
+        return devices, dict(warehouses)
+
+    def _fetch(self, table, columns, key):
+        # offset pages are only stable over a total order; `key` is unique per row
+        rows, offset = [], 0
+        while True:
+            q = self.client.table(table).select(columns)
+            for column in key:
+                q = q.order(column)
+            page = q.range(offset, offset + self.page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            offset += self.page_size
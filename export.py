@@ -0,0 +1,110 @@
+import csv
+import tempfile
+
+import pandas as pd
+
+from attendance_engine import stream_sessions
+from daily_summary import SUMMARY_TABLE, SUMMARY_COLUMNS, hours_table
+
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+# columns and Arrow types per export, fixed up front: no single page can tell what later pages hold
+EXPORT_SCHEMAS = {
+    "attendance": {"id": "int64", "date": "string", "name": "string", "punch_type": "string", "time": "string",
+                   "lat": "float64", "lon": "float64", "warehouse_id": "int64", "warehouse_name": "string",
+                   "photo": "string", "client_punch_id": "string"},
+    "hours_summary": {"Employee": "string", "Date": "string", "IN": "string", "OUT": "string", "Hours Worked": "float64"},
+    "shift_sessions": {"Employee": "string", "Date": "string", "IN": "string", "OUT": "string", "Hours": "float64",
+                       "Status": "string"},
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iter_pages(client, table, start, end, columns="*", page_size=5000):
+    """Rows in [start, end] oldest id first, one page in memory at a time."""
+    last_id = 0
+    while True:
+        page = (client.table(table).select(columns).gte("date", start).lte("date", end)
+                .gt("id", last_id).order("id").limit(page_size).execute().data or [])
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def iter_hours_pages(client, start, end, page_size=5000):
+    return hours_pages(iter_pages(client, SUMMARY_TABLE, start, end, ",".join(SUMMARY_COLUMNS), page_size))
+
+
+def hours_pages(summary_pages):
+    for page in summary_pages:
+        out = hours_table(pd.DataFrame(page), with_overtime=False)
+        if not out.empty:
+            yield out.astype({"Date": str}).to_dict("records")
+
+
+def session_pages(chunks, start, end):
+    """One row per IN/OUT session dated start..end; `chunks` should cover a day either side (iter_event_chunks)."""
+    for sessions, _ in stream_sessions(chunks):
+        sessions = sessions[(sessions["date"] >= start) & (sessions["date"] <= end)]
+        if not sessions.empty:
+            yield sessions_table(sessions).to_dict("records")
+
+
+def sessions_table(sessions):
+    def stamp(ts):
+        return ts.dt.strftime("%Y-%m-%d %H:%M:%S").astype(object).where(ts.notna(), None)
+
+    return pd.DataFrame({
+        "Employee": sessions["name"].astype(str).str.title(),
+        "Date": sessions["date"],
+        "IN": stamp(sessions["in_ts"]),
+        "OUT": stamp(sessions["out_ts"]),
+        "Hours": (sessions["seconds"] / 3600).round(2),
+        "Status": sessions["status"],
+    })
+
+
+def write_csv(pages, f, table):
+    writer = csv.DictWriter(f, fieldnames=list(EXPORT_SCHEMAS[table]), extrasaction="ignore")
+    writer.writeheader()
+    rows = 0
+    for page in pages:
+        writer.writerows(page)
+        rows += len(page)
+    return rows
+
+
+def write_parquet(pages, path, table):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {name: getattr(pa, t)() for name, t in EXPORT_SCHEMAS[table].items()}
+    schema = pa.schema(list(types.items()))
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for page in pages:
+            # column by column: an all-null or int-vs-float column in this page still lands as the declared type
+            writer.write_table(pa.table([pa.array([r.get(name) for r in page]).cast(t) for name, t in types.items()], schema=schema))
+            rows += len(page)
+    return rows
+
+
+def export_to_file(pages, fmt, table):
+    """Stream pages of one EXPORT_SCHEMAS table into a temp file and return (path, rows); the caller deletes the file."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    tmp = tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False)
+    if fmt == "parquet":
+        tmp.close()
+        return tmp.name, write_parquet(pages, tmp.name, table)
+    with open(tmp.name, "w", newline="", encoding="utf-8") as f:
+        tmp.close()
+        return tmp.name, write_csv(pages, f, table)
@@ -0,0 +1,106 @@
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+
+log = logging.getLogger(__name__)
+
+
+def haversine_m(lat, lon, lats, lons):
+    """Distance in metres from one point to arrays of points, all in degrees."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class WarehouseIndex:
+    """In-memory grid-bucketed index over the warehouses table for nearest-site lookups.
+
+    A background thread reloads the whole table every refresh_every seconds and swaps in a new
+    snapshot, so moved, renamed and deleted warehouses are picked up while lookups never wait on I/O.
+    """
+
+    def __init__(self, client, cell_m=500, refresh_every=300, page_size=1000):
+        self.client = client
+        self.cell_deg = cell_m / 111_320
+        self.refresh_every = refresh_every
+        self.page_size = page_size
+        self.reload()
+        if refresh_every:
+            threading.Thread(target=self._refresh_loop, name="warehouse-index", daemon=True).start()
+
+    def __len__(self):
+        return len(self._sites)
+
+    def nearest(self, lat, lon, allowed_ids, max_distance):
+        """Nearest allowed site; when none is within max_distance, the nearest one anyway so callers can show how far it is."""
+        if not isinstance(allowed_ids, (set, frozenset)):
+            allowed_ids = set(allowed_ids)
+        ids, names, lats, lons, grid, pos = self._snapshot
+
+        reach_lat = max_distance / 111_320
+        reach_lon = reach_lat / max(math.cos(math.radians(lat)), 1e-6)
+        r0, r1 = math.floor((lat - reach_lat) / self.cell_deg), math.floor((lat + reach_lat) / self.cell_deg)
+        c0, c1 = math.floor((lon - reach_lon) / self.cell_deg), math.floor((lon + reach_lon) / self.cell_deg)
+        candidates = [i for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)
+                      for i in grid.get((r, c), ()) if ids[i] in allowed_ids]
+        best = _closest(lat, lon, candidates, lats, lons)
+        if best is None or best[1] > max_distance:
+            # nothing in reach: sites outside the box can still be nearer than its corners, so look at all allowed ones
+            best = _closest(lat, lon, [pos[w] for w in allowed_ids if w in pos], lats, lons)
+        if best is None:
+            return None
+        return {"id": ids[best[0]], "name": names[best[0]], "distance": best[1]}
+
+    def reload(self):
+        """Read the whole table and swap in a new snapshot."""
+        fetched, last_id = [], None
+        while True:
+            q = self.client.table("warehouses").select("id, name, lat, lon")
+            if last_id is not None:
+                q = q.gt("id", last_id)
+            page = q.order("id").limit(self.page_size).execute().data or []
+            fetched.extend(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]["id"]
+        self._sites = {wh["id"]: (wh["name"], float(wh["lat"]), float(wh["lon"]))
+                       for wh in fetched if wh.get("lat") is not None and wh.get("lon") is not None}
+        self._build()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_every)
+            try:
+                self.reload()
+            except Exception:
+                # lookups keep using the last snapshot
+                log.exception("warehouse index reload failed")
+
+    def _build(self):
+        ids = list(self._sites)
+        names = [self._sites[i][0] for i in ids]
+        lats = np.array([self._sites[i][1] for i in ids], dtype=np.float64)
+        lons = np.array([self._sites[i][2] for i in ids], dtype=np.float64)
+        grid = defaultdict(list)
+        for n, (r, c) in enumerate(zip(np.floor(lats / self.cell_deg).astype(int).tolist(),
+                                       np.floor(lons / self.cell_deg).astype(int).tolist())):
+            grid[(r, c)].append(n)
+        # swap in one go so concurrent readers never see a half-built index
+        self._snapshot = (ids, names, lats, lons, dict(grid), {w: n for n, w in enumerate(ids)})
+
+
+def _closest(lat, lon, candidates, lats, lons):
+    """(snapshot position, metres) of the closest candidate, or None."""
+    if not candidates:
+        return None
+    idx = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+    dist = haversine_m(lat, lon, lats[idx], lons[idx])
+    best = int(np.argmin(dist))
+    return int(idx[best]), float(dist[best])
@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from archive import month_bounds
+from attendance_engine import normalize, summarize
+from daily_summary import date_windows
+
+ATTENDANCE_FIELDS = ("id", "date", "name", "punch_type", "time", "lat", "lon", "warehouse_id",
+                     "warehouse_name", "photo", "client_punch_id")
+REMARK_FIELDS = ("id", "user_name", "date", "time", "remark", "created_at")
+TABLE_FIELDS = {"attendance": ATTENDANCE_FIELDS + ("emp", "ptype", "sec"), "attendance_remarks": REMARK_FIELDS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY, date TEXT, name TEXT, punch_type TEXT, time TEXT, lat REAL, lon REAL,
+    warehouse_id INTEGER, warehouse_name TEXT, photo TEXT, client_punch_id TEXT,
+    emp TEXT, ptype TEXT, sec INTEGER
+);
+CREATE INDEX IF NOT EXISTS attendance_date_emp ON attendance (date, emp);
+CREATE INDEX IF NOT EXISTS attendance_emp_date ON attendance (emp, date);
+CREATE TABLE IF NOT EXISTS attendance_remarks (
+    id INTEGER PRIMARY KEY, user_name TEXT, date TEXT, time TEXT, remark TEXT, created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS remarks_date ON attendance_remarks (date);
+CREATE INDEX IF NOT EXISTS remarks_user ON attendance_remarks (user_name, id);
+CREATE TABLE IF NOT EXISTS pulled_up_to (tbl TEXT PRIMARY KEY, last_id INTEGER);
+CREATE TABLE IF NOT EXISTS archived_months (
+    tbl TEXT, month TEXT, archived_at TEXT, PRIMARY KEY (tbl, month)
+);
+"""
+
+def _seconds(clock):
+    try:
+        h, m, s = str(clock).split(":")[:3]
+        return int(h) * 3600 + int(m) * 60 + int(float(s))
+    except ValueError:
+        return None
+
+
+class LocalReplica:
+    """On-disk SQLite copy of attendance and attendance_remarks, pulled by id watermark, for admin analytics."""
+
+    def __init__(self, client, path, page_size=1000, sync_every=10, archive=None):
+        self.client = client
+        # optional archive.Archive: archived months are imported once, so the replica keeps full history
+        self.archive = archive
+        self.page_size = page_size
+        self.sync_every = sync_every
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("PRAGMA journal_mode=WAL;" + SCHEMA)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced_at = None
+
+    # ---------- sync ----------
+    def sync(self):
+        with self._sync_lock:
+            pulled = self._pull("attendance", self._attendance_rows) + self._pull("attendance_remarks", self._remark_rows)
+            pulled += self._import_archive()
+            self._synced_at = time.monotonic()
+            return pulled
+
+    def merge(self, rows):
+        # this process's own inserts, ahead of the next pull; they leave its watermark alone, so rows
+        # with lower ids written elsewhere (punch API, other app replicas) are still pulled
+        rows = [r for r in rows if r.get("id") is not None]
+        self._write("attendance", ATTENDANCE_FIELDS + ("emp", "ptype", "sec"), self._attendance_rows(rows))
+
+    def merge_remarks(self, rows):
+        rows = [r for r in rows if r.get("id") is not None]
+        self._write("attendance_remarks", REMARK_FIELDS, self._remark_rows(rows))
+
+    def _maybe_sync(self):
+        if self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_every:
+            self.sync()
+
+    def _import_archive(self):
+        if self.archive is None:
+            return 0
+        imported = 0
+        for table, convert in (("attendance", self._attendance_rows), ("attendance_remarks", self._remark_rows)):
+            with self._lock:
+                done = dict(self._db.execute("SELECT month, archived_at FROM archived_months WHERE tbl = ?", (table,)).fetchall())
+            for month, meta in sorted(self.archive.months(table).items()):
+                # a month is re-imported only when a later run merged late rows into it
+                if done.get(month) == meta["archived_at"]:
+                    continue
+                rows = self.archive.read(table, *month_bounds(month))
+                self._write(table, TABLE_FIELDS[table], convert(rows))
+                with self._lock, self._db:
+                    self._db.execute("INSERT OR REPLACE INTO archived_months VALUES (?, ?, ?)", (table, month, meta["archived_at"]))
+                imported += len(rows)
+        return imported
+
+    def _pull(self, table, convert):
+        fields = TABLE_FIELDS[table]
+        with self._lock:
+            row = self._db.execute("SELECT last_id FROM pulled_up_to WHERE tbl = ?", (table,)).fetchone()
+        last_id = row[0] if row else 0
+        pulled = 0
+        while True:
+            page = (self.client.table(table).select("*").gt("id", last_id)
+                    .order("id").limit(self.page_size).execute().data or [])
+            if page:
+                last_id = page[-1]["id"]
+            self._write(table, fields, convert(page), pulled_up_to=last_id)
+            pulled += len(page)
+            if len(page) < self.page_size:
+                return pulled
+
+    def _write(self, table, fields, values, pulled_up_to=None):
+        if not values:
+            return
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})"
+        with self._lock, self._db:
+            self._db.executemany(sql, values)
+            if pulled_up_to is not None:
+                self._db.execute("INSERT OR REPLACE INTO pulled_up_to VALUES (?, ?)", (table, pulled_up_to))
+
+    @staticmethod
+    def _attendance_rows(rows):
+        return [tuple(r.get(f) for f in ATTENDANCE_FIELDS) + (
+            str(r.get("name", "")).strip().lower(), str(r.get("punch_type", "")).strip().upper(), _seconds(r.get("time")),
+        ) for r in rows]
+
+    @staticmethod
+    def _remark_rows(rows):
+        return [tuple(r.get(f) for f in REMARK_FIELDS) for r in rows]
+
+    # ---------- queries ----------
+    def _query(self, sql, params=()):
+        self._maybe_sync()
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    def range_frame(self, start, end, user=None):
+        where = "date BETWEEN ? AND ?" + (" AND emp = ?" if user else "")
+        params = (str(start), str(end)) + ((user,) if user else ())
+        return self._query(f"SELECT {', '.join(ATTENDANCE_FIELDS)} FROM attendance WHERE {where} ORDER BY id DESC", params)
+
+    def daily_hours(self, start, end, user=None):
+        """attendance_engine.summarize() for days start..end, paired with a day of context on each side."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        out = summarize(self.range_frame((start - pd.Timedelta(days=1)).date(), (end + pd.Timedelta(days=1)).date(), user))
+        out = out[(out["date"] >= start.strftime("%Y-%m-%d")) & (out["date"] <= end.strftime("%Y-%m-%d"))]
+        return out.sort_values(["date", "name"], ignore_index=True)
+
+    def page(self, employee=None, start=None, end=None, before_id=None, page_size=50):
+        """Drop-in for RemarksStore.page()."""
+        clauses, params = [], []
+        for clause, value in (("user_name = ?", employee), ("date >= ?", start), ("date <= ?", end), ("id < ?", before_id)):
+            if value is not None and value != "":
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT {', '.join(REMARK_FIELDS)} FROM attendance_remarks {where} ORDER BY id DESC LIMIT ?",
+                           params + [page_size + 1]).to_dict("records")
+        cursor = rows[page_size - 1]["id"] if len(rows) > page_size else None
+        return rows[:page_size], cursor
+
+    def iter_pages(self, start, end, page_size=5000):
+        """export.write_csv / write_parquet input, read from the replica instead of Supabase."""
+        self._maybe_sync()
+        last_id = 0
+        while True:
+            with self._lock:
+                cur = self._db.execute(
+                    f"SELECT {', '.join(ATTENDANCE_FIELDS)} FROM attendance WHERE date BETWEEN ? AND ? AND id > ? "
+                    "ORDER BY id LIMIT ?", (str(start), str(end), last_id, page_size))
+                page = [dict(zip(ATTENDANCE_FIELDS, r)) for r in cur.fetchall()]
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            last_id = page[-1]["id"]
+
+    def iter_event_chunks(self, start, end, days=7):
+        """daily_summary.iter_event_chunks() read from the replica."""
+        for window, until, ends_at in date_windows(start, end, days):
+            frame = self.range_frame(window, until)
+            if len(frame):
+                yield normalize(frame), ends_at
+
+    def iter_daily_pages(self, start, end, page_size=5000):
+        records = self.daily_hours(start, end).to_dict("records")
+        for i in range(0, len(records), page_size):
+            yield records[i:i + page_size]
@@ -0,0 +1,50 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class ParallelReads:
+    """Runs a page's independent reads side by side on one bounded pool, so it waits for the slowest read, not the sum.
+
+    run() returns (values, errors) keyed like `calls`. A call still running at the deadline is
+    reported as a TimeoutError but left to finish: whatever it loads lands in that store's cache
+    for the next caller.
+    """
+
+    def __init__(self, workers=8, timings=None):
+        self.timings = timings
+        self.batches = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parallel-read")
+        self._lock = threading.Lock()
+
+    def run(self, calls, timeout):
+        started = time.monotonic()
+        futures = {name: self._pool.submit(self._call, name, fn) for name, fn in calls.items()}
+        wait(futures.values(), timeout=timeout)
+        values, errors = {}, {}
+        for name, future in futures.items():
+            if not future.done():
+                errors[name] = TimeoutError(f"{name} took longer than {timeout}s")
+            elif future.exception() is not None:
+                errors[name] = future.exception()
+            else:
+                values[name] = future.result()
+        with self._lock:
+            self.batches += 1
+            self.timeouts += sum(isinstance(e, TimeoutError) for e in errors.values())
+            self.failures += sum(not isinstance(e, TimeoutError) for e in errors.values())
+        if self.timings:
+            self.timings.record("parallel reads (wall)", time.monotonic() - started)
+        return values, errors
+
+    def stats(self):
+        with self._lock:
+            return {"batches": self.batches, "timeouts": self.timeouts, "failures": self.failures}
+
+    def _call(self, name, fn):
+        if self.timings is None:
+            return fn()
+        with self.timings.section(f"read {name}"):
+            return fn()
@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+WRITE_OPS = ("insert", "upsert", "update", "delete")
+
+
+class Timings:
+    """Rolling wall-clock samples and hit/miss counters per named operation, shared by all sessions."""
+
+    def __init__(self, keep=500, log_path=None):
+        self._samples = defaultdict(lambda: deque(maxlen=keep))
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+        # optional JSON-lines log of every sample, for offline analysis
+        self._log = open(log_path, "a", buffering=1) if log_path else None
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            if self._log:
+                self._log.write(json.dumps({"at": time.time(), "op": name, "ms": round(seconds * 1000, 3)}) + "\n")
+
+    def count(self, name, outcome):
+        with self._lock:
+            self._counters[name][outcome] += 1
+
+    @contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            # st.rerun() / st.stop() leave through here too, so those runs are still counted
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        def wrap(fn):
+            @wraps(fn)
+            def run(*args, **kwargs):
+                with self.section(name):
+                    return fn(*args, **kwargs)
+            return run
+        return wrap
+
+    def summary(self):
+        # imported here: every run records timings, only the performance panel builds tables
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            samples = {name: np.array(values) * 1000 for name, values in self._samples.items()}
+        return pd.DataFrame([{
+            "Operation": name,
+            "Calls": len(ms),
+            "p50 (ms)": round(float(np.percentile(ms, 50)), 1),
+            "p95 (ms)": round(float(np.percentile(ms, 95)), 1),
+            "Last (ms)": round(float(ms[-1]), 1),
+        } for name, ms in sorted(samples.items())], columns=["Operation", "Calls", "p50 (ms)", "p95 (ms)", "Last (ms)"])
+
+    def counters(self, extra=None):
+        """Hit/miss table; `extra` adds caches that keep their own hits/misses, e.g. {"directory": Directory.stats()}."""
+        import pandas as pd
+
+        with self._lock:
+            counters = {name: dict(c) for name, c in self._counters.items()}
+        for name, stats in (extra or {}).items():
+            counters[name] = {"hit": stats.get("hits", 0), "miss": stats.get("misses", 0)}
+        rows = []
+        for name, c in sorted(counters.items()):
+            hits, misses = c.get("hit", 0), c.get("miss", 0)
+            rows.append({"Cache": name, "Hits": hits, "Misses": misses,
+                         "Hit rate": f"{hits / (hits + misses):.0%}" if hits + misses else "-"})
+        return pd.DataFrame(rows, columns=["Cache", "Hits", "Misses", "Hit rate"])
+
+    def export(self):
+        with self._lock:
+            samples = {name: [round(s * 1000, 3) for s in values] for name, values in self._samples.items()}
+            counters = {name: dict(c) for name, c in self._counters.items()}
+        return json.dumps({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "operations": self.summary().to_dict("records"),
+            "counters": counters,
+            "samples_ms": samples,
+        }, indent=2)
+
+
+# ---------- supabase ----------
+class TimedClient:
+    """Wraps a supabase client so every .execute() and storage upload is timed as "supabase <table>.<op>"."""
+
+    def __init__(self, client, timings):
+        self._client = client
+        self._timings = timings
+
+    def table(self, name):
+        return _TimedQuery(self._client.table(name), self._timings, name)
+
+    @property
+    def storage(self):
+        return _TimedStorage(self._client.storage, self._timings)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _TimedQuery:
+    def __init__(self, query, timings, table, op="select"):
+        self._query = query
+        self._timings = timings
+        self._table = table
+        self._op = op
+
+    def execute(self, *args, **kwargs):
+        with self._timings.section(f"supabase {self._table}.{self._op}"):
+            return self._query.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return _TimedQuery(attr, self._timings, self._table, self._op) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            out = attr(*args, **kwargs)
+            op = name if name in WRITE_OPS else self._op
+            return _TimedQuery(out, self._timings, self._table, op) if hasattr(out, "execute") else out
+        return call
+
+
+class _TimedStorage:
+    def __init__(self, storage, timings):
+        self._storage = storage
+        self._timings = timings
+
+    def from_(self, bucket):
+        return _TimedBucket(self._storage.from_(bucket), self._timings, bucket)
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+class _TimedBucket:
+    def __init__(self, bucket, timings, name):
+        self._bucket = bucket
+        self._timings = timings
+        self._name = name
+
+    def upload(self, *args, **kwargs):
+        with self._timings.section(f"storage {self._name}.upload"):
+            return self._bucket.upload(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._bucket, name)
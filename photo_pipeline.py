@@ -0,0 +1,102 @@
+import io
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from PIL import Image, ImageOps
+
+PHOTO_BUCKET = "attendance-photos"
+
+
+def thumb_path(path):
+    return f"thumbs/{path}"
+
+
+def public_url(base_url, path, bucket=PHOTO_BUCKET):
+    # same URL storage.get_public_url() builds, without a client call per photo
+    return f"{base_url.rstrip('/')}/storage/v1/object/public/{bucket}/{quote(path)}"
+
+
+def _load(data):
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    return img.convert("RGB")
+
+
+def compress(data, max_side=1280, target_bytes=150_000, min_quality=40):
+    img = _load(data)
+    img.thumbnail((max_side, max_side))
+    quality = 85
+    while True:
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=quality, optimize=True)
+        if buf.tell() <= target_bytes or quality <= min_quality:
+            return buf.getvalue()
+        quality -= 10
+
+
+def thumbnail(data, size=240):
+    img = _load(data)
+    img.thumbnail((size, size))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=70, optimize=True)
+    return buf.getvalue()
+
+
+class PhotoUploadQueue:
+    """Background uploads of punch photos, compressed and retried off the script thread."""
+
+    def __init__(self, client, bucket=PHOTO_BUCKET, workers=4, max_attempts=5, backoff=0.5):
+        self.client = client
+        self.bucket = bucket
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.uploaded = 0
+        self.retries = 0
+        self.failed = 0
+        self.last_errors = deque(maxlen=20)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photo-upload")
+
+    def submit(self, path, data):
+        with self._lock:
+            self._pending.add(path)
+        return self._pool.submit(self._process, path, data)
+
+    def status(self):
+        with self._lock:
+            return {"pending": len(self._pending), "uploaded": self.uploaded,
+                    "retries": self.retries, "failed": self.failed}
+
+    def _process(self, path, data):
+        try:
+            try:
+                files = [(path, compress(data)), (thumb_path(path), thumbnail(data))]
+            except OSError:
+                # not something Pillow can decode; keep the original bytes rather than lose the photo
+                files = [(path, data)]
+            for key, body in files:
+                self._upload(key, body)
+            with self._lock:
+                self.uploaded += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+                self.last_errors.append((path, repr(e)))
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def _upload(self, key, body):
+        for attempt in range(self.max_attempts):
+            try:
+                self.client.storage.from_(self.bucket).upload(key, body, {"content-type": "image/jpeg", "upsert": "true"})
+                return
+            except Exception:
+                if attempt == self.max_attempts - 1:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff * 2 ** attempt)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import date, timedelta
+
+log = logging.getLogger(__name__)
+
+
+class PresenceBoard:
+    """Who is present / IN / absent today, moved one punch event at a time."""
+
+    def __init__(self, users, day=None):
+        self.users = [u.strip().lower() for u in users]
+        self.day = day
+        self.version = 0
+        self._state = {}  # name -> [latest (time, punch_type), punches seen]
+        self._lock = threading.Lock()
+
+    def reset(self, day, carried_in=()):
+        """Start `day` empty except for carried_in: who is still IN from a session opened the day before."""
+        with self._lock:
+            self.day = day
+            # "" sorts before any clock time, so their first punch of the day takes over
+            self._state = {name: [("", "IN"), set()] for name in carried_in}
+            self.version += 1
+
+    def apply(self, row):
+        """Fold one attendance row into today's state in O(1); rows for other days are ignored."""
+        if str(row.get("date", ""))[:10] != self.day:
+            return False
+        punch = str(row.get("punch_type", "")).strip().upper()
+        if punch not in ("IN", "OUT"):
+            return False
+        name = str(row.get("name", "")).strip().lower()
+        key = (str(row.get("time", "")), punch)
+        with self._lock:
+            state = self._state.get(name)
+            if state is None:
+                state = self._state[name] = [key, set()]
+            elif key in state[1]:
+                # the same punch arrives from save_row, realtime and the poller; only the first one moves state
+                return False
+            state[1].add(key)
+            # several IN/OUT pairs a day: whoever's latest punch is an IN is in
+            state[0] = max(state[0], key)
+            self.version += 1
+            return True
+
+    def snapshot(self):
+        with self._lock:
+            present = sorted(self._state)
+            currently_in = sorted(n for n, (latest, _) in self._state.items() if latest[1] == "IN")
+            return {
+                "day": self.day,
+                "version": self.version,
+                "present": present,
+                "in": currently_in,
+                "absent": [u for u in self.users if u not in self._state],
+            }
+
+
+class PollingFeed:
+    """Stand-in event source: pulls today's new attendance rows by id watermark into the board."""
+
+    def __init__(self, client, board, today, every=5, page_size=1000):
+        self.client = client
+        self.board = board
+        self.today = today
+        self.every = every
+        self.page_size = page_size
+        self._last_id = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.poll()
+            self._thread = threading.Thread(target=self._loop, name="presence-poll", daemon=True)
+            self._thread.start()
+        return self
+
+    def poll(self):
+        day = self.today()
+        if day != self.board.day:
+            self.board.reset(day, self._carried_in(day))
+            self._last_id = 0
+        while True:
+            page = self._page(day, self._last_id)
+            for row in page:
+                self.board.apply(row)
+            if page:
+                self._last_id = page[-1]["id"]
+            if len(page) < self.page_size:
+                return
+
+    def _carried_in(self, day):
+        """Night shifts: whoever the session pairing still has open from the day before `day`."""
+        import pandas as pd
+        from attendance_engine import normalize, pair_sessions
+
+        before = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        rows, last_id = [], 0
+        while True:
+            page = self._page(before, last_id)
+            rows.extend(page)
+            if len(page) < self.page_size:
+                break
+            last_id = page[-1]["id"]
+        if not rows:
+            return []
+        sessions = pair_sessions(normalize(pd.DataFrame(rows)))
+        return sorted(set(sessions.loc[sessions["status"] == "open", "name"]))
+
+    def _page(self, day, after_id):
+        return (self.client.table("attendance").select("id, date, time, name, punch_type").eq("date", day)
+                .gt("id", after_id).order("id").limit(self.page_size).execute().data or [])
+
+    def _loop(self):
+        while True:
+            time.sleep(self.every)
+            try:
+                self.poll()
+            except Exception:
+                log.exception("presence poll failed")
+
+
+class RealtimeFeed:
+    """Supabase realtime INSERTs on public.attendance pushed straight into the board."""
+
+    def __init__(self, url, key, board):
+        self.url = url.rstrip("/") + "/realtime/v1"
+        self.key = key
+        self.board = board
+        self.connected = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="presence-realtime", daemon=True)
+            self._thread.start()
+        return self
+
+    async def _run(self):
+        from realtime import AsyncRealtimeClient
+
+        client = AsyncRealtimeClient(self.url, token=self.key, params={"apikey": self.key})
+        try:
+            await client.connect()
+            channel = client.channel("attendance-presence")
+            channel.on_postgres_changes("INSERT", schema="public", table="attendance",
+                                        callback=lambda change: self.board.apply(change["data"].get("record") or {}))
+            await channel.subscribe()
+            self.connected = True
+            while True:
+                await asyncio.sleep(3600)
+        except Exception:
+            # the polling feed keeps the board correct, just a few seconds later
+            log.exception("presence realtime feed stopped")
+        finally:
+            self.connected = False
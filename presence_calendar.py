@@ -0,0 +1,149 @@
+import calendar
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import SHIFT_HOURS
+
+KINDS = ("present", "late", "complete")
+
+
+def _months(start, end):
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        yield y, m
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+class PresenceCalendar:
+    """Per employee per month, one uint32 bitmap each for present, late and complete-shift days (bit d-1 = day d).
+
+    Months load from daily summary rows on first use and reload after refresh_every; in between,
+    apply() folds each new summary row in. Absent lists, counts and streaks are bit operations on
+    those words, whatever the date range.
+    """
+
+    def __init__(self, users, loader, refresh_every=300):
+        # loader(first_day, last_day) -> daily summary rows (name, date, late, hours) as a DataFrame
+        self.loader = loader
+        self.refresh_every = refresh_every
+        self.names = [u.strip().lower() for u in users]
+        self.loads = 0
+        self._index = {n: i for i, n in enumerate(self.names)}
+        self._bits = {}  # (year, month) -> {kind: uint32[len(names)]}
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+
+    def apply(self, row):
+        """Fold one daily summary row in, replacing whatever that employee-day had; months not loaded yet are skipped."""
+        day = pd.Timestamp(str(row.get("date", ""))[:10])
+        with self._lock:
+            words = self._bits.get((day.year, day.month))
+            if words is None:
+                return False
+            i = self._slot(str(row.get("name", "")).strip().lower())
+            bit = np.uint32(1 << (day.day - 1))
+            hours = pd.to_numeric(row.get("hours"), errors="coerce")
+            for kind, on in zip(KINDS, (True, bool(row.get("late")), bool(hours >= SHIFT_HOURS))):
+                words[kind][i] = words[kind][i] | bit if on else words[kind][i] & ~bit
+            return True
+
+    def absent(self, day):
+        """Employees with no punch on `day`."""
+        words = self._month(day.year, day.month)
+        missing = (words["present"] >> np.uint32(day.day - 1)) & 1 == 0
+        return [self.names[i] for i in np.flatnonzero(missing)]
+
+    def counts(self, start, end):
+        """Per employee: days present, late and complete in start..end, by popcount."""
+        bits = {kind: self._range(kind, start, end) for kind in KINDS}
+        # names only ever grow at the end: one added mid-call gets zeros rather than a misaligned column
+        names = list(self.names)
+        return pd.DataFrame({"name": names, **{kind: [int(b).bit_count() for b in bits[kind]] + [0] * (len(names) - len(bits[kind]))
+                                               for kind in KINDS}})
+
+    def absence_streaks(self, start, end, min_days=3):
+        """{name: longest run of consecutive absent days} for everyone absent min_days or more in a row in start..end."""
+        span = (end - start).days + 1
+        if span < min_days:
+            return {}
+        run = ((1 << span) - 1) & ~self._range("present", start, end)
+        # after k-1 folds, a set bit starts k absent days in a row; everyone folds together
+        length = (run != 0).astype(int)
+        while True:
+            run = run & (run >> 1)
+            alive = run != 0
+            if not alive.any():
+                break
+            length += alive
+        return {self.names[i]: int(length[i]) for i in np.flatnonzero(length >= min_days)}
+
+    def month_matrix(self, year, month):
+        """Employees x days of the month, indexed by name: 0 absent, 1 present, 2 complete shift, +4 when late."""
+        words = self._month(year, month)
+        days = calendar.monthrange(year, month)[1]
+        shifts = np.arange(days, dtype=np.uint32)
+        bit = {kind: ((words[kind][:, None] >> shifts) & 1).astype(np.int8) for kind in KINDS}
+        codes = bit["present"] + bit["complete"] + 4 * bit["late"]
+        return pd.DataFrame(codes, index=self.names[:len(codes)], columns=range(1, days + 1))
+
+    def stats(self):
+        with self._lock:
+            return {"months": len(self._bits), "employees": len(self.names), "loads": self.loads}
+
+    def _range(self, kind, start, end):
+        """Per employee, an arbitrary-width int (object array): bit k set when `kind` holds on start + k days."""
+        out = np.zeros(0, dtype=object)
+        for y, m in _months(start, end):
+            words = self._month(y, m)[kind]
+            first = max(start, date(y, m, 1))
+            last = min(end, date(y, m, calendar.monthrange(y, m)[1]))
+            mask = np.uint32(((1 << (last.day - first.day + 1)) - 1) << (first.day - 1))
+            offset = (first - start).days - (first.day - 1)
+            bits = (words & mask).astype(object)
+            out = np.concatenate([out, np.zeros(len(words) - len(out), dtype=object)])
+            out |= bits << offset if offset >= 0 else bits >> -offset
+        return out
+
+    def _month(self, year, month):
+        key = (year, month)
+        at = self._loaded_at.get(key)
+        if at is None or time.monotonic() - at >= self.refresh_every:
+            first = date(year, month, 1)
+            rows = self.loader(first, first + timedelta(days=calendar.monthrange(year, month)[1] - 1))
+            self._load(key, rows)
+        with self._lock:
+            return dict(self._bits[key])
+
+    def _load(self, key, rows):
+        rows = pd.DataFrame(rows)
+        with self._lock:
+            if rows.empty:
+                idx = days = np.array([], dtype=int)
+                late = complete = np.array([], dtype=bool)
+            else:
+                idx = np.array([self._slot(n) for n in rows["name"].astype(str).str.strip().str.lower()], dtype=int)
+                days = pd.to_datetime(rows["date"].astype(str).str[:10]).dt.day.to_numpy()
+                late = rows["late"].fillna(False).astype(bool).to_numpy()
+                complete = (pd.to_numeric(rows["hours"], errors="coerce") >= SHIFT_HOURS).to_numpy()
+            bits = (np.uint32(1) << (days - 1).astype(np.uint32))
+            words = {kind: np.zeros(len(self.names), dtype=np.uint32) for kind in KINDS}
+            for kind, on in zip(KINDS, (np.ones(len(idx), dtype=bool), late, complete)):
+                np.bitwise_or.at(words[kind], idx[on], bits[on])
+            self._bits[key] = words
+            self._loaded_at[key] = time.monotonic()
+            self.loads += 1
+
+    def _slot(self, name):
+        # a name not in USERS still gets a row; every month's arrays grow to match (lock held)
+        i = self._index.get(name)
+        if i is None:
+            i = self._index[name] = len(self.names)
+            self.names.append(name)
+            for words in self._bits.values():
+                for kind in KINDS:
+                    words[kind] = np.append(words[kind], np.uint32(0))
+        return i
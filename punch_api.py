@@ -0,0 +1,106 @@
+"""JSON / multipart punch endpoint that runs next to the Streamlit app.
+
+    python punch_api.py --port 8502 --budget-ms 1500
+
+POST /api/punch with `Authorization: Bearer <token>` and either a JSON body
+(photo as base64) or multipart form fields plus a `photo` file. Uses the same
+device, distance and IN/OUT rules as the Streamlit punch buttons. The offline
+queue in static/punch-queue.js replays punches here; put it behind the same
+reverse proxy as Streamlit under /api/ (or set PUNCH_API_URL).
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import tornado.ioloop
+import tornado.web
+
+from cache_backend import RedisBackend, SharedCache
+from config import secret
+from daily_summary import SUMMARY_TABLE
+from directory import Directory
+from geo_index import WarehouseIndex
+from photo_pipeline import PhotoUploadQueue
+from punch_service import PunchService, PunchRejected, token_secret, verify_token
+from punch_writer import PunchWriter
+
+
+class PunchHandler(tornado.web.RequestHandler):
+    def initialize(self, service, token_secret, executor, budget):
+        self.service = service
+        self.token_secret = token_secret
+        self.executor = executor
+        self.budget = budget
+
+    def set_default_headers(self):
+        self.set_header("Access-Control-Allow-Origin", "*")
+        self.set_header("Access-Control-Allow-Headers", "Authorization, Content-Type")
+        self.set_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+        self.set_header("Content-Type", "application/json")
+
+    def options(self):
+        self.set_status(204)
+
+    async def post(self):
+        try:
+            user = verify_token(self.request.headers.get("Authorization", "").removeprefix("Bearer "), self.token_secret)
+            punch, photo = self._parse()
+            loop = asyncio.get_running_loop()
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self.executor, self.service.record, user, punch, photo), timeout=self.budget)
+        except PunchRejected as e:
+            self.set_status(e.status)
+            self.write({"status": "rejected", "error": str(e)})
+            return
+        except asyncio.TimeoutError:
+            # the punch may still land; a retry with the same client_punch_id is deduplicated
+            self.set_status(503)
+            self.set_header("Retry-After", "2")
+            self.write({"status": "timeout", "error": "Punch not confirmed in time, retry"})
+            return
+        self.set_status(200 if result["status"] == "duplicate" else 201)
+        self.write({k: v for k, v in result.items() if k != "row"})
+
+    def _parse(self):
+        if self.request.headers.get("Content-Type", "").startswith("multipart/form-data"):
+            punch = {k: v[0].decode() for k, v in self.request.body_arguments.items()}
+            files = self.request.files.get("photo")
+            return punch, files[0]["body"] if files else None
+        try:
+            return json.loads(self.request.body or b"{}"), None
+        except ValueError:
+            raise PunchRejected("Body must be JSON", 400)
+
+
+def make_app(service, token_secret, workers=32, budget=1.5):
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="punch-api")
+    return tornado.web.Application([
+        (r"/api/punch", PunchHandler,
+         {"service": service, "token_secret": token_secret, "executor": executor, "budget": budget}),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--budget-ms", type=int, default=1500, help="answer 503 if a punch takes longer than this")
+    args = parser.parse_args()
+
+    from supabase.client import create_client
+    client = create_client(secret("SUPABASE_URL"), secret("SUPABASE_KEY"))
+    # with CACHE_URL set, the app replicas see API punches and device registrations on their next read
+    cache_url = secret("CACHE_URL", default="")
+    cache = SharedCache(RedisBackend.from_url(cache_url)) if cache_url else None
+
+    def punches_saved(rows):
+        if cache:
+            cache.invalidate("attendance")
+            cache.invalidate(SUMMARY_TABLE)
+
+    service = PunchService(client, Directory(client, cache=cache), WarehouseIndex(client), PhotoUploadQueue(client),
+                           writer=PunchWriter(client, on_saved=punches_saved))
+    make_app(service, token_secret(), workers=args.workers, budget=args.budget_ms / 1000).listen(args.port)
+    print(f"Punch API listening on :{args.port}")
+    tornado.ioloop.IOLoop.current().start()
@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import hmac
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+
+from config import ALLOWED_DISTANCE, IST, MAX_SESSION_HOURS, USERS, SECURE_USERS, now_ist, secret
+from daily_summary import rollup_punch
+
+MAX_REPLAY_AGE = timedelta(days=3)
+
+
+class PunchRejected(Exception):
+    def __init__(self, message, status=422):
+        super().__init__(message)
+        self.status = status
+
+
+# ================= TOKENS =================
+def token_secret():
+    # derived from the service key unless a dedicated secret is configured
+    return secret("PUNCH_API_SECRET", default="") or hashlib.sha256(
+        ("punch-api:" + secret("SUPABASE_KEY")).encode()).hexdigest()
+
+
+def issue_token(user, secret, ttl=7 * 24 * 3600):
+    expires = int(time.time()) + ttl
+    sig = hmac.new(secret.encode(), f"{user}:{expires}".encode(), hashlib.sha256).hexdigest()
+    return f"{user}:{expires}:{sig}"
+
+
+def verify_token(token, secret):
+    try:
+        user, expires, sig = token.rsplit(":", 2)
+        expires_at = int(expires)
+    except (AttributeError, ValueError):
+        raise PunchRejected("Invalid token", 401)
+    expected = hmac.new(secret.encode(), f"{user}:{expires}".encode(), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(sig, expected) or expires_at < time.time() or user not in USERS:
+        raise PunchRejected("Invalid token", 401)
+    return user
+
+
+# ================= RULES =================
+# Shared by the Streamlit PUNCH IN/OUT handlers and the JSON punch API.
+def device_status(directory, user, device_id, register=False):
+    if user not in SECURE_USERS:
+        return "ok"
+    saved_device = directory.device_for(user)
+    if not saved_device:
+        if not register:
+            raise PunchRejected("Device not registered", 403)
+        directory.register_device(user, device_id)
+        return "registered"
+    if saved_device != device_id:
+        raise PunchRejected("Different device detected", 403)
+    return "ok"
+
+
+def day_punches(client, user, date_str):
+    # the day before too: a night shift's IN is yesterday's row
+    since = (datetime.fromisoformat(date_str) - timedelta(days=1)).date().isoformat()
+    res = (client.table("attendance").select("date, time, punch_type, client_punch_id")
+           .eq("name", user).gte("date", since).lte("date", date_str).execute())
+    return res.data or []
+
+
+def punched_in(rows, at):
+    """True while the latest punch up to `at` is an IN less than MAX_SESSION_HOURS old: the "open" session of pair_sessions()."""
+    cutoff = (at.date().isoformat(), at.strftime("%H:%M:%S"))
+    # an offline replay is judged by the punches taken before it, not ones that synced first
+    last = max((r for r in rows if (str(r["date"])[:10], str(r["time"])) <= cutoff),
+               key=lambda r: (str(r["date"])[:10], str(r["time"])), default=None)
+    if last is None or str(last["punch_type"]).strip().upper() != "IN":
+        return False
+    try:
+        punched_at = IST.localize(datetime.fromisoformat(f"{str(last['date'])[:10]}T{last['time']}"))
+    except ValueError:
+        return False
+    return at - punched_at < timedelta(hours=MAX_SESSION_HOURS)
+
+
+def sequence_error(punch_type, is_in):
+    if punch_type == "IN" and is_in:
+        return "Already punched IN"
+    if punch_type == "OUT" and not is_in:
+        return "Punch IN first"
+    return None
+
+
+# ================= SERVICE =================
+class PunchService:
+    """Validates and records punches that arrive outside the Streamlit script (API calls, offline replays)."""
+
+    def __init__(self, client, directory, warehouse_index, photo_queue, seen_capacity=50_000, writer=None):
+        self.client = client
+        # optional PunchWriter: concurrent punches share one bulk upsert instead of one request each
+        self.writer = writer
+        self.directory = directory
+        self.warehouse_index = warehouse_index
+        self.photo_queue = photo_queue
+        self.seen_capacity = seen_capacity
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._rollups = ThreadPoolExecutor(max_workers=2, thread_name_prefix="punch-rollup")
+
+    def record(self, user, punch, photo=None):
+        punch_id = str(punch.get("client_punch_id") or "")
+        try:
+            uuid.UUID(punch_id)
+        except ValueError:
+            raise PunchRejected("client_punch_id must be a UUID", 400)
+        if self._already_seen(punch_id):
+            return {"status": "duplicate", "client_punch_id": punch_id}
+
+        punch_type = str(punch.get("punch_type", "")).upper()
+        if punch_type not in ("IN", "OUT"):
+            raise PunchRejected("punch_type must be IN or OUT", 400)
+        try:
+            lat, lon = float(punch["lat"]), float(punch["lon"])
+        except (KeyError, TypeError, ValueError):
+            raise PunchRejected("lat/lon required", 400)
+        taken_at = self._taken_at(punch.get("taken_at"))
+        if photo is None and punch.get("photo"):
+            try:
+                photo = base64.b64decode(str(punch["photo"]).split(",")[-1], validate=True)
+            except ValueError:
+                raise PunchRejected("photo must be base64", 400)
+        if not photo:
+            raise PunchRejected("Photo is compulsory", 400)
+
+        device_status(self.directory, user, punch.get("device_id"))
+        nearest = self.warehouse_index.nearest(lat, lon, self.directory.warehouses_for(user), ALLOWED_DISTANCE)
+        if not nearest:
+            raise PunchRejected("No warehouse assigned")
+        if nearest["distance"] > ALLOWED_DISTANCE:
+            raise PunchRejected(f"Too far from {nearest['name']} ({int(nearest['distance'])}m)")
+        recent = day_punches(self.client, user, taken_at.date().isoformat())
+        if any(str(r.get("client_punch_id")) == punch_id for r in recent):
+            self._remember(punch_id)
+            return {"status": "duplicate", "client_punch_id": punch_id}
+        error = sequence_error(punch_type, punched_in(recent, taken_at))
+        if error:
+            raise PunchRejected(error, 409)
+
+        photo_path = f"{user}/{punch_id}.jpg"
+        self.photo_queue.submit(photo_path, photo)
+
+        row = {
+            "date": taken_at.date().isoformat(), "name": user, "punch_type": punch_type,
+            "time": taken_at.strftime("%H:%M:%S"), "lat": lat, "lon": lon,
+            "warehouse_id": nearest["id"], "warehouse_name": nearest["name"], "photo": photo_path,
+            "client_punch_id": punch_id,
+        }
+        if self.writer:
+            saved = self.writer.submit(row).result()
+        else:
+            res = self.client.table("attendance").upsert(row, on_conflict="client_punch_id", ignore_duplicates=True).execute()
+            saved = res.data[0] if res.data else None
+        self._remember(punch_id)
+        if saved is None:
+            return {"status": "duplicate", "client_punch_id": punch_id}
+        self._rollups.submit(rollup_punch, self.client, row)
+        return {"status": "recorded", "client_punch_id": punch_id, "row": saved}
+
+    def _taken_at(self, value):
+        now = now_ist()
+        if not value:
+            return now
+        try:
+            taken_at = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            raise PunchRejected("taken_at must be ISO 8601", 400)
+        if taken_at.tzinfo is None:
+            taken_at = pytz.utc.localize(taken_at)
+        taken_at = taken_at.astimezone(IST)
+        if taken_at > now + timedelta(minutes=5) or now - taken_at > MAX_REPLAY_AGE:
+            raise PunchRejected("taken_at outside the accepted replay window")
+        return taken_at
+
+    def _already_seen(self, punch_id):
+        with self._lock:
+            return punch_id in self._seen
+
+    def _remember(self, punch_id):
+        with self._lock:
+            self._seen[punch_id] = True
+            while len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# PostgREST error codes worth retrying: HTTP 5xx / Postgres class 5x, connection (08) and serialization or deadlock (40)
+TRANSIENT_CODES = ("5", "08", "40")
+
+
+def punch_key(taps, punch_type, photo):
+    """client_punch_id for a tap on the Streamlit buttons; `taps` is the session's state.
+
+    The same tap resubmitted (same button and photo, not confirmed yet) keeps its id, so it is
+    stored once. Any other tap gets a fresh one, e.g. a second IN later in the day while the
+    camera still holds the same photo. Pop taps["punch_tap"] once the punch is confirmed.
+    """
+    tap = (punch_type, hashlib.sha1(photo).hexdigest())
+    if taps.get("punch_tap", (None, None))[0] != tap:
+        taps["punch_tap"] = (tap, str(uuid.uuid4()))
+    return taps["punch_tap"][1]
+
+
+class PunchWriter:
+    """Coalesces punches from all sessions into bulk upserts keyed by client_punch_id, off the script thread.
+
+    submit() returns a Future that resolves to the stored row, or None when the
+    client_punch_id was already in the table. A double tap while the first punch is
+    still queued gets the same Future back.
+    """
+
+    def __init__(self, client, table="attendance", flush_every=0.05, max_batch=500,
+                 max_attempts=5, backoff=0.25, on_saved=None, seen_capacity=50_000):
+        self.client = client
+        self.table = table
+        self.flush_every = flush_every
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # called with the newly stored rows of each batch, in order, on its own thread once their futures resolved
+        self.on_saved = on_saved
+        self._after = ThreadPoolExecutor(max_workers=1, thread_name_prefix="punch-saved")
+        self.seen_capacity = seen_capacity
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.last_errors = deque(maxlen=20)
+        self._queue = []
+        self._futures = OrderedDict()  # client_punch_id -> Future, queued and recently written
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="punch-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        row = dict(row)
+        key = row.setdefault("client_punch_id", str(uuid.uuid4()))
+        with self._cond:
+            future = self._futures.get(key)
+            if future is not None:
+                return future
+            future = self._futures[key] = Future()
+            self._queue.append(row)
+            self._cond.notify()
+        return future
+
+    def status(self):
+        with self._cond:
+            return {"pending": len(self._queue), "written": self.written, "duplicates": self.duplicates,
+                    "batches": self.batches, "retries": self.retries, "failed": self.failed}
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+            # let punches from other sessions pile up behind this one; they go out in the same request
+            time.sleep(self.flush_every)
+            with self._cond:
+                batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # this batch fails, the writer keeps going for the next one
+                log.exception("punch flush failed")
+                self._fail(batch, e)
+
+    def _flush(self, batch):
+        try:
+            saved = self._upsert(batch)
+        except Exception as e:
+            if len(batch) == 1 or _transient(e):
+                self._fail(batch, e)
+                return
+            # a rejected row (constraint, bad value): halve until only its own punch fails
+            half = len(batch) // 2
+            self._flush(batch[:half])
+            self._flush(batch[half:])
+            return
+        with self._cond:
+            self.batches += 1
+            self.written += len(saved)
+            self.duplicates += len(batch) - len(saved)
+            futures = [self._futures[row["client_punch_id"]] for row in batch]
+            while len(self._futures) > self.seen_capacity and next(iter(self._futures.values())).done():
+                self._futures.popitem(last=False)
+        for row, future in zip(batch, futures):
+            future.set_result(saved.get(row["client_punch_id"]))
+        if saved and self.on_saved:
+            # summary rollups and cache updates are a request per row; they must not hold up the next flush
+            self._after.submit(self._on_saved, list(saved.values()))
+
+    def _upsert(self, batch):
+        for attempt in range(self.max_attempts):
+            try:
+                # retrying is safe: rows that landed before a timeout are skipped by the unique client_punch_id
+                res = self.client.table(self.table).upsert(
+                    batch, on_conflict="client_punch_id", ignore_duplicates=True).execute()
+                return {str(r.get("client_punch_id")): r for r in res.data or []}
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not _transient(e):
+                    raise
+                with self._cond:
+                    self.retries += 1
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _on_saved(self, rows):
+        try:
+            self.on_saved(rows)
+        except Exception:
+            log.exception("punch on_saved callback failed")
+
+    def _fail(self, batch, error):
+        with self._cond:
+            self.failed += len(batch)
+            self.last_errors.append(repr(error))
+            # forgotten, so a retry of the same punch is queued again instead of getting this failure back
+            futures = [self._futures.pop(row["client_punch_id"], None) for row in batch]
+        for future in futures:
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+
+def _transient(error):
+    """Network trouble and server-side failures; a request the server rejected fails the same way every time."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return str(getattr(error, "code", "") or "").startswith(TRANSIENT_CODES)
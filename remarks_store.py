@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+REMARK_COLUMNS = "id, user_name, date, time, remark, created_at"
+
+
+class RemarksStore:
+    """attendance_remarks reads: per-user recent lists and keyset-paged admin views, filtered server-side."""
+
+    def __init__(self, client, table="attendance_remarks", ttl=60, recent_limit=10, max_pages=64, cache=None, archive=None):
+        self.client = client
+        # optional SharedCache and archive.Archive, see AttendanceQueries
+        self.cache = cache
+        self.archive = archive
+        self.table = table
+        self.ttl = ttl
+        self.recent_limit = recent_limit
+        self.max_pages = max_pages
+        self._recent = {}
+        self._pages = OrderedDict()  # (employee, start, end, before_id, page_size) -> entry, least recently used first
+        self._lock = threading.Lock()
+
+    def recent_for_user(self, user):
+        version = self._version()
+        with self._lock:
+            hit = self._recent.get(user)
+            if hit and time.monotonic() - hit[0] < self.ttl and hit[2] == version:
+                return list(hit[1])
+        rows = self._load(("recent", user), lambda: (
+            self.client.table(self.table).select(REMARK_COLUMNS).eq("user_name", user)
+            .order("id", desc=True).limit(self.recent_limit).execute().data or []), version)
+        with self._lock:
+            self._recent[user] = (time.monotonic(), rows, version)
+        return list(rows)
+
+    def page(self, employee=None, start=None, end=None, before_id=None, page_size=50):
+        """One page of remarks, newest first; pass the returned cursor as before_id for the next page."""
+        key = (employee, start, end, before_id, page_size)
+        version = self._version()
+        with self._lock:
+            hit = self._pages.get(key)
+            if hit and time.monotonic() - hit[0] < self.ttl and hit[3] == version:
+                self._pages.move_to_end(key)
+                return list(hit[1]), hit[2]
+        rows, cursor = self._load(("page",) + key, lambda: self._fetch_page(*key), version)
+        with self._lock:
+            self._pages[key] = (time.monotonic(), rows, cursor, version)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return list(rows), cursor
+
+    def _fetch_page(self, employee, start, end, before_id, page_size):
+        q = self.client.table(self.table).select(REMARK_COLUMNS)
+        if employee:
+            q = q.eq("user_name", employee)
+        if start:
+            q = q.gte("date", start)
+        if end:
+            q = q.lte("date", end)
+        if before_id is not None:
+            q = q.lt("id", before_id)
+        rows = q.order("id", desc=True).limit(page_size + 1).execute().data or []
+        if self.archive is not None and len(rows) <= page_size:
+            # the hot table ran out: the page continues into archived months, still newest id first
+            seen = {r["id"] for r in rows}
+            cold = [r for r in self.archive.read(self.table, start or None, end or None, columns=REMARK_COLUMNS.split(", "),
+                                                 user_name=employee or None)
+                    if r["id"] not in seen and (before_id is None or r["id"] < before_id)]
+            rows += sorted(cold, key=lambda r: r["id"], reverse=True)[:page_size + 1 - len(rows)]
+        cursor = rows[page_size - 1]["id"] if len(rows) > page_size else None
+        return rows[:page_size], cursor
+
+    def add(self, remark):
+        res = self.client.table(self.table).insert(remark).execute()
+        saved = (res.data or [remark])[0]
+        # other replicas drop their remark caches; ours are patched below and stay current
+        version = self.cache.invalidate(self.table) if self.cache else 0
+        with self._lock:
+            user, day = saved.get("user_name"), saved.get("date", "")
+            if user in self._recent:
+                at, rows, seen = self._recent[user]
+                self._recent[user] = (at, ([saved] + rows)[:self.recent_limit], version if seen == version - 1 else seen)
+            for key, (at, rows, cursor, seen) in list(self._pages.items()):
+                employee, start, end, before_id, page_size = key
+                # later pages are keyed by id cursor, so they stay valid when the first page grows
+                if before_id is None and employee in (None, user) and not (start and day < start) and not (end and day > end):
+                    rows = [saved] + rows
+                    if len(rows) > page_size:
+                        # the row pushed off page 1 now heads page 2, read through the new cursor
+                        rows = rows[:page_size]
+                        cursor = rows[-1]["id"]
+                self._pages[key] = (at, rows, cursor, version if seen == version - 1 else seen)
+        return saved
+
+    def _version(self):
+        return self.cache.version(self.table) if self.cache else 0
+
+    def _load(self, key, loader, version):
+        return self.cache.get_or_load(self.table, repr(key), loader, self.ttl, version) if self.cache else loader()
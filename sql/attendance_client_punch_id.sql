@@ -0,0 +1,4 @@
+-- Client-generated punch id, so replayed offline punches are stored exactly once
+alter table attendance add column if not exists client_punch_id uuid;
+
+create unique index if not exists attendance_client_punch_id_key on attendance (client_punch_id);
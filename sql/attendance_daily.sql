@@ -0,0 +1,14 @@
+-- Per-employee per-day rollup of attendance punches, maintained by daily_summary.py
+create table if not exists attendance_daily (
+    id         bigint generated by default as identity primary key,
+    name       text    not null,
+    date       date    not null,
+    first_in   text,
+    last_out   text,
+    hours      numeric(5, 2),
+    overtime   numeric(5, 2),
+    late       boolean not null default false,
+    unique (name, date)
+);
+
+create index if not exists attendance_daily_date_idx on attendance_daily (date);
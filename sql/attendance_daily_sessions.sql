@@ -0,0 +1,2 @@
+-- Number of closed IN/OUT sessions behind each daily row; hours is their sum (see attendance_engine.pair_sessions)
+alter table attendance_daily add column if not exists sessions smallint not null default 0;
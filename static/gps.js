@@ -0,0 +1,34 @@
+// The "Get My Location" component, mounted by app.py through st.components.v2. A fix goes to the
+// running session as a trigger value, so there is no reload, new session or cookie handshake.
+let requested = null;
+
+export default function (component) {
+  const { data, parentElement, setTriggerValue } = component;
+  const button = parentElement.querySelector("button");
+  const status = parentElement.querySelector(".gps-status");
+
+  function locate() {
+    button.disabled = true;
+    status.textContent = "Getting your location…";
+    navigator.geolocation.getCurrentPosition(
+      function (pos) {
+        button.disabled = false;
+        status.textContent = "";
+        setTriggerValue("fix", { lat: pos.coords.latitude, lon: pos.coords.longitude, accuracy: pos.coords.accuracy });
+      },
+      function (err) {
+        button.disabled = false;
+        status.textContent = "";
+        setTriggerValue("error", err.message);
+      },
+      { enableHighAccuracy: true, timeout: 10000, maximumAge: 0 }
+    );
+  }
+
+  button.onclick = locate;
+  // no fix yet, or the cached one went stale: ask once for it; the button covers retries and denials
+  if (data.refresh && data.token !== requested) {
+    requested = data.token;
+    locate();
+  }
+}
@@ -0,0 +1,92 @@
+(function () {
+  const state = { fix: null, photo: null, config: null };
+  const $ = function (id) { return document.getElementById(id); };
+
+  function refreshButtons() {
+    const ready = state.fix && state.photo && state.config;
+    $("punch-in").disabled = !ready;
+    $("punch-out").disabled = !ready;
+  }
+
+  // Same limits as the server-side photo pipeline: ~1280px JPEG, small enough to sit in IndexedDB.
+  function compress(file) {
+    return new Promise(function (resolve, reject) {
+      const img = new Image();
+      img.onload = function () {
+        const scale = Math.min(1, 1280 / Math.max(img.width, img.height));
+        const canvas = document.createElement("canvas");
+        canvas.width = Math.round(img.width * scale);
+        canvas.height = Math.round(img.height * scale);
+        canvas.getContext("2d").drawImage(img, 0, 0, canvas.width, canvas.height);
+        URL.revokeObjectURL(img.src);
+        resolve(canvas.toDataURL("image/jpeg", 0.7));
+      };
+      img.onerror = reject;
+      img.src = URL.createObjectURL(file);
+    });
+  }
+
+  function renderQueue() {
+    return PunchQueue.list().then(function (punches) {
+      if (!punches.length) {
+        $("queue").innerHTML = '<p class="muted">Nothing queued.</p>';
+        return;
+      }
+      $("queue").innerHTML = punches.map(function (p) {
+        const when = new Date(p.taken_at).toLocaleTimeString([], { hour: "2-digit", minute: "2-digit" });
+        const note = p.state === "rejected" ? ' <span class="rejected">— ' + p.error + "</span>" : " — waiting";
+        return '<div class="timeline-row"><b>Punch ' + p.punch_type + "</b><span>" + when + "</span>" + note + "</div>";
+      }).join("");
+    });
+  }
+
+  function punch(type) {
+    PunchQueue.enqueue({
+      punch_type: type, lat: state.fix.lat, lon: state.fix.lon, accuracy: state.fix.accuracy,
+      taken_at: new Date().toISOString(), photo: state.photo,
+    }).then(function () {
+      state.photo = null;
+      $("photo").value = "";
+      $("preview").style.display = "none";
+      refreshButtons();
+      if (navigator.onLine) PunchQueue.replay().then(renderQueue);
+      return renderQueue();
+    });
+  }
+
+  $("gps").onclick = function () {
+    navigator.geolocation.getCurrentPosition(function (pos) {
+      state.fix = { lat: pos.coords.latitude, lon: pos.coords.longitude, accuracy: pos.coords.accuracy };
+      $("gps-status").textContent = "GPS: " + state.fix.lat.toFixed(5) + ", " + state.fix.lon.toFixed(5) + " (±" + Math.round(state.fix.accuracy) + "m)";
+      $("gps-status").className = "pill ok";
+      refreshButtons();
+    }, function (err) { alert("Location error: " + err.message); }, { enableHighAccuracy: true, timeout: 10000 });
+  };
+
+  $("photo").onchange = function () {
+    const file = $("photo").files[0];
+    if (!file) return;
+    compress(file).then(function (dataUrl) {
+      state.photo = dataUrl;
+      $("preview").src = dataUrl;
+      $("preview").style.display = "block";
+      refreshButtons();
+    });
+  };
+
+  $("punch-in").onclick = function () { punch("IN"); };
+  $("punch-out").onclick = function () { punch("OUT"); };
+
+  window.addEventListener("online", function () {
+    $("net-status").textContent = "Back online — sending queued punches…";
+    PunchQueue.replay().then(renderQueue);
+  });
+
+  if ("serviceWorker" in navigator) navigator.serviceWorker.register("service-worker.js");
+  PunchQueue.getConfig().then(function (config) {
+    state.config = config;
+    if (!config) $("net-status").textContent = "Log in once while online on this phone to enable offline punches.";
+    refreshButtons();
+  });
+  renderQueue();
+})();
@@ -0,0 +1,114 @@
+// Offline punch queue kept in IndexedDB; shared by the pages and the service worker.
+(function (scope) {
+  const DB_NAME = "attendance";
+  const DB_VERSION = 1;
+  const SYNC_TAG = "punch-replay";
+
+  function openDb() {
+    return new Promise(function (resolve, reject) {
+      const req = indexedDB.open(DB_NAME, DB_VERSION);
+      req.onupgradeneeded = function () {
+        const db = req.result;
+        if (!db.objectStoreNames.contains("punches")) db.createObjectStore("punches", { keyPath: "client_punch_id" });
+        if (!db.objectStoreNames.contains("config")) db.createObjectStore("config");
+      };
+      req.onsuccess = function () { resolve(req.result); };
+      req.onerror = function () { reject(req.error); };
+    });
+  }
+
+  function run(storeName, mode, fn) {
+    return openDb().then(function (db) {
+      return new Promise(function (resolve, reject) {
+        const tx = db.transaction(storeName, mode);
+        const result = fn(tx.objectStore(storeName));
+        tx.oncomplete = function () { resolve(result && "result" in result ? result.result : result); };
+        tx.onerror = function () { reject(tx.error); };
+      });
+    });
+  }
+
+  function newPunchId() {
+    if (scope.crypto && scope.crypto.randomUUID) return scope.crypto.randomUUID();
+    return "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, function (c) {
+      const r = Math.random() * 16 | 0;
+      return (c === "x" ? r : (r & 0x3 | 0x8)).toString(16);
+    });
+  }
+
+  const PunchQueue = {
+    setConfig: function (config) {
+      return run("config", "readwrite", function (s) { s.put(config, "api"); });
+    },
+    getConfig: function () {
+      return run("config", "readonly", function (s) { return s.get("api"); });
+    },
+    enqueue: function (punch) {
+      punch.client_punch_id = punch.client_punch_id || newPunchId();
+      punch.queued_at = new Date().toISOString();
+      punch.state = "queued";
+      return run("punches", "readwrite", function (s) { s.put(punch); }).then(function () {
+        return PunchQueue.requestSync();
+      }).then(function () { return punch; });
+    },
+    list: function () {
+      return run("punches", "readonly", function (s) { return s.getAll(); });
+    },
+    remove: function (id) {
+      return run("punches", "readwrite", function (s) { s.delete(id); });
+    },
+    update: function (punch) {
+      return run("punches", "readwrite", function (s) { s.put(punch); });
+    },
+    requestSync: function () {
+      const sw = scope.navigator && scope.navigator.serviceWorker;
+      if (!sw) return Promise.resolve();
+      return sw.ready.then(function (reg) {
+        if (reg.sync) return reg.sync.register(SYNC_TAG);
+        // no Background Sync (Safari): ask the worker to replay now, pages retry on "online"
+        if (reg.active) reg.active.postMessage({ type: "replay" });
+      }).catch(function () {});
+    },
+    // Sends queued punches oldest first. Stops at the first network failure so the
+    // browser can retry the whole batch later; server rejections are kept for display.
+    replay: function () {
+      return PunchQueue.getConfig().then(function (config) {
+        if (!config || !config.endpoint || !config.token) return { sent: 0, pending: -1 };
+        return PunchQueue.list().then(function (punches) {
+          const queued = punches.filter(function (p) { return p.state === "queued"; })
+            .sort(function (a, b) { return a.taken_at < b.taken_at ? -1 : 1; });
+          let sent = 0;
+          let chain = Promise.resolve();
+          queued.forEach(function (punch) {
+            chain = chain.then(function () {
+              return fetch(config.endpoint, {
+                method: "POST",
+                headers: { "Content-Type": "application/json", "Authorization": "Bearer " + config.token },
+                body: JSON.stringify({
+                  client_punch_id: punch.client_punch_id, punch_type: punch.punch_type,
+                  lat: punch.lat, lon: punch.lon, accuracy: punch.accuracy,
+                  taken_at: punch.taken_at, device_id: config.device_id, photo: punch.photo,
+                }),
+              }).then(function (res) {
+                if (res.ok) { sent += 1; return PunchQueue.remove(punch.client_punch_id); }
+                if (res.status >= 500 || res.status === 429) throw new Error("server busy");
+                return res.json().catch(function () { return {}; }).then(function (body) {
+                  punch.state = "rejected";
+                  punch.error = body.error || ("HTTP " + res.status);
+                  return PunchQueue.update(punch);
+                });
+              });
+            });
+          });
+          return chain.then(function () { return { sent: sent, pending: 0 }; }, function () {
+            return { sent: sent, pending: queued.length - sent };
+          });
+        });
+      });
+    },
+  };
+
+  PunchQueue.SYNC_TAG = SYNC_TAG;
+  PunchQueue.newPunchId = newPunchId;
+  scope.PunchQueue = PunchQueue;
+})(typeof self !== "undefined" ? self : window);
@@ -1,3 +1,63 @@
-self.addEventListener("fetch", function(event) {
-  event.respondWith(fetch(event.request));
+importScripts("punch-queue.js");
+
+const CACHE = "attendance-shell-v1";
+const SHELL = [
+  "offline.html",
+  "offline.js",
+  "punch-queue.js",
+  "bg.jpg",
+  "static/manifest.json",
+];
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(caches.open(CACHE).then(function (cache) { return cache.addAll(SHELL); }));
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", function (event) {
+  event.waitUntil(
+    caches.keys().then(function (keys) {
+      return Promise.all(keys.filter(function (k) { return k !== CACHE; }).map(function (k) { return caches.delete(k); }));
+    }).then(function () { return self.clients.claim(); })
+  );
+});
+
+// Static assets: serve from cache, refresh in the background. Navigations fall
+// back to the offline punch page when the network is gone.
+self.addEventListener("fetch", function (event) {
+  const req = event.request;
+  if (req.method !== "GET" || new URL(req.url).origin !== self.location.origin) return;
+
+  if (req.mode === "navigate") {
+    event.respondWith(fetch(req).catch(function () {
+      return caches.match("offline.html");
+    }));
+    return;
+  }
+
+  event.respondWith(caches.open(CACHE).then(function (cache) {
+    return cache.match(req).then(function (cached) {
+      const network = fetch(req).then(function (res) {
+        if (res.ok) cache.put(req, res.clone());
+        return res;
+      }).catch(function (err) {
+        if (cached) return cached;
+        throw err;
+      });
+      return cached || network;
+    });
+  }));
+});
+
+self.addEventListener("sync", function (event) {
+  if (event.tag === PunchQueue.SYNC_TAG) {
+    event.waitUntil(PunchQueue.replay().then(function (result) {
+      // rejecting makes the browser schedule another sync attempt
+      if (result.pending > 0) throw new Error("punches still queued");
+    }));
+  }
+});
+
+self.addEventListener("message", function (event) {
+  if (event.data && event.data.type === "replay") event.waitUntil(PunchQueue.replay());
 });
@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the app modules, and the in-memory FakeSupabase the benchmarks use
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from attendance_engine import normalize, pair_sessions, stream_daily, summarize
+from config import IST
+
+NOW = pd.Timestamp("2026-10-02 23:00", tz=IST)
+PUNCHES = [
+    ("ansh", "2026-10-01", "22:00:00", "IN"), ("ansh", "2026-10-02", "06:00:00", "OUT"),  # overnight
+    ("bittu", "2026-10-01", "09:00:00", "IN"), ("bittu", "2026-10-01", "13:00:00", "OUT"),  # split shift
+    ("bittu", "2026-10-01", "14:00:00", "IN"), ("bittu", "2026-10-01", "18:30:00", "OUT"),
+    ("chetan", "2026-10-01", "10:00:00", "IN"), ("chetan", "2026-10-02", "11:00:00", "OUT"),  # 25h apart
+    ("dev", "2026-10-02", "20:00:00", "IN"),  # still inside the window at NOW
+]
+
+
+def frame(punches):
+    return normalize(pd.DataFrame(punches, columns=["name", "date", "time", "punch_type"]))
+
+
+def test_pair_sessions():
+    sessions = pair_sessions(frame(PUNCHES), now=NOW)
+    assert list(zip(sessions["name"], sessions["date"], sessions["status"])) == [
+        ("ansh", "2026-10-01", "closed"),
+        ("bittu", "2026-10-01", "closed"), ("bittu", "2026-10-01", "closed"),
+        ("chetan", "2026-10-01", "missing_out"), ("chetan", "2026-10-02", "missing_in"),
+        ("dev", "2026-10-02", "open"),
+    ]
+    assert sessions["seconds"].tolist()[:3] == [8 * 3600, 4 * 3600, 4.5 * 3600]
+
+
+def test_summarize_sums_sessions_per_day():
+    daily = summarize(pd.DataFrame(PUNCHES, columns=["name", "date", "time", "punch_type"]), now=NOW).set_index(["name", "date"])
+    assert daily.loc[("ansh", "2026-10-01"), ["first_in", "last_out", "hours", "late"]].tolist() == ["22:00:00", "06:00:00", 8.0, True]
+    assert daily.loc[("bittu", "2026-10-01"), ["hours", "overtime", "late", "sessions"]].tolist() == [8.5, 0.0, False, 2]
+    assert pd.isna(daily.loc[("chetan", "2026-10-01"), "hours"])
+    assert daily.loc[("chetan", "2026-10-01"), "late"]
+
+
+@pytest.mark.parametrize("punches", [PUNCHES, PUNCHES[:-1]], ids=["ends-open", "ends-on-out"])
+def test_stream_daily_matches_one_shot(punches):
+    events = frame(punches)
+    chunks = ((events[events["date"] == day], pd.Timestamp(day, tz=IST) + pd.Timedelta(days=1))
+              for day in sorted(events["date"].unique()))
+    streamed = pd.concat(list(stream_daily(chunks, now=NOW)), ignore_index=True)
+    expected = summarize(events, now=NOW)
+    key = ["name", "date"]
+    pd.testing.assert_frame_equal(streamed.sort_values(key, ignore_index=True), expected.sort_values(key, ignore_index=True),
+                                  check_dtype=False)
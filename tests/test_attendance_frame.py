@@ -0,0 +1,21 @@
+from attendance_frame import AttendanceFrame
+
+
+def punch(id_, name, time):
+    return {"id": id_, "date": "2026-10-18", "time": time, "name": name, "punch_type": "IN"}
+
+
+def test_each_user_slice_holds_only_that_users_rows():
+    frame = AttendanceFrame.from_rows([punch(1, " Bittu", "09:00:00"), punch(2, "ansh", "10:00:00"),
+                                       punch(3, "BITTU ", "18:00:00")])
+    assert frame.names() == ["ansh", "bittu"]
+    assert frame.user("bittu")["id"].tolist() == [1, 3]
+    assert frame.user("ansh")["id"].tolist() == [2]
+    assert frame.user("nobody").empty
+
+
+def test_a_row_without_a_name_does_not_replace_the_last_users_slice():
+    frame = AttendanceFrame.from_rows([punch(1, "ansh", "09:00:00"), punch(2, "bittu", "09:30:00"),
+                                       punch(3, None, "10:00:00")])
+    assert frame.names() == ["ansh", "bittu"]
+    assert frame.user("bittu")["id"].tolist() == [2]
@@ -0,0 +1,39 @@
+import csv
+import os
+
+import pyarrow.parquet as pq
+
+from export import EXPORT_SCHEMAS, export_to_file
+
+PAGES = [
+    # first page: warehouse_id all null, lat/lon ints, no photo column at all
+    [{"id": 1, "date": "2026-10-01", "name": "a", "punch_type": "IN", "time": "09:00:00", "lat": 28, "lon": 77,
+      "warehouse_id": None}],
+    [{"id": 2, "date": "2026-10-01", "name": "a", "punch_type": "OUT", "time": "18:00:00", "lat": 28.61, "lon": 77.2,
+      "warehouse_id": 3, "warehouse_name": "WH-3", "photo": "a/2.jpg"}],
+]
+
+
+def test_parquet_export_keeps_the_declared_types_across_pages():
+    path, rows = export_to_file(iter(PAGES), "parquet", "attendance")
+    try:
+        table = pq.read_table(path)
+    finally:
+        os.remove(path)
+    assert rows == 2
+    assert table.column_names == list(EXPORT_SCHEMAS["attendance"])
+    assert str(table.schema.field("warehouse_id").type) == "int64"
+    assert table.column("warehouse_id").to_pylist() == [None, 3]
+    assert table.column("lat").to_pylist() == [28.0, 28.61]
+
+
+def test_csv_export_keeps_columns_that_first_appear_later():
+    path, rows = export_to_file(iter(PAGES), "csv", "attendance")
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            out = list(csv.DictReader(f))
+    finally:
+        os.remove(path)
+    assert rows == 2
+    assert [r["photo"] for r in out] == ["", "a/2.jpg"]
+    assert [r["warehouse_id"] for r in out] == ["", "3"]
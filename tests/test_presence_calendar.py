@@ -0,0 +1,39 @@
+from datetime import date
+
+import pandas as pd
+
+from presence_calendar import PresenceCalendar
+
+ROWS = pd.DataFrame([
+    {"name": "ansh", "date": "2026-10-01", "late": False, "hours": 9.0},
+    {"name": "ansh", "date": "2026-10-02", "late": True, "hours": 4.0},
+    {"name": "bittu", "date": "2026-10-02", "late": False, "hours": 9.0},
+])
+
+
+def make():
+    return PresenceCalendar(["Ansh", "Bittu", "Chetan"], lambda a, b: ROWS)
+
+
+def test_month_matrix_and_counts_by_name():
+    cal = make()
+    matrix = cal.month_matrix(2026, 10)
+    assert list(matrix.index) == ["ansh", "bittu", "chetan"]
+    assert matrix.loc["ansh", [1, 2, 3]].tolist() == [2, 5, 0]
+    assert matrix.loc["chetan"].sum() == 0
+    counts = cal.counts(date(2026, 10, 1), date(2026, 10, 3)).set_index("name")
+    assert counts.loc["ansh"].tolist() == [2, 1, 1]
+    assert counts.loc["bittu"].tolist() == [1, 0, 1]
+    assert cal.absent(date(2026, 10, 2)) == ["chetan"]
+    assert cal.absence_streaks(date(2026, 10, 1), date(2026, 10, 5)) == {"ansh": 3, "bittu": 3, "chetan": 5}
+
+
+def test_employee_added_after_the_matrix_does_not_shift_rows():
+    cal = make()
+    matrix = cal.month_matrix(2026, 10)
+    cal.apply({"name": "Dev", "date": "2026-10-03", "late": False, "hours": 9.0})
+    counts = cal.counts(date(2026, 10, 1), date(2026, 10, 3))
+    assert counts["name"].tolist() == ["ansh", "bittu", "chetan", "dev"]
+    joined = counts.set_index("name").reindex(matrix.index, fill_value=0)
+    assert joined["present"].tolist() == [2, 1, 0]
+    assert list(cal.month_matrix(2026, 10).index)[-1] == "dev"
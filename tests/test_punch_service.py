@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from config import IST
+from punch_service import punched_in, sequence_error
+
+
+def at(text):
+    return IST.localize(datetime.fromisoformat(text))
+
+
+def test_sequence_rules():
+    assert sequence_error("IN", is_in=True) == "Already punched IN"
+    assert sequence_error("OUT", is_in=False) == "Punch IN first"
+    assert sequence_error("IN", is_in=False) is None
+    assert sequence_error("OUT", is_in=True) is None
+
+
+def test_punched_in_follows_the_open_session_window():
+    rows = [{"date": "2026-10-01", "time": "22:00:00", "punch_type": "IN"}]
+    assert punched_in(rows, at("2026-10-02T06:00:00"))  # overnight shift, still in
+    assert not punched_in(rows, at("2026-10-02T15:00:00"))  # past MAX_SESSION_HOURS
+    assert not punched_in([], at("2026-10-02T06:00:00"))
+    rows.append({"date": "2026-10-02", "time": "07:00:00", "punch_type": " out"})
+    assert not punched_in(rows, at("2026-10-02T08:00:00"))
+    # an offline replay taken before the OUT synced is judged by what came before it
+    assert punched_in(rows, at("2026-10-02T06:30:00"))
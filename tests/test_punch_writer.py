@@ -0,0 +1,81 @@
+import threading
+from collections import Counter
+
+import pytest
+from postgrest.exceptions import APIError
+
+from fake_supabase import FakeSupabase
+from punch_writer import PunchWriter, punch_key
+
+
+class UnreliableSupabase(FakeSupabase):
+    """Drops every n-th write like a reset connection, and rejects rows named "bad" like a check constraint."""
+
+    def __init__(self, drop_every=0, **kw):
+        super().__init__(**kw)
+        self.drop_every = drop_every
+        self.writes = 0
+
+    def run(self, q):
+        if q.op != "select":
+            with self._lock:
+                self.writes += 1
+                drop = self.drop_every and self.writes % self.drop_every == 0
+            if drop:
+                raise ConnectionError("connection reset")
+            if any(r.get("name") == "bad" for r in q.payload):
+                raise APIError({"message": "violates check constraint", "code": "23514"})
+        return super().run(q)
+
+
+def row(name, session, punch_type="IN", photo=b"photo"):
+    return {"date": "2026-10-18", "name": name, "punch_type": punch_type, "time": "09:00:00",
+            "client_punch_id": punch_key(session, punch_type, photo)}
+
+
+def test_concurrent_taps_store_exactly_one_row_per_employee():
+    db = UnreliableSupabase(drop_every=3, tables={"attendance": []})
+    writer = PunchWriter(db, max_batch=40, backoff=0.01)
+    sessions = [{} for _ in range(200)]
+    # every employee taps twice at the same moment, the second tap a resubmit of the first
+    taps = [row(f"emp{i}", s) for i, s in enumerate(sessions) for _ in range(2)]
+    gate = threading.Barrier(len(taps))
+    futures = []
+
+    def tap(r):
+        gate.wait()
+        futures.append(writer.submit(r))
+
+    threads = [threading.Thread(target=tap, args=(r,)) for r in taps]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for f in futures:
+        f.result(timeout=10)
+
+    per_employee = Counter(r["name"] for r in db.tables["attendance"])
+    assert sorted(per_employee) == sorted(f"emp{i}" for i in range(200))
+    assert set(per_employee.values()) == {1}
+    assert writer.retries > 0
+
+
+def test_a_rejected_row_fails_only_its_own_punch():
+    db = UnreliableSupabase(tables={"attendance": []})
+    writer = PunchWriter(db, flush_every=0.2, backoff=0.01)
+    futures = {name: writer.submit(row(name, {})) for name in ["bad"] + [f"emp{i}" for i in range(49)]}
+
+    with pytest.raises(APIError):
+        futures["bad"].result(timeout=5)
+    assert all(futures[f"emp{i}"].result(timeout=5)["name"] == f"emp{i}" for i in range(49))
+    assert sorted(r["name"] for r in db.tables["attendance"]) == sorted(f"emp{i}" for i in range(49))
+    assert writer.status()["failed"] == 1
+    assert writer.retries == 0
+
+
+def test_a_second_in_the_same_day_gets_its_own_id():
+    session = {}
+    first = punch_key(session, "IN", b"same photo")
+    assert punch_key(session, "IN", b"same photo") == first
+    session.pop("punch_tap")
+    assert punch_key(session, "IN", b"same photo") != first
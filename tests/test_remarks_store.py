@@ -0,0 +1,36 @@
+from fake_supabase import FakeSupabase
+from remarks_store import RemarksStore
+
+
+def remark(id_, user, day):
+    return {"id": id_, "user_name": user, "date": day, "time": "10:00:00", "remark": f"r{id_}", "created_at": ""}
+
+
+def walk(store, **filters):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = store.page(before_id=cursor, page_size=3, **filters)
+        ids += [r["id"] for r in rows]
+        if cursor is None:
+            return ids
+
+
+def make():
+    rows = [remark(i, "ansh" if i % 2 else "bittu", f"2026-10-{i:02d}") for i in range(1, 9)]
+    return RemarksStore(FakeSupabase({"attendance_remarks": rows}))
+
+
+def test_pages_walk_newest_first_without_gaps():
+    store = make()
+    assert walk(store) == [8, 7, 6, 5, 4, 3, 2, 1]
+    assert walk(store, employee="ansh") == [7, 5, 3, 1]
+    assert walk(store, start="2026-10-03", end="2026-10-06") == [6, 5, 4, 3]
+
+
+def test_added_remark_heads_the_cached_first_page():
+    store = make()
+    walk(store)
+    saved = store.add({"user_name": "bittu", "date": "2026-10-09", "time": "11:00:00", "remark": "new", "created_at": ""})
+    rows, _ = store.page(page_size=3)
+    assert rows[0]["id"] == saved["id"] == 9
+    assert walk(store) == [9, 8, 7, 6, 5, 4, 3, 2, 1]